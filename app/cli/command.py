@@ -4,20 +4,40 @@ CLI for DevSaver (via service layer).
 """
 
 import argparse
+import asyncio
 from app.services.user_services import (
     register_user,
     get_user_by_username_service,
-    list_all_users,
+    list_users_paginated,
     remove_user,
     update_user_profile,
 )
 from app.services.resource_services import (
     add_resource,
     list_resources_by_user,
-    search_for_resources,
     mark_as_read,
     toggle_star,
 )
+from app.services.session_services import purge_expired_sessions
+from app.services.job_services import (
+    queue_status,
+    list_recent_jobs,
+    run_pending_jobs,
+    start_workers,
+    stop_workers,
+    retry_job,
+    purge_finished_jobs,
+)
+from app.services.upload_gc_services import reconcile_uploads
+from app.services.media_services import queue_missing_media_extraction
+from app.services.related_services import get_related_resources, get_all_related_ids
+from app.services.duplicate_services import find_duplicate_groups
+from app.services.saved_search_services import list_saved_searches, rebuild_collections
+from app.services.search_services import queue_missing_text_extraction, search_resource_matches, fuzzy_search_resources
+from app.cli.seed import seed_database, seeded_usernames, SEED_PASSWORD
+from app.cli.loadtest import run_load_test, format_report
+from app.core.db_init import init_db_tables
+from app.core.static_files import precompress_static
 
 
 def main():
@@ -38,7 +58,12 @@ def main():
     get_user_parser = subparsers.add_parser("get-user", help="Get user details by username")
     get_user_parser.add_argument("--username", required=True, help="Username of the user")
 
-    list_users_parser = subparsers.add_parser("list-users", help="List all users")
+    list_users_parser = subparsers.add_parser("list-users", help="List users page by page")
+    list_users_parser.add_argument("--page", type=int, default=1, help="Page number")
+    list_users_parser.add_argument("--size", type=int, default=25, help="Users per page")
+    list_users_parser.add_argument("--search", help="Filter by username, email or full name")
+    list_users_parser.add_argument("--sort", default="created_at", help="id, username, email, created_at, last_login_at or resources")
+    list_users_parser.add_argument("--asc", action="store_true", help="Sort ascending instead of descending")
 
     delete_user_parser = subparsers.add_parser("delete-user", help="Delete a user")
     delete_user_parser.add_argument("--user-id", required=True, type=int, help="User ID")
@@ -49,6 +74,8 @@ def main():
     update_user_parser.add_argument("--password", help="New password")
     update_user_parser.add_argument("--fullname", help="New full name")
 
+    subparsers.add_parser("purge-sessions", help="Delete expired login sessions")
+
     # --------------------
     # RESOURCE COMMANDS
     # --------------------
@@ -68,6 +95,20 @@ def main():
     search_parser = subparsers.add_parser("search", help="Search resources by query")
     search_parser.add_argument("--user-id", required=True, type=int, help="User ID")
     search_parser.add_argument("--query", required=True, help="Search term")
+    search_parser.add_argument("--limit", type=int, default=20, help="Number of results")
+    search_parser.add_argument("--fuzzy", action="store_true", help="Match titles, tags and sources despite typos")
+
+    related_parser = subparsers.add_parser("related", help="Show related resources, for one resource or a whole library")
+    related_parser.add_argument("--user-id", required=True, type=int, help="User ID")
+    related_parser.add_argument("--resource-id", type=int, help="Resource ID (default: every resource of the user)")
+    related_parser.add_argument("--limit", type=int, default=5, help="Related resources per resource")
+
+    duplicates_parser = subparsers.add_parser("duplicates", help="Report groups of duplicate resources in a library")
+    duplicates_parser.add_argument("--user-id", required=True, type=int, help="User ID")
+
+    collections_parser = subparsers.add_parser("collections", help="List a user's smart collections, or rebuild every collection's members")
+    collections_parser.add_argument("--user-id", type=int, help="User ID")
+    collections_parser.add_argument("--rebuild", action="store_true", help="Recompute the members of every collection")
 
     mark_parser = subparsers.add_parser("mark-read", help="Mark a resource as read")
     mark_parser.add_argument("--resource-id", required=True, type=int)
@@ -75,6 +116,52 @@ def main():
     star_parser = subparsers.add_parser("toggle-star", help="Toggle starred status of a resource")
     star_parser.add_argument("--resource-id", required=True, type=int)
 
+    # --------------------
+    # DEVELOPMENT COMMANDS
+    # --------------------
+    seed_parser = subparsers.add_parser("seed", help="Bulk insert synthetic users and resources for load testing")
+    seed_parser.add_argument("--users", type=int, default=1000, help="Number of users to create")
+    seed_parser.add_argument("--resources", type=int, default=100_000, help="Number of resources to create")
+    seed_parser.add_argument("--batch-size", type=int, default=10_000, help="Rows per executemany batch")
+    seed_parser.add_argument("--commit-every", type=int, default=250_000, help="Resources per transaction")
+    seed_parser.add_argument("--workers", type=int, default=None, help="Generator processes (0 generates inline)")
+    seed_parser.add_argument("--days", type=int, default=365, help="Spread created_at over this many past days")
+    seed_parser.add_argument("--seed", type=int, default=None, help="Random seed for reproducible data")
+
+    load_parser = subparsers.add_parser("load-test", help="Replay user journeys and report per-route latency")
+    load_parser.add_argument("--users", type=int, default=10, help="Number of concurrent virtual users")
+    load_parser.add_argument("--duration", type=float, default=30.0, help="Seconds to keep generating load")
+    load_parser.add_argument("--iterations", type=int, default=None, help="Stop each user after this many journeys")
+    load_parser.add_argument("--base-url", default=None, help="Target a running server instead of the in-process app")
+    load_parser.add_argument("--think-time", type=float, default=0.0, help="Max random pause between requests (seconds)")
+    load_parser.add_argument("--seeded", action="store_true", help="Log in as accounts created by the seed command (found by their seed_user_ prefix)")
+
+    subparsers.add_parser("compress-static", help="Write .gz/.br copies of static assets to STATIC_CACHE_DIR for StaticAssets to serve")
+
+    # --------------------
+    # JOB COMMANDS
+    # --------------------
+    work_parser = subparsers.add_parser("work-jobs", help="Run background job workers until interrupted")
+    work_parser.add_argument("--workers", type=int, default=2, help="Worker threads")
+    work_parser.add_argument("--once", action="store_true", help="Run the jobs that are due now, then exit")
+
+    list_jobs_parser = subparsers.add_parser("list-jobs", help="Show queue counts and recent jobs")
+    list_jobs_parser.add_argument("--status", choices=["queued", "running", "done", "failed"], help="Only jobs with this status")
+    list_jobs_parser.add_argument("--limit", type=int, default=20, help="Number of jobs to list")
+
+    retry_job_parser = subparsers.add_parser("retry-job", help="Requeue a failed job")
+    retry_job_parser.add_argument("--job-id", required=True, type=int)
+
+    purge_jobs_parser = subparsers.add_parser("purge-jobs", help="Delete finished jobs")
+    purge_jobs_parser.add_argument("--older-than-days", type=float, default=7, help="Keep jobs finished more recently")
+
+    subparsers.add_parser("extract-media", help="Queue thumbnail, metadata and text extraction for uploads that have none")
+
+    gc_parser = subparsers.add_parser("gc-uploads", help="Quarantine unreferenced uploads and delete expired quarantined files")
+    gc_parser.add_argument("--dry-run", action="store_true", help="Only report what would be moved or deleted")
+    gc_parser.add_argument("--min-age-minutes", type=float, default=None, help="Ignore files modified more recently")
+    gc_parser.add_argument("--grace-hours", type=float, default=None, help="Keep quarantined files at least this long")
+
     # --------------------
     # PARSE + EXECUTE
     # --------------------
@@ -90,10 +177,12 @@ def main():
             print(user if user else "User not found.")
 
         elif args.command == "list-users":
-            users = list_all_users()
-            for u in users:
-                print(u)
-            return users
+            directory = list_users_paginated(args.page, args.size, args.search, args.sort, descending=not args.asc)
+            for u in directory.users:
+                print(f"{u.id:>6}  {u.username:<24} {u.email:<32} {u.resource_count:>6} resources")
+            pages = max(1, -(-directory.total // directory.size))
+            print(f"Page {directory.page} of {pages} ({directory.total} users)")
+            return directory.users
 
         elif args.command == "delete-user":
             success = remove_user(args.user_id)
@@ -112,6 +201,9 @@ def main():
             updated = update_user_profile(args.user_id, **update_fields)
             print(f"User updated: {updated}" if updated else "User not found.")
 
+        elif args.command == "purge-sessions":
+            print(f"Deleted {purge_expired_sessions()} expired sessions.")
+
         elif args.command == "add-resource":
             res = add_resource(
                 title=args.title,
@@ -131,9 +223,36 @@ def main():
                 print(r)
 
         elif args.command == "search":
-            resources = search_for_resources(args.user_id, args.query)
-            for r in resources:
-                print(r)
+            if args.fuzzy:
+                for r, score in fuzzy_search_resources(args.user_id, args.query, args.limit):
+                    print(f"{score:.2f}  {r}")
+            else:
+                for r, snippet in search_resource_matches(args.user_id, args.query, args.limit):
+                    print(r)
+                    print(f"    {snippet}")
+
+        elif args.command == "related":
+            if args.resource_id is not None:
+                for r, score in get_related_resources(args.resource_id, args.user_id, args.limit):
+                    print(f"{score:.2f}  {r}")
+            else:
+                for resource_id, related in get_all_related_ids(args.user_id, args.limit).items():
+                    print(f"{resource_id}: " + ", ".join(f"{other} ({score:.2f})" for other, score in related))
+
+        elif args.command == "duplicates":
+            groups = find_duplicate_groups(args.user_id)
+            for group in groups:
+                print(f"{len(group)} copies:")
+                for r in group:
+                    print(f"    {r}")
+            print(f"{len(groups)} groups of duplicates found.")
+
+        elif args.command == "collections":
+            if args.rebuild:
+                print(f"Collections rebuilt: {rebuild_collections()} memberships.")
+            if args.user_id is not None:
+                for search in list_saved_searches(args.user_id):
+                    print(f"{search.id}: {search.name} ({search.member_count} resources)")
 
         elif args.command == "mark-read":
             res = mark_as_read(args.resource_id)
@@ -143,5 +262,94 @@ def main():
             res = toggle_star(args.resource_id)
             print(f"Star toggled: {res}")
 
+        elif args.command == "seed":
+            init_db_tables()
+            report = seed_database(
+                users=args.users,
+                resources=args.resources,
+                batch_size=args.batch_size,
+                commit_every=args.commit_every,
+                workers=args.workers,
+                days=args.days,
+                seed=args.seed,
+            )
+            print(
+                f"Seeded {report['users']} users and {report['resources']} resources in {report['seconds']}s "
+                f"({report['rows_per_minute']:,} rows/min, seed={report['seed']})"
+            )
+            if report["usernames"]:
+                print(f"Seeded accounts: {report['usernames'][0]} .. {report['usernames'][1]} (password {SEED_PASSWORD})")
+
+        elif args.command == "load-test":
+            seeded = {}
+            if args.seeded:
+                init_db_tables()
+                usernames = seeded_usernames(args.users)
+                if not usernames:
+                    print("No seeded accounts found; run the seed command first.")
+                    return
+                seeded = {"usernames": usernames, "password": SEED_PASSWORD}  # Fewer accounts than users are shared
+            report = asyncio.run(run_load_test(
+                users=args.users,
+                duration=args.duration,
+                iterations=args.iterations,
+                base_url=args.base_url,
+                think_time=args.think_time,
+                **seeded,
+            ))
+            print(format_report(report))
+
+        elif args.command == "compress-static":
+            report = precompress_static()
+            print(f"Wrote {report['written']} compressed files ({report['skipped']} up to date), saving {report['bytes_saved']:,} bytes")
+
+        elif args.command == "work-jobs":
+            init_db_tables()
+            if args.once:
+                print(f"Ran {run_pending_jobs()} jobs.")
+            else:
+                workers = start_workers(args.workers)
+                print(f"Started {len(workers)} job workers; press Ctrl+C to stop.")
+                try:
+                    for worker in workers:
+                        worker.join()
+                except KeyboardInterrupt:
+                    print("Stopping workers after their current jobs...")
+                    stop_workers()
+
+        elif args.command == "extract-media":
+            init_db_tables()
+            media, documents = queue_missing_media_extraction(), queue_missing_text_extraction()
+            print(f"Queued media extraction for {media} uploads and text indexing for {documents}; run work-jobs to process them.")
+
+        elif args.command == "gc-uploads":
+            init_db_tables()
+            options = {}
+            if args.min_age_minutes is not None:
+                options["min_age"] = args.min_age_minutes * 60
+            if args.grace_hours is not None:
+                options["grace"] = args.grace_hours * 60 * 60
+            report = reconcile_uploads(dry_run=args.dry_run, **options)
+            prefix = "Would have" if args.dry_run else "Have"
+            print(
+                f"Scanned {report['scanned']} uploads in {report['seconds']}s. {prefix} quarantined {report['quarantined']} "
+                f"({report['quarantined_bytes']:,} bytes), restored {report['restored']}, deleted {report['deleted']} "
+                f"and reclaimed {report['bytes_reclaimed']:,} bytes."
+            )
+
+        elif args.command == "list-jobs":
+            counts = queue_status()
+            print("  ".join(f"{status}: {counts.get(status, 0)}" for status in ("queued", "running", "done", "failed")))
+            for job in list_recent_jobs(args.status, args.limit):
+                progress = f"  {job.progress}" if job.progress else ""
+                error = f"  {job.last_error}" if job.last_error else ""
+                print(f"{job.id:>6}  {job.name:<24} {job.status:<8} {job.attempts}/{job.max_attempts}  {job.run_at:%Y-%m-%d %H:%M:%S}{progress}{error}")
+
+        elif args.command == "retry-job":
+            print("Job requeued." if retry_job(args.job_id) else "No failed job with that ID.")
+
+        elif args.command == "purge-jobs":
+            print(f"Deleted {purge_finished_jobs(args.older_than_days * 24 * 60 * 60)} finished jobs.")
+
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
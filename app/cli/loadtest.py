@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""HTTP load-test harness that replays user journeys against the DevSaver app."""
+
+import asyncio
+import math
+import random
+import re
+import time
+from collections import defaultdict
+from typing import Optional
+from uuid import uuid4
+import httpx
+
+LOADTEST_PASSWORD = "loadtest-password"
+
+DASHBOARD_FILTERS = ["All", "Video", "File", "Link"]
+DASHBOARD_TAGS = ["python", "fastapi", "sqlalchemy", "testing"]
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    """Return the nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: dict[str, list[float]], errors: dict[str, int], elapsed: float) -> dict:
+    """Build throughput and latency percentiles (in ms) per route label."""
+    routes = {}
+    for label, latencies in sorted(samples.items()):
+        ordered = sorted(latencies)
+        routes[label] = {
+            "requests": len(ordered),
+            "errors": errors.get(label, 0),
+            "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            "p50": round(percentile(ordered, 50) * 1000, 2),
+            "p95": round(percentile(ordered, 95) * 1000, 2),
+            "p99": round(percentile(ordered, 99) * 1000, 2),
+        }
+
+    total = sum(route["requests"] for route in routes.values())
+    return {
+        "elapsed": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": round(total / elapsed, 2) if elapsed else 0.0,
+        "routes": routes,
+    }
+
+
+def format_report(report: dict) -> str:
+    """Render a summary report as a plain-text table."""
+    lines = [
+        f"{'route':<40} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}",
+        "-" * 93,
+    ]
+    for label, route in report["routes"].items():
+        lines.append(
+            f"{label:<40} {route['requests']:>7} {route['errors']:>5} {route['rps']:>8} "
+            f"{route['p50']:>9} {route['p95']:>9} {route['p99']:>9}"
+        )
+    lines.append("-" * 93)
+    lines.append(f"{report['requests']} requests, {report['errors']} errors in {report['elapsed']}s ({report['rps']} req/s)")
+    batches = report.get("write_batches")
+    if batches:
+        lines.append(
+            f"write batcher: {batches['writes']} writes in {batches['commits']} commits "
+            f"(mean batch {batches['mean_batch_size']}, largest {batches['largest_batch']}, {batches['failed_batches']} failed)"
+        )
+    return "\n".join(lines)
+
+
+class VirtualUser:
+    """One scripted user replaying login, browse and write journeys."""
+
+    def __init__(self, client: httpx.AsyncClient, recorder: "Recorder", username: str, password: str, think_time: float = 0.0):
+        self.client = client
+        self.recorder = recorder
+        self.username = username
+        self.password = password
+        self.think_time = think_time
+        self.rng = random.Random(username)
+
+    async def request(self, label: str, method: str, url: str, expected: int = None, **kwargs) -> httpx.Response:
+        """Send one request and record its latency under a route label.
+
+        Pages are expected to answer 200 and form posts to redirect with 303 unless told otherwise.
+        """
+        expected = expected or (200 if method == "GET" else 303)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.recorder.record(label, time.perf_counter() - started, ok=False)
+            raise
+        self.recorder.record(label, time.perf_counter() - started, ok=response.status_code == expected)
+        if self.think_time:
+            await asyncio.sleep(self.rng.uniform(0, self.think_time))
+        return response
+
+    async def login(self) -> None:
+        """Log in and keep the session cookie on the client."""
+        await self.request("POST /login", "POST", "/login", data={"username": self.username, "password": self.password})
+
+    async def browse(self) -> None:
+        """Open the dashboard with a type filter and a tag search."""
+        await self.request("GET /dashboard", "GET", "/dashboard", params={"filter": self.rng.choice(DASHBOARD_FILTERS)})
+        await self.request("GET /dashboard?tags", "GET", "/dashboard", params={"tags": self.rng.choice(DASHBOARD_TAGS)})
+
+    async def upload(self) -> Optional[int]:
+        """Upload a link or a small file and return the new resource id."""
+        title = f"Load test {uuid4().hex[:12]}"
+        data = {"title": title, "description": "Generated by the load-test harness", "tags": self.rng.choice(DASHBOARD_TAGS), "source": "loadtest"}
+        if self.rng.random() < 0.5:
+            data.update({"type": "Link", "external_url": f"https://example.com/{uuid4().hex}"})
+            files = None
+        else:
+            data.update({"type": "File"})
+            files = {"file": (f"{uuid4().hex}.txt", b"devsaver load test\n" * 64, "text/plain")}
+        await self.request("POST /resources/upload", "POST", "/resources/upload", data=data, files=files)
+
+        response = await self.request("GET /dashboard", "GET", "/dashboard", params={"filter": data["type"]})
+        match = re.search(re.escape(title) + r".*?/resources/edit-resource/(\d+)", response.text, re.S)
+        return int(match.group(1)) if match else None
+
+    async def manage(self, resource_id: int) -> None:
+        """Preview, edit, star and finally delete a resource."""
+        await self.request("GET /dashboard/{id}/preview", "GET", f"/dashboard/{resource_id}/preview")
+        await self.request("GET /resources/edit-resource/{id}", "GET", f"/resources/edit-resource/{resource_id}")
+        await self.request(
+            "POST /resources/edit-resource/{id}", "POST", f"/resources/edit-resource/{resource_id}",
+            data={"description": f"Edited {uuid4().hex[:8]}"},
+        )
+        await self.request("POST /resources/toggle-star/{id}", "POST", f"/resources/toggle-star/{resource_id}")
+        await self.request("POST /resources/delete-resource/{id}", "POST", f"/resources/delete-resource/{resource_id}")
+
+    async def run(self, deadline: float, iterations: Optional[int]) -> None:
+        """Replay journeys until the deadline or the iteration budget is reached."""
+        await self.login()
+        done = 0
+        while time.perf_counter() < deadline and (iterations is None or done < iterations):
+            try:
+                await self.browse()
+                resource_id = await self.upload()
+                if resource_id:
+                    await self.manage(resource_id)
+            except httpx.HTTPError:
+                pass
+            done += 1
+
+
+class Recorder:
+    """Collects per-route latencies and error counts."""
+
+    def __init__(self):
+        self.samples: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+    def record(self, label: str, seconds: float, ok: bool = True) -> None:
+        """Record one request latency."""
+        self.samples[label].append(seconds)
+        if not ok:
+            self.errors[label] += 1
+
+
+async def _register(client: httpx.AsyncClient, username: str) -> None:
+    """Register a virtual user's account; an existing account is fine."""
+    await client.post(
+        "/register",
+        data={"username": username, "email": f"{username}@example.com", "password": LOADTEST_PASSWORD, "fullname": "Load Test"},
+    )
+
+
+async def run_load_test(
+        users: int = 10,
+        duration: float = 30.0,
+        iterations: Optional[int] = None,
+        base_url: Optional[str] = None,
+        think_time: float = 0.0,
+        usernames: Optional[list[str]] = None,
+        password: str = LOADTEST_PASSWORD,
+        app=None,
+) -> dict:
+    """Drive concurrent virtual users against the ASGI app in-process or a running server.
+
+    When base_url is None the FastAPI app from main.py is called in-process through httpx's ASGI transport.
+    Pass usernames (e.g. accounts created by the seed command) to skip registering fresh accounts.
+    """
+    if base_url is None:
+        if app is None:
+            from main import app
+            from app.core.db_init import init_db_tables
+            init_db_tables()  # The ASGI transport does not run startup events
+        transport = httpx.ASGITransport(app=app)
+        base_url = "http://devsaver.local"
+    else:
+        transport = None
+
+    recorder = Recorder()
+    clients = [httpx.AsyncClient(transport=transport, base_url=base_url, timeout=60.0) for _ in range(users)]
+    try:
+        if usernames is None:
+            run_id = uuid4().hex[:8]
+            usernames = [f"loadtest_{run_id}_{index}" for index in range(users)]
+            for client, username in zip(clients, usernames):
+                await _register(client, username)
+
+        vus = [
+            VirtualUser(client, recorder, usernames[index % len(usernames)], password, think_time)
+            for index, client in enumerate(clients)
+        ]
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(vu.run(deadline, iterations) for vu in vus))
+        elapsed = time.perf_counter() - started
+    finally:
+        for client in clients:
+            await client.aclose()
+
+    report = summarize(recorder.samples, recorder.errors, elapsed)
+    if transport is not None:
+        # Group-commit metrics are only visible when the app runs in this process
+        from app.core.write_batcher import write_batcher
+        report["write_batches"] = write_batcher.stats()
+    return report
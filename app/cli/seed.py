@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""Bulk synthetic data seeding for DevSaver load testing."""
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, Optional
+from uuid import UUID
+from passlib.hash import argon2
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Engine
+from app.core.database import engine
+from app.models.resource import Resource
+from app.models.user import User
+from app.utils.urls import resource_key, url_hash
+
+SEED_PASSWORD = "devsaver-seed"
+# Seeded accounts are named <prefix><user id>; ids continue after existing users, so names never repeat
+SEED_USERNAME_PREFIX = "seed_user_"
+
+TAG_VOCABULARY = [
+    "python", "fastapi", "sqlalchemy", "testing", "docker", "kubernetes", "javascript",
+    "typescript", "react", "css", "html", "linux", "git", "postgres", "sqlite", "redis",
+    "asyncio", "performance", "security", "devops", "aws", "rust", "go", "algorithms",
+    "databases", "api", "design", "career", "machine-learning", "data", "pytest", "orm",
+]
+
+# (type, weight, file extension for uploaded files or None for links)
+RESOURCE_TYPES = [
+    ("Link", 50, None),
+    ("Video", 20, ".mp4"),
+    ("File", 18, ".pdf"),
+    ("Image", 8, ".png"),
+    ("Audio", 4, ".mp3"),
+]
+
+SOURCES = [
+    "youtube.com", "medium.com", "dev.to", "github.com", "stackoverflow.com",
+    "realpython.com", "docs.python.org", "fastapi.tiangolo.com", "udemy.com", "blog.local",
+]
+
+TITLE_PREFIXES = ["Intro to", "Mastering", "Deep dive into", "Notes on", "Debugging", "Scaling", "Testing", "Hands-on"]
+TITLE_SUFFIXES = ["tutorial", "cheat sheet", "best practices", "in production", "for beginners", "patterns", "internals"]
+
+READ_RATIO = 0.6
+STARRED_RATIO = 0.15
+
+
+def _zipf_cum_weights(size: int, exponent: float = 1.1) -> list[float]:
+    """Cumulative Zipf weights so a few items dominate, like real tag and user activity."""
+    total = 0.0
+    cum_weights = []
+    for rank in range(1, size + 1):
+        total += 1.0 / rank ** exponent
+        cum_weights.append(total)
+    return cum_weights
+
+
+def generate_users(start_id: int, count: int, password_hash: str, days: int = 365, seed: int = 0) -> list[dict]:
+    """Generate user rows with ids starting at start_id."""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    rows = []
+    for user_id in range(start_id, start_id + count):
+        created_at = now - timedelta(seconds=rng.randrange(days * 86400))
+        rows.append({
+            "id": user_id,
+            "username": f"{SEED_USERNAME_PREFIX}{user_id}",
+            "email": f"{SEED_USERNAME_PREFIX}{user_id}@example.com",
+            "fullname": f"Seed User {user_id}",
+            "password_hash": password_hash,
+            "created_at": created_at,
+            "updated_at": created_at,
+            "last_login_at": created_at + (now - created_at) * rng.random(),
+        })
+    return rows
+
+
+def generate_resource_batch(spec: tuple) -> list[dict]:
+    """Generate one batch of resource rows.
+
+    spec is (seed, count, first_user_id, user_count, days) so batches can be built in worker processes.
+    """
+    seed, count, first_user_id, user_count, days = spec
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    span = days * 86400
+
+    user_ids = range(first_user_id, first_user_id + user_count)
+    user_cum = _zipf_cum_weights(user_count, exponent=0.8)
+    tag_cum = _zipf_cum_weights(len(TAG_VOCABULARY))
+    type_weights = [weight for _, weight, _ in RESOURCE_TYPES]
+
+    owners = rng.choices(user_ids, cum_weights=user_cum, k=count)
+    kinds = rng.choices(RESOURCE_TYPES, weights=type_weights, k=count)
+
+    rows = []
+    for user_id, (resource_type, _, extension) in zip(owners, kinds):
+        tags = list(dict.fromkeys(rng.choices(TAG_VOCABULARY, cum_weights=tag_cum, k=rng.randint(1, 4))))
+        topic = tags[0]
+        source = rng.choice(SOURCES)
+        title = f"{rng.choice(TITLE_PREFIXES)} {topic} {rng.choice(TITLE_SUFFIXES)}"
+        # Square the random offset so recent resources are more common than old ones
+        created_at = now - timedelta(seconds=int(span * rng.random() ** 2))
+        updated_at = created_at + (now - created_at) * (rng.random() * 0.2)
+
+        if extension:
+            url = f"/uploads/devsaver-{UUID(int=rng.getrandbits(128)).hex}{extension}"
+            original_filename = f"{topic}-{rng.getrandbits(24):06x}{extension}"
+        else:
+            url = f"https://{source}/{topic}/{rng.getrandbits(64):016x}"  # Unique per user, as the url_hash index requires
+            original_filename = None
+
+        key = resource_key(url, original_filename)
+        rows.append({
+            "title": title,
+            "description": f"{title} saved from {source}.",
+            "tags": ", ".join(tags),
+            "type": resource_type,
+            "url": url,
+            "original_filename": original_filename,
+            "url_key": key,
+            "url_hash": url_hash(key),
+            "source": source,
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "read_status": rng.random() < READ_RATIO,
+            "starred": rng.random() < STARRED_RATIO,
+            "user_id": user_id,
+        })
+    return rows
+
+
+def _resource_batches(specs: list[tuple], workers: int) -> Iterator[list[dict]]:
+    """Yield generated batches in order, building them in a process pool when workers > 0."""
+    if workers <= 0:
+        for spec in specs:
+            yield generate_resource_batch(spec)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(generate_resource_batch, specs)
+
+
+def seed_database(
+        users: int,
+        resources: int,
+        batch_size: int = 10_000,
+        commit_every: int = 250_000,
+        workers: Optional[int] = None,
+        days: int = 365,
+        seed: Optional[int] = None,
+        bind: Optional[Engine] = None,
+) -> dict:
+    """Insert synthetic users and resources with Core executemany in large batches.
+
+    Rows are committed every `commit_every` resources so a seed run only takes a handful of transactions.
+    """
+    if users < 1 and resources > 0:
+        raise ValueError("At least one user is required to seed resources.")
+
+    bind = bind or engine
+    workers = max(1, (os.cpu_count() or 2) - 1) if workers is None else workers
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    started = time.perf_counter()
+
+    with bind.connect() as conn:
+        # Seeding is disposable bulk data, so skip the per-commit fsync and keep the
+        # twelve resource indexes in a large page cache while they are rebuilt
+        is_sqlite = bind.dialect.name == "sqlite"
+        if is_sqlite:
+            conn.exec_driver_sql("PRAGMA synchronous = OFF")
+            conn.exec_driver_sql("PRAGMA cache_size = -262144")
+            conn.commit()
+
+        with conn.begin():
+            first_user_id = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+            if users:
+                conn.execute(insert(User), generate_users(first_user_id, users, argon2.hash(SEED_PASSWORD), days, seed))
+
+        specs = []
+        for index, offset in enumerate(range(0, resources, batch_size)):
+            specs.append((seed + index + 1, min(batch_size, resources - offset), first_user_id, users, days))
+
+        inserted = 0
+        transaction = conn.begin()
+        try:
+            pending = 0
+            for batch in _resource_batches(specs, workers):
+                conn.execute(insert(Resource), batch)
+                inserted += len(batch)
+                pending += len(batch)
+                if pending >= commit_every:
+                    transaction.commit()
+                    transaction = conn.begin()
+                    pending = 0
+            transaction.commit()
+        except Exception:
+            transaction.rollback()
+            raise
+        finally:
+            if is_sqlite:
+                conn.exec_driver_sql("PRAGMA synchronous = FULL")
+                conn.exec_driver_sql("PRAGMA cache_size = -2000")
+                conn.commit()
+
+    elapsed = time.perf_counter() - started
+    return {
+        "users": users,
+        "resources": inserted,
+        "first_user_id": first_user_id,
+        "usernames": (f"{SEED_USERNAME_PREFIX}{first_user_id}", f"{SEED_USERNAME_PREFIX}{first_user_id + users - 1}") if users else None,
+        "seed": seed,
+        "seconds": round(elapsed, 2),
+        "rows_per_minute": int((users + inserted) / elapsed * 60) if elapsed else 0,
+    }
+
+
+def seeded_usernames(limit: int, bind: Optional[Engine] = None) -> list[str]:
+    """Usernames of up to `limit` active accounts created by seed_database, oldest first."""
+    stmt = (
+        select(User.username)
+        .where(User.username.startswith(SEED_USERNAME_PREFIX, autoescape=True), User.deleted_at.is_(None))
+        .order_by(User.id)
+        .limit(limit)
+    )
+    with (bind or engine).connect() as conn:
+        return list(conn.execute(stmt).scalars())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Response compression middleware for DevSaver."""
+
+import zlib
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Text formats worth compressing; images, media and archives are already compressed
+COMPRESSIBLE_TYPES = (
+    "text/html", "text/css", "text/plain", "text/xml", "text/javascript", "text/csv",
+    "application/json", "application/javascript", "application/xml", "image/svg+xml",
+)
+
+
+def accepted_encodings(accept_encoding: str) -> set[str]:
+    """Return the content codings a client accepts, ignoring those sent with q=0."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.partition(";")
+        if params.replace(" ", "") in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            continue
+        if coding.strip():
+            accepted.add(coding.strip())
+    return accepted
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Pick brotli when the client and server both support it, then gzip."""
+    accepted = accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._br = None
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes, final: bool) -> bytes:
+        """Compress a chunk, flushing so streamed chunks reach the client straight away."""
+        if self._br is not None:
+            return self._br.process(data) + (self._br.finish() if final else self._br.flush())
+        return self._gzip.compress(data) + self._gzip.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressionMiddleware:
+    """ASGI middleware that gzip- or brotli-compresses text responses.
+
+    Only responses whose content type is in the allowlist and whose body reaches minimum_size are compressed.
+    Responses that already carry a Content-Encoding (e.g. precompressed static files) are passed through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = 500, gzip_level: int = 6, brotli_quality: int = 4,
+                 content_types: tuple[str, ...] = COMPRESSIBLE_TYPES):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.content_types = content_types
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        start_message = None
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, compressor, passthrough
+
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", []))
+                headers = MutableHeaders(raw=message["headers"])
+                content_type = headers.get("content-type", "").split(";")[0].strip().lower()
+                eligible = (
+                    content_type in self.content_types
+                    and "content-encoding" not in headers
+                    and message["status"] not in (204, 304)
+                )
+                if eligible:
+                    headers.add_vary_header("Accept-Encoding")
+                if not eligible or encoding is None:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message  # Held until the first body chunk shows how large the body is
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                if start_message is not None:
+                    await send(start_message)
+                    start_message = None
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = MutableHeaders(raw=start_message["headers"])
+                if not more_body and len(body) < self.minimum_size:
+                    passthrough = True
+                    await send(start_message)
+                    start_message = None
+                    await send(message)
+                    return
+
+                compressor = _Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                if "content-length" in headers:
+                    del headers["content-length"]
+                if not more_body:
+                    body = compressor.compress(body, final=True)
+                    headers["Content-Length"] = str(len(body))
+                    await send(start_message)
+                    start_message = None
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+                start_message = None
+
+            await send({"type": "http.response.body", "body": compressor.compress(body, final=not more_body), "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,8 +1,98 @@
 #!/usr/bin/env python3
 """Configuration settings for the FastAPI application."""
 
+import os
+import tempfile
 from starlette.config import Config
 
 config = Config(".env")
 
-SESSION_SECRET_KEY: str = config("SESSION_SECRET_KEY", cast=str, default="devsaver-session-key")
\ No newline at end of file
+SESSION_SECRET_KEY: str = config("SESSION_SECRET_KEY", cast=str, default="devsaver-session-key")
+
+# Where uploaded files are stored: "local" keeps them in UPLOAD_DIR, "s3" in an S3-compatible bucket (needs boto3).
+# Either way they are linked as /uploads/<name>
+STORAGE_BACKEND: str = config("STORAGE_BACKEND", cast=str, default="local")
+UPLOAD_DIR: str = config("UPLOAD_DIR", cast=str, default="app/uploads/")
+# Behind nginx, an internal location aliasing UPLOAD_DIR (e.g. /protected-uploads/): local files are then sent
+# by nginx through X-Accel-Redirect instead of being streamed by a Python worker
+UPLOAD_ACCEL_REDIRECT: str = config("UPLOAD_ACCEL_REDIRECT", cast=str, default="")
+# S3 backend; leave the endpoint empty for AWS, or point it at MinIO, R2 or another compatible store
+S3_BUCKET: str = config("S3_BUCKET", cast=str, default="")
+S3_ENDPOINT_URL: str = config("S3_ENDPOINT_URL", cast=str, default="")
+S3_REGION: str = config("S3_REGION", cast=str, default="")
+S3_ACCESS_KEY_ID: str = config("S3_ACCESS_KEY_ID", cast=str, default="")
+S3_SECRET_ACCESS_KEY: str = config("S3_SECRET_ACCESS_KEY", cast=str, default="")
+S3_KEY_PREFIX: str = config("S3_KEY_PREFIX", cast=str, default="uploads/")
+S3_PRESIGN_SECONDS: int = config("S3_PRESIGN_SECONDS", cast=int, default=300)
+S3_PART_SIZE_MB: int = config("S3_PART_SIZE_MB", cast=int, default=8)
+# Orphaned uploads wait here before deletion; keep it on the same filesystem as UPLOAD_DIR and outside it,
+# so moves are renames and quarantined files are not served
+UPLOAD_QUARANTINE_DIR: str = config("UPLOAD_QUARANTINE_DIR", cast=str, default="app/uploads-quarantine/")
+
+# Server-side sessions: how long a login lasts, and how long each worker trusts its cached copy
+# of a session or user profile before re-reading the database (bounds cross-worker staleness)
+SESSION_MAX_AGE_SECONDS: int = config("SESSION_MAX_AGE_SECONDS", cast=int, default=14 * 24 * 60 * 60)
+SESSION_CACHE_TTL_SECONDS: int = config("SESSION_CACHE_TTL_SECONDS", cast=int, default=60)
+USER_CACHE_SIZE: int = config("USER_CACHE_SIZE", cast=int, default=10_000)
+
+# JSON encoder for large list responses: "orjson" when the optional package is installed, otherwise "pydantic"
+JSON_ENCODER: str = config("JSON_ENCODER", cast=str, default="orjson")
+
+# Responses smaller than this many bytes are sent uncompressed; the gzip framing would outweigh the savings
+COMPRESSION_MINIMUM_SIZE: int = config("COMPRESSION_MINIMUM_SIZE", cast=int, default=500)
+# Writable directory for the .br/.gz copies of static assets, so app/static itself can be read-only
+STATIC_CACHE_DIR: str = config("STATIC_CACHE_DIR", cast=str, default=os.path.join(tempfile.gettempdir(), "devsaver-static"))
+
+# Rendered resource partials kept per worker; previews are also dropped after the TTL so edits made on
+# other workers show up
+FRAGMENT_CACHE_SIZE: int = config("FRAGMENT_CACHE_SIZE", cast=int, default=20_000)
+FRAGMENT_CACHE_TTL_SECONDS: int = config("FRAGMENT_CACHE_TTL_SECONDS", cast=int, default=60)
+
+# Public share pages: rendered pages kept per worker, how long one may be served before re-rendering (bounds
+# staleness from edits made on other workers), and how long browsers and proxies may reuse a page unchecked
+SHARE_PAGE_CACHE_SIZE: int = config("SHARE_PAGE_CACHE_SIZE", cast=int, default=2_000)
+SHARE_PAGE_TTL_SECONDS: int = config("SHARE_PAGE_TTL_SECONDS", cast=int, default=300)
+SHARE_PAGE_MAX_AGE_SECONDS: int = config("SHARE_PAGE_MAX_AGE_SECONDS", cast=int, default=60)
+
+# Star/read toggles arriving within this many milliseconds share one transaction (0 commits each on its own)
+WRITE_BATCH_WINDOW_MS: float = config("WRITE_BATCH_WINDOW_MS", cast=float, default=10)
+WRITE_BATCH_MAX_SIZE: int = config("WRITE_BATCH_MAX_SIZE", cast=int, default=256)
+
+# Background jobs: worker threads started with the app (0 leaves jobs to `cli jobs work`), how often idle workers
+# poll, how long a running job may go unfinished before another worker reclaims it, and retry backoff
+JOB_WORKERS: int = config("JOB_WORKERS", cast=int, default=1)
+JOB_POLL_SECONDS: float = config("JOB_POLL_SECONDS", cast=float, default=2.0)
+JOB_LEASE_SECONDS: float = config("JOB_LEASE_SECONDS", cast=float, default=300)
+JOB_MAX_ATTEMPTS: int = config("JOB_MAX_ATTEMPTS", cast=int, default=5)
+JOB_RETRY_BASE_SECONDS: float = config("JOB_RETRY_BASE_SECONDS", cast=float, default=5)
+JOB_RETRY_MAX_SECONDS: float = config("JOB_RETRY_MAX_SECONDS", cast=float, default=600)
+
+# Deleted accounts are purged this many resources per transaction, pausing between chunks so other writers get the lock
+PURGE_CHUNK_SIZE: int = config("PURGE_CHUNK_SIZE", cast=int, default=500)
+PURGE_CHUNK_PAUSE_SECONDS: float = config("PURGE_CHUNK_PAUSE_SECONDS", cast=float, default=0.05)
+
+# Upload garbage collection: files younger than the minimum age may belong to an upload still in flight;
+# quarantined files are deleted after the grace period; runs are scheduled every interval (0 = only on demand)
+UPLOAD_GC_MIN_AGE_SECONDS: float = config("UPLOAD_GC_MIN_AGE_SECONDS", cast=float, default=60 * 60)
+UPLOAD_GC_GRACE_SECONDS: float = config("UPLOAD_GC_GRACE_SECONDS", cast=float, default=7 * 24 * 60 * 60)
+UPLOAD_GC_INTERVAL_HOURS: float = config("UPLOAD_GC_INTERVAL_HOURS", cast=float, default=24)
+
+# Media extraction: processes in the thumbnail/metadata pool, the per-file time limit, and the thumbnail box in pixels
+MEDIA_WORKERS: int = config("MEDIA_WORKERS", cast=int, default=2)
+MEDIA_TIMEOUT_SECONDS: float = config("MEDIA_TIMEOUT_SECONDS", cast=float, default=60)
+MEDIA_THUMBNAIL_SIZE: int = config("MEDIA_THUMBNAIL_SIZE", cast=int, default=320)
+
+# Text extracted from an uploaded document for the search index is cut off after this many characters
+TEXT_EXTRACT_MAX_CHARS: int = config("TEXT_EXTRACT_MAX_CHARS", cast=int, default=200_000)
+
+# Fuzzy search and autocomplete: their indexes are kept in memory for this many users, each rebuilt after the TTL
+# to pick up writes made by other workers; fuzzy words match when they share at least this share of their trigrams
+SEARCH_INDEX_USERS: int = config("SEARCH_INDEX_USERS", cast=int, default=32)
+SEARCH_INDEX_TTL_SECONDS: float = config("SEARCH_INDEX_TTL_SECONDS", cast=float, default=600)
+FUZZY_MIN_SIMILARITY: float = config("FUZZY_MIN_SIMILARITY", cast=float, default=0.3)
+
+# Number of related resources shown on a resource's page
+RELATED_RESOURCES_LIMIT: int = config("RELATED_RESOURCES_LIMIT", cast=int, default=5)
+
+# Estimated share of title and description words two resources must have in common to be flagged as duplicates
+DUPLICATE_MIN_SIMILARITY: float = config("DUPLICATE_MIN_SIMILARITY", cast=float, default=0.7)
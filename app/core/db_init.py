@@ -3,7 +3,10 @@
 
 from app.core.database import Base, engine
 from app.core.logging_config import logger
-from sqlalchemy import inspect
+from sqlalchemy import inspect, text
+from app.crud.resource_crud import backfill_url_hashes
+from app.crud.job_crud import release_finished_keys
+import app.models.user, app.models.resource, app.models.session, app.models.job, app.models.resource_media, app.models.resource_search, app.models.share_link, app.models.saved_search  # Register every model on Base.metadata
 
 def init_db_tables():
   """Automatically create database tables if they don't exist."""
@@ -14,4 +17,35 @@ def init_db_tables():
     Base.metadata.create_all(bind=engine)
     logger.info("Database initialized — all tables created successfully.")
   else:
-    logger.info("Database tables already exist. Skipping creation.")
\ No newline at end of file
+    # create_all skips existing tables, so also add columns and indexes introduced after a table was created
+    Base.metadata.create_all(bind=engine)
+    add_missing_columns()
+    for table in Base.metadata.sorted_tables:
+      for index in table.indexes:
+        index.create(bind=engine, checkfirst=True)
+    backfilled = backfill_url_hashes()
+    if backfilled:
+      logger.info("Computed the duplicate key of %s existing resources.", backfilled)
+    released = release_finished_keys()
+    if released:
+      logger.info("Released the idempotency keys of %s finished jobs.", released)
+    logger.info("Database tables already exist. Created any missing tables, columns and indexes.")
+
+def add_missing_columns():
+  """Add nullable columns that a model gained after its table was created. Returns the "table.column" names added."""
+  inspector = inspect(engine)
+  added = []
+  with engine.begin() as connection:
+    for table in Base.metadata.sorted_tables:
+      existing = {column["name"] for column in inspector.get_columns(table.name)}
+      for column in table.columns:
+        if column.name in existing:
+          continue
+        if not column.nullable or column.unique or column.primary_key:
+          raise RuntimeError(f"Cannot add constrained column {table.name}.{column.name} to an existing table; migrate it by hand.")
+        column_type = column.type.compile(dialect=engine.dialect)
+        connection.execute(text(f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column_type}'))
+        added.append(f"{table.name}.{column.name}")
+  if added:
+    logger.info("Added columns: %s", ", ".join(added))
+  return added
\ No newline at end of file
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""In-process change feed of resource writes for DevSaver."""
+
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Callable, NamedTuple, Optional
+from app.core.logging_config import logger
+from app.schemas.resource import ResourceRow
+
+CREATED = "created"
+UPDATED = "updated"
+DELETED = "deleted"
+RESET = "reset"  # Too much changed to describe row by row; listeners should reload the user's data
+
+
+class ResourceEvent(NamedTuple):
+    """One committed change to a user's resources."""
+    action: str
+    user_id: int
+    resource_id: Optional[int] = None
+    row: Optional[ResourceRow] = None
+    description: Optional[str] = None  # Not part of the row sent to browsers, but wanted by in-memory indexes
+
+
+class Subscription:
+    """An asyncio queue of one user's events, fed from any thread."""
+
+    def __init__(self, user_id: int, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.user_id = user_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def _put(self, event: ResourceEvent) -> None:
+        """Queue an event on the subscriber's loop; a subscriber that falls behind gets a single reset instead."""
+        if self.queue.full():
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            event = ResourceEvent(RESET, self.user_id)
+        self.queue.put_nowait(event)
+
+    async def get(self) -> ResourceEvent:
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class ChangeFeed:
+    """Per-user pub/sub for resource changes.
+
+    Listeners are plain callables run synchronously in the publishing thread, e.g. for cache invalidation.
+    Subscriptions are asyncio queues, e.g. for Server-Sent Events, and are fed thread-safely on their own loop.
+    Events are only published after the write has been committed.
+    """
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._listeners: list[Callable[[ResourceEvent], None]] = []
+        self._subscriptions: dict[int, set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: Callable[[ResourceEvent], None]) -> None:
+        """Call `listener` with every event."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[ResourceEvent], None]) -> None:
+        """Stop calling `listener`."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def subscribe(self, user_id: int) -> Subscription:
+        """Start queueing a user's events for the calling event loop."""
+        subscription = Subscription(user_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop queueing events for a subscription."""
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.user_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.user_id]
+
+    def subscriber_count(self, user_id: Optional[int] = None) -> int:
+        """Number of open subscriptions, for one user or overall."""
+        with self._lock:
+            if user_id is not None:
+                return len(self._subscriptions.get(user_id, ()))
+            return sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+
+    def publish(self, event: ResourceEvent) -> None:
+        """Deliver an event to every listener and to the user's subscriptions. Listener errors are logged, not raised."""
+        with self._lock:
+            listeners = list(self._listeners)
+            subscriptions = list(self._subscriptions.get(event.user_id, ()))
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:
+                logger.exception("Change feed listener %r failed for %s", listener, event.action)
+
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._put, event)
+            except RuntimeError:  # The subscriber's loop has closed
+                self.unsubscribe(subscription)
+
+
+change_feed = ChangeFeed()
@@ -3,9 +3,10 @@
 from fastapi import Request
 from starlette.exceptions import HTTPException as StarletteHTTPException # This catches and fastapi.HTTPException raises
 from fastapi.exceptions import RequestValidationError
+from fastapi.exception_handlers import request_validation_exception_handler
 from fastapi.responses import RedirectResponse, HTMLResponse
 from app.core.templates import templates
-from app.utils.pydantic.validation_error import validation_path, normalize_errors
+from app.utils.pydantic.validation_error import validation_path, normalize_errors, is_json_api
 
 
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
@@ -19,16 +20,20 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     try:
         return templates.TemplateResponse(
             template_name, 
-            {"request": request, "status_code":exc.status_code, "detail": exc.detail}
+            {"request": request, "status_code":exc.status_code, "detail": exc.detail},
+            status_code=exc.status_code,
         )
     except Exception:
         return templates.TemplateResponse(
             "errors/generic.html", 
-            {"request": request, "status_code":exc.status_code, "detail": exc.detail}
+            {"request": request, "status_code":exc.status_code, "detail": exc.detail},
+            status_code=exc.status_code,
         )
     
 async def validation_exception_handler(request: Request, exc: RequestValidationError) -> HTMLResponse:
-    """Handle Pydantic/FastAPI form validation errors."""
+    """Handle Pydantic/FastAPI form validation errors. JSON endpoints get the standard 422 JSON body."""
+    if is_json_api(request):
+        return await request_validation_exception_handler(request, exc)
     errors = normalize_errors(exc.errors())
     template, title = validation_path(request)
     form_data = await request.form()
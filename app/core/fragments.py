@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Rendered-fragment cache for resource partials."""
+
+import hashlib
+from datetime import datetime
+from typing import Hashable, NamedTuple, Optional
+from jinja2 import Environment, pass_context
+from markupsafe import Markup
+from app.core.config import FRAGMENT_CACHE_SIZE, FRAGMENT_CACHE_TTL_SECONDS
+from app.core.events import change_feed, ResourceEvent, RESET
+from app.utils.cache import TTLCache
+
+PREVIEW = "preview"
+RESOURCE_ROW = "partials/resource_row.html"
+
+# (template name, key) -> rendered HTML. Row keys include updated_at so an edited row simply misses;
+# previews are looked up by resource id alone, so writes invalidate them and a TTL bounds staleness
+# left by writes on other workers.
+fragment_cache = TTLCache(maxsize=FRAGMENT_CACHE_SIZE)
+
+
+class Fragment(NamedTuple):
+    """A rendered resource partial with the owner it may be shown to and its ETag."""
+    user_id: int
+    etag: str
+    html: str
+
+
+def fragment_etag(name: str, resource_id: int, updated_at: datetime) -> str:
+    """Build a strong ETag from a fragment name and the resource version it was rendered from."""
+    digest = hashlib.sha1(f"{name}:{resource_id}:{updated_at.isoformat()}".encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+@pass_context
+def cached_fragment(context, template_name: str, key: Hashable, **values) -> Markup:
+    """Render a partial once per key and reuse the HTML on later renders.
+
+    Usage in a template: {{ cached_fragment("partials/resource_row.html", (resource.id, resource.updated_at), resource=resource) }}
+    Partials must not depend on anything outside `values` and the request, since the output is shared.
+    """
+    return render_fragment(context.environment, template_name, key, request=context.get("request"), **values)
+
+def render_fragment(environment: Environment, template_name: str, key: Hashable, **values) -> Markup:
+    """Render a partial through the fragment cache outside a template, e.g. for pushed row updates."""
+    cache_key = (template_name, key)
+    html = fragment_cache.get(cache_key)
+    if html is None:
+        html = Markup(environment.get_template(template_name).render(values))
+        fragment_cache.set(cache_key, html)
+    return html
+
+def get_preview_fragment(resource_id: int) -> Optional[Fragment]:
+    """Return the cached preview of a resource, if any."""
+    return fragment_cache.get((PREVIEW, resource_id))
+
+def store_preview_fragment(resource_id: int, user_id: int, updated_at: datetime, html: str) -> Fragment:
+    """Cache a rendered preview and return it with its ETag."""
+    fragment = Fragment(user_id, fragment_etag(PREVIEW, resource_id, updated_at), html)
+    fragment_cache.set((PREVIEW, resource_id), fragment, ttl=FRAGMENT_CACHE_TTL_SECONDS)
+    return fragment
+
+def invalidate_resource_fragments(event: ResourceEvent) -> None:
+    """Change-feed listener that drops the cached preview of a changed or deleted resource.
+
+    Rows are keyed on updated_at and need no invalidation.
+    """
+    if event.action == RESET:
+        fragment_cache.invalidate_where(lambda key: key[0] == PREVIEW)
+    else:
+        fragment_cache.invalidate((PREVIEW, event.resource_id))
+
+change_feed.add_listener(invalidate_resource_fragments)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Rendered-page cache for public share links."""
+
+import gzip
+import threading
+from typing import NamedTuple, Optional
+from app.core.compression_middleware import brotli
+from app.core.config import SHARE_PAGE_CACHE_SIZE, SHARE_PAGE_TTL_SECONDS
+from app.core.events import change_feed, ResourceEvent, RESET
+from app.utils.cache import TTLCache
+from app.utils.http import build_etag
+
+# token -> SharedPage. Pages are rendered and compressed once, then served without touching the database until a
+# write by their owner drops them; the TTL bounds staleness left by writes on other workers.
+shared_page_cache = TTLCache(maxsize=SHARE_PAGE_CACHE_SIZE, ttl=SHARE_PAGE_TTL_SECONDS)
+
+# owner id -> {token: shared resource id, or None for a tag collection}, so writes find the pages they affect
+_tokens_by_user: dict[int, dict[str, Optional[int]]] = {}
+_tokens_lock = threading.Lock()
+
+
+class SharedPage(NamedTuple):
+    """A rendered share page with its owner, the resource it shows (None for a collection) and its encodings."""
+    user_id: int
+    resource_id: Optional[int]
+    etag: str
+    bodies: dict  # Content coding ("br", "gzip", or None for identity) -> body
+
+    def variant(self, encoding: Optional[str]) -> tuple[Optional[str], bytes, str]:
+        """(coding, body, ETag) of the representation for a negotiated coding; each coding gets its own strong ETag."""
+        if encoding not in self.bodies:
+            encoding = None
+        etag = self.etag if encoding is None else f'{self.etag[:-1]}-{encoding}"'
+        return encoding, self.bodies[encoding], etag
+
+
+def get_shared_page(token: str) -> Optional[SharedPage]:
+    """Return the cached page of a share link, if any."""
+    return shared_page_cache.get(token)
+
+def store_shared_page(token: str, user_id: int, resource_id: Optional[int], html: str) -> SharedPage:
+    """Compress a rendered share page once per coding and cache it. The ETag follows the content, so a page
+    re-rendered unchanged after an unrelated write still validates."""
+    body = html.encode()
+    bodies = {None: body, "gzip": gzip.compress(body, 9, mtime=0)}
+    if brotli is not None:
+        bodies["br"] = brotli.compress(body, quality=11)
+    page = SharedPage(user_id, resource_id, build_etag("share", body), bodies)
+    with _tokens_lock:
+        _tokens_by_user.setdefault(user_id, {})[token] = resource_id
+    shared_page_cache.set(token, page)
+    return page
+
+def invalidate_shared_page(token: str) -> None:
+    """Drop the cached page of one share link, e.g. when it is revoked."""
+    shared_page_cache.invalidate(token)
+
+def invalidate_user_pages(user_id: int) -> None:
+    """Drop every cached share page of a user, e.g. when the account is deleted."""
+    with _tokens_lock:
+        tokens = _tokens_by_user.pop(user_id, {})
+    for token in tokens:
+        shared_page_cache.invalidate(token)
+
+def invalidate_shared_pages(event: ResourceEvent) -> None:
+    """Change-feed listener that drops the share pages a write may have changed.
+
+    Any write by the owner can add a resource to, or remove one from, their tag collections, so those are always
+    dropped; a resource page only when that resource changed.
+    """
+    if event.action == RESET:
+        invalidate_user_pages(event.user_id)
+        return
+    with _tokens_lock:
+        tokens = _tokens_by_user.get(event.user_id)
+        if not tokens:
+            return
+        stale = [token for token, resource_id in tokens.items() if resource_id is None or resource_id == event.resource_id]
+        for token in stale:
+            del tokens[token]
+    for token in stale:
+        shared_page_cache.invalidate(token)
+
+change_feed.add_listener(invalidate_shared_pages)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Fingerprinted, precompressed static asset serving for DevSaver."""
+
+import glob
+import gzip
+import hashlib
+import os
+import re
+import stat
+from functools import lru_cache
+from mimetypes import guess_type
+from typing import Optional
+import anyio
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from app.core.compression_middleware import accepted_encodings, brotli
+from app.core.config import STATIC_CACHE_DIR
+
+STATIC_DIR = "app/static"
+STATIC_URL = "/static"
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Files that get .br / .gz copies; preferred encoding first
+PRECOMPRESS_SUFFIXES = (".css", ".js", ".svg", ".html", ".txt", ".json", ".map", ".xml")
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+FINGERPRINT_LENGTH = 12
+FINGERPRINT_RE = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{%d})(?P<suffix>\.[A-Za-z0-9]+)$" % FINGERPRINT_LENGTH)
+
+
+@lru_cache(maxsize=1024)
+def _content_digest(full_path: str, mtime_ns: int, size: int) -> str:
+    """Hash a file's contents; keyed on mtime and size so an edited file is hashed again."""
+    digest = hashlib.sha256()
+    with open(full_path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:FINGERPRINT_LENGTH]
+
+def file_fingerprint(full_path: str) -> Optional[str]:
+    """Return the content fingerprint of a file, or None if it does not exist."""
+    try:
+        stat_result = os.stat(full_path)
+    except OSError:
+        return None
+    return _content_digest(full_path, stat_result.st_mtime_ns, stat_result.st_size)
+
+def static_url(path: str) -> str:
+    """Return the fingerprinted URL of a static asset, e.g. css/styles.css -> /static/css/styles.<hash>.css.
+
+    Falls back to the plain URL when the file does not exist.
+    """
+    path = path.lstrip("/")
+    digest = file_fingerprint(os.path.join(STATIC_DIR, path))
+    if digest is None:
+        return f"{STATIC_URL}/{path}"
+    stem, suffix = os.path.splitext(path)
+    return f"{STATIC_URL}/{stem}.{digest}{suffix}"
+
+def variant_root(directory: str, cache_dir: str = STATIC_CACHE_DIR) -> str:
+    """Where the compressed copies of a static directory live: its own subdirectory of the cache, so the copies
+    of different directories never collide."""
+    real_directory = os.path.realpath(directory)
+    return os.path.join(cache_dir, hashlib.sha1(real_directory.encode()).hexdigest()[:12])
+
+def variant_path(root: str, relative: str, digest: str, suffix: str) -> str:
+    """The compressed copy of one version of an asset, named by its content digest: css/styles.<digest>.css.gz.
+
+    A copy is only ever served for the exact bytes it was made from, whatever the source file's mtime says.
+    """
+    stem, extension = os.path.splitext(relative)
+    return os.path.join(root, f"{stem}.{digest}{extension}{suffix}")
+
+def _remove_stale_variants(target: str, suffix: str) -> None:
+    """Delete the copies made from earlier versions of the asset `target` is a copy of."""
+    digested, extension = os.path.splitext(target[: -len(suffix)])
+    stem = os.path.splitext(digested)[0]
+    pattern = glob.escape(stem) + "." + "[0-9a-f]" * FINGERPRINT_LENGTH + glob.escape(extension + suffix)
+    for stale in glob.glob(pattern):
+        if stale != target:
+            os.remove(stale)
+
+def precompress_static(directory: str = STATIC_DIR, minimum_size: int = 256, cache_dir: str = STATIC_CACHE_DIR) -> dict:
+    """Write .gz (and .br when brotli is installed) copies of compressible assets under `cache_dir`.
+
+    The source directory is only read. Copies are named by the content digest of their source, so ones that
+    exist are up to date and skipped; copies of earlier versions are removed, and none is kept that would not
+    be smaller.
+    """
+    written, skipped, saved = 0, 0, 0
+    target_root = variant_root(directory, cache_dir)
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.endswith(PRECOMPRESS_SUFFIXES):
+                continue
+            source = os.path.join(root, name)
+            source_stat = os.stat(source)
+            if source_stat.st_size < minimum_size:
+                continue
+            data = None
+            relative = os.path.relpath(source, directory)
+            digest = _content_digest(source, source_stat.st_mtime_ns, source_stat.st_size)
+            for encoding, suffix in PRECOMPRESSED_VARIANTS:
+                if encoding == "br" and brotli is None:
+                    continue
+                target = variant_path(target_root, relative, digest, suffix)
+                if os.path.exists(target):
+                    skipped += 1
+                    continue
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                _remove_stale_variants(target, suffix)
+                if data is None:
+                    with open(source, "rb") as f:
+                        data = f.read()
+                # mtime=0 keeps the gzip bytes identical across builds
+                compressed = brotli.compress(data, quality=11) if encoding == "br" else gzip.compress(data, 9, mtime=0)
+                if len(compressed) >= len(data):
+                    continue
+                with open(target, "wb") as f:
+                    f.write(compressed)
+                written += 1
+                saved += len(data) - len(compressed)
+    return {"written": written, "skipped": skipped, "bytes_saved": saved}
+
+
+class StaticAssets(StaticFiles):
+    """StaticFiles that understands fingerprinted URLs and serves the copies precompress_static wrote.
+
+    /static/css/styles.<hash>.css is served from css/styles.css with a far-future immutable Cache-Control while
+    the hash matches the file. Plain URLs and stale hashes get no-cache so browsers revalidate with the ETag.
+    """
+
+    def __init__(self, *args, cache_dir: str = STATIC_CACHE_DIR, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.variant_root = variant_root(self.directory, cache_dir) if self.directory is not None else None
+
+    async def get_response(self, path: str, scope) -> Response:
+        match = FINGERPRINT_RE.match(path)
+        if match and scope["method"] in ("GET", "HEAD"):
+            full_path, stat_result = await anyio.to_thread.run_sync(self.lookup_path, match["stem"] + match["suffix"])
+            if stat_result and stat.S_ISREG(stat_result.st_mode):
+                response = self.file_response(full_path, stat_result, scope)
+                fresh = _content_digest(full_path, stat_result.st_mtime_ns, stat_result.st_size) == match["digest"]
+                response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if fresh else REVALIDATE_CACHE_CONTROL
+                return response
+
+        response = await super().get_response(path, scope)
+        response.headers.setdefault("Cache-Control", REVALIDATE_CACHE_CONTROL)
+        return response
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope, status_code: int = 200) -> Response:
+        """Serve a fresh .br or .gz copy when the client accepts it, otherwise the file itself."""
+        request_headers = Headers(scope=scope)
+        accepted = accepted_encodings(request_headers.get("accept-encoding", ""))
+        relative = os.path.relpath(full_path, os.path.realpath(self.directory)) if self.variant_root else os.pardir
+        digest = None
+        for encoding, suffix in PRECOMPRESSED_VARIANTS:
+            if encoding not in accepted or relative.startswith(os.pardir):
+                continue
+            # Only a copy made from these exact bytes is served, so a restored older mtime cannot pick a stale one
+            digest = digest or _content_digest(full_path, stat_result.st_mtime_ns, stat_result.st_size)
+            copy_path = variant_path(self.variant_root, relative, digest, suffix)
+            try:
+                variant_stat = os.stat(copy_path)
+            except OSError:
+                continue
+            response = FileResponse(
+                copy_path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                media_type=guess_type(str(full_path))[0] or "text/plain",
+                headers={"Content-Encoding": encoding, "Vary": "Accept-Encoding"},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                return NotModifiedResponse(response.headers)
+            return response
+
+        return super().file_response(full_path, stat_result, scope, status_code)
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Storage backends for uploaded files: the local filesystem or an S3-compatible object store."""
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from itertools import chain
+from typing import BinaryIO, Iterator, Optional
+from uuid import uuid4
+from starlette.responses import RedirectResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+from app.core.config import (
+    STORAGE_BACKEND, UPLOAD_DIR, UPLOAD_ACCEL_REDIRECT, S3_BUCKET, S3_ENDPOINT_URL, S3_REGION, S3_ACCESS_KEY_ID,
+    S3_SECRET_ACCESS_KEY, S3_KEY_PREFIX, S3_PRESIGN_SECONDS, S3_PART_SIZE_MB
+)
+
+try:
+    import boto3
+except ImportError:  # boto3 is optional; only the s3 backend needs it
+    boto3 = None
+
+UPLOAD_URL = "/uploads/"
+COPY_BUFFER_SIZE = 1024 * 1024
+MIN_PART_SIZE = 5 * 1024 * 1024  # S3 rejects smaller parts except the last
+
+
+def upload_url(name: str) -> str:
+    """The URL a stored upload is linked at; /uploads/<name> is answered by the active backend."""
+    return UPLOAD_URL + name
+
+def upload_name(url: str) -> str:
+    """The stored name behind an upload URL. Only the last path segment is used, so a URL cannot escape the store."""
+    return os.path.basename(url)
+
+
+class LocalStorage:
+    """Uploads kept in a directory on the app server's disk."""
+
+    def __init__(self, directory: str, accel_redirect: str = ""):
+        self.directory = directory
+        self.accel_redirect = accel_redirect
+        os.makedirs(directory, exist_ok=True)
+        self._files = StaticFiles(directory=directory)
+
+    def path(self, name: str) -> str:
+        return os.path.join(self.directory, upload_name(name))
+
+    def save(self, name: str, stream: BinaryIO, content_type: Optional[str] = None) -> int:
+        """Copy a stream into the store in chunks and return its size. The file appears under its name only when complete."""
+        partial = os.path.join(self.directory, f".partial-{uuid4().hex}")
+        try:
+            with open(partial, "wb") as out:
+                shutil.copyfileobj(stream, out, COPY_BUFFER_SIZE)
+                size = out.tell()
+            os.replace(partial, self.path(name))
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        return size
+
+    def delete(self, name: str) -> bool:
+        """Delete a stored file; False when it was already gone."""
+        try:
+            os.remove(self.path(name))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def exists(self, name: str) -> bool:
+        return os.path.isfile(self.path(name))
+
+    @contextmanager
+    def local_copy(self, name: str) -> Iterator[str]:
+        """A filesystem path to a stored file, for tools that need one; here the file itself."""
+        yield self.path(name)
+
+    async def download(self, name: str, scope: Scope) -> Response:
+        """Serve a stored file. Behind nginx, hand the transfer to it with X-Accel-Redirect instead of streaming from Python."""
+        name = upload_name(name)
+        if self.accel_redirect:
+            if not self.exists(name):
+                return Response(status_code=404)
+            return Response(headers={"X-Accel-Redirect": self.accel_redirect.rstrip("/") + "/" + name})
+        # StaticFiles answers conditional and range requests and 404s for missing files
+        return await self._files.get_response(name, scope)
+
+
+class S3Storage:
+    """Uploads kept in an S3-compatible bucket (AWS S3, MinIO, R2...). Downloads redirect to presigned URLs."""
+
+    def __init__(
+            self,
+            bucket: str,
+            endpoint_url: Optional[str] = None,
+            region: Optional[str] = None,
+            access_key_id: Optional[str] = None,
+            secret_access_key: Optional[str] = None,
+            key_prefix: str = "",
+            presign_seconds: int = 300,
+            part_size: int = 8 * 1024 * 1024,
+            client=None,
+    ):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("STORAGE_BACKEND=s3 needs boto3: pip install boto3")
+            client = boto3.client(
+                "s3", endpoint_url=endpoint_url or None, region_name=region or None,
+                aws_access_key_id=access_key_id or None, aws_secret_access_key=secret_access_key or None,
+            )
+        self.client = client
+        self.bucket = bucket
+        self.key_prefix = key_prefix
+        self.presign_seconds = presign_seconds
+        self.part_size = max(part_size, MIN_PART_SIZE)
+
+    def key(self, name: str) -> str:
+        return self.key_prefix + upload_name(name)
+
+    def save(self, name: str, stream: BinaryIO, content_type: Optional[str] = None) -> int:
+        """Stream a file into the bucket and return its size.
+
+        Anything larger than one part goes up as a multipart upload, so memory use is one part whatever the file size;
+        a failed upload is aborted so no orphaned parts are billed.
+        """
+        extra = {"ContentType": content_type} if content_type else {}
+        key = self.key(name)
+        first = stream.read(self.part_size)
+        second = stream.read(self.part_size) if len(first) == self.part_size else b""
+        if not second:
+            self.client.put_object(Bucket=self.bucket, Key=key, Body=first, **extra)
+            return len(first)
+
+        upload_id = self.client.create_multipart_upload(Bucket=self.bucket, Key=key, **extra)["UploadId"]
+        parts, size = [], 0
+        try:
+            for number, chunk in enumerate(chain((first, second), iter(lambda: stream.read(self.part_size), b"")), 1):
+                etag = self.client.upload_part(
+                    Bucket=self.bucket, Key=key, UploadId=upload_id, PartNumber=number, Body=chunk
+                )["ETag"]
+                parts.append({"PartNumber": number, "ETag": etag})
+                size += len(chunk)
+            self.client.complete_multipart_upload(
+                Bucket=self.bucket, Key=key, UploadId=upload_id, MultipartUpload={"Parts": parts}
+            )
+        except BaseException:
+            self.client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+        return size
+
+    def delete(self, name: str) -> bool:
+        """Delete an object. S3 deletes are idempotent, so a missing object also counts as deleted."""
+        self.client.delete_object(Bucket=self.bucket, Key=self.key(name))
+        return True
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key(name))
+        except self.client.exceptions.ClientError:
+            return False
+        return True
+
+    @contextmanager
+    def local_copy(self, name: str) -> Iterator[str]:
+        """Download an object to a temporary file for tools that need a path; the file is removed afterwards."""
+        suffix = os.path.splitext(name)[1]
+        with tempfile.NamedTemporaryFile(suffix=suffix) as copy:
+            self.client.download_fileobj(self.bucket, self.key(name), copy)
+            copy.flush()
+            yield copy.name
+
+    def presigned_url(self, name: str) -> str:
+        return self.client.generate_presigned_url(
+            "get_object", Params={"Bucket": self.bucket, "Key": self.key(name)}, ExpiresIn=self.presign_seconds
+        )
+
+    async def download(self, name: str, scope: Scope) -> Response:
+        """Redirect to a short-lived presigned URL, so the bytes come straight from the object store."""
+        # Signing is local computation, no request to the store; browsers may reuse the redirect until shortly before expiry
+        max_age = max(self.presign_seconds - 60, 0)
+        return RedirectResponse(self.presigned_url(name), status_code=307, headers={"Cache-Control": f"private, max-age={max_age}"})
+
+
+def create_storage(backend: str = STORAGE_BACKEND):
+    """Build the configured storage backend."""
+    if backend == "local":
+        return LocalStorage(UPLOAD_DIR, accel_redirect=UPLOAD_ACCEL_REDIRECT)
+    if backend == "s3":
+        if not S3_BUCKET:
+            raise RuntimeError("STORAGE_BACKEND=s3 needs S3_BUCKET")
+        return S3Storage(
+            S3_BUCKET, endpoint_url=S3_ENDPOINT_URL, region=S3_REGION, access_key_id=S3_ACCESS_KEY_ID,
+            secret_access_key=S3_SECRET_ACCESS_KEY, key_prefix=S3_KEY_PREFIX, presign_seconds=S3_PRESIGN_SECONDS,
+            part_size=S3_PART_SIZE_MB * 1024 * 1024,
+        )
+    raise RuntimeError(f"Unknown STORAGE_BACKEND {backend!r}; use 'local' or 's3'")
+
+storage = create_storage()
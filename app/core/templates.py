@@ -1,13 +1,42 @@
 #!/usr/bin/env python3
 """Template constants for the FastAPI application."""
 
+import hashlib
+import os
 from fastapi.templating import Jinja2Templates
 from datetime import datetime
+from app.core.static_files import STATIC_DIR, static_url
+from app.core.fragments import cached_fragment
+from app.utils.urls import is_linkable_url
 
-templates = Jinja2Templates(directory="app/templates")
+TEMPLATES_DIR = "app/templates"
+
+templates = Jinja2Templates(directory=TEMPLATES_DIR)
+
+
+def _templates_version() -> str:
+    """Fingerprint the template and static files, so page ETags change when a deploy changes the markup."""
+    digest = hashlib.sha1()
+    for directory in (TEMPLATES_DIR, STATIC_DIR):
+        for root, _, files in sorted(os.walk(directory)):
+            for name in sorted(files):
+                stat_result = os.stat(os.path.join(root, name))
+                digest.update(f"{root}/{name}:{stat_result.st_mtime_ns}:{stat_result.st_size}".encode())
+    return digest.hexdigest()[:12]
+
+TEMPLATES_VERSION = _templates_version()
 
 # Add global "now" functions to Jinja2 for the footer date
 templates.env.globals["now"] = datetime.now
 
+# Fingerprinted static URLs, e.g. {{ static_url('css/styles.css') }}
+templates.env.globals["static_url"] = static_url
+
+# Cached rendering of resource partials, e.g. dashboard rows
+templates.env.globals["cached_fragment"] = cached_fragment
+
+# URLs safe to render as a link, e.g. {% if resource.url is linkable %}
+templates.env.tests["linkable"] = is_linkable_url
+
 # Clear the Jinja2 cache to force recompilation for faster develpment to prevent cache issues. Remove in production.
 templates.env.cache = {}
\ No newline at end of file
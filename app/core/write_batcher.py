@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""Group commit for small, frequent writes such as star and read toggles."""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, NamedTuple
+from sqlalchemy.orm import Session
+from app.core import database
+from app.core.config import WRITE_BATCH_WINDOW_MS, WRITE_BATCH_MAX_SIZE
+from app.core.logging_config import logger
+
+# Batch sizes are counted in these buckets (upper bounds) for the size histogram
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class PendingWrite(NamedTuple):
+    """One queued write: `apply(session, *args)` runs inside the shared transaction."""
+    apply: Callable[..., Any]
+    args: tuple
+    future: Future
+
+
+class WriteBatcher:
+    """Coalesce writes submitted from many threads into one transaction per short window.
+
+    Every commit on SQLite is a journal sync, so a burst of single-row toggles spends most of its time
+    committing. The batcher thread waits up to `window_ms` after the first write for more to arrive, then
+    applies them all in one session and commits once. Each caller gets a Future that resolves to its own
+    write's result after that commit, or to its own exception. Writes must be small and independent of each
+    other; if the batch commit fails, they are retried one transaction each so one bad write cannot fail
+    its neighbours.
+
+    A window of 0 disables batching and applies writes on the calling thread.
+    """
+
+    def __init__(self, window_ms: float = WRITE_BATCH_WINDOW_MS, max_batch: int = WRITE_BATCH_MAX_SIZE):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+        self._started_at = time.monotonic()
+        self._batches = 0
+        self._batched_writes = 0
+        self._writes = 0
+        self._commits = 0
+        self._failed_batches = 0
+        self._largest_batch = 0
+        self._histogram = [0] * len(BATCH_SIZE_BUCKETS)
+
+    def submit(self, apply: Callable[..., Any], *args) -> Future:
+        """Queue `apply(session, *args)` and return a Future for its result."""
+        future: Future = Future()
+        write = PendingWrite(apply, args, future)
+        if self.window <= 0:
+            self._run([write])
+            return future
+        self._ensure_thread()
+        self._queue.put(write)
+        return future
+
+    def execute(self, apply: Callable[..., Any], *args) -> Any:
+        """Submit a write and wait for it to commit."""
+        return self.submit(apply, *args).result()
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._loop, name="write-batcher", daemon=True)
+                    self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    write = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if write is None:
+                    self._queue.put(None)  # Stop after this batch
+                    break
+                batch.append(write)
+            self._run(batch)
+
+    def _run(self, batch: list[PendingWrite]) -> None:
+        """Apply a batch in one transaction, falling back to one transaction per write if it fails."""
+        self._record_batch(len(batch))
+        try:
+            results = self._commit(batch)
+        except Exception:
+            logger.exception("Write batch of %d failed; retrying writes individually", len(batch))
+            with self._lock:
+                self._failed_batches += 1
+            for write in batch:
+                try:
+                    result = self._commit([write])[0]
+                except Exception as exc:
+                    write.future.set_exception(exc)
+                else:
+                    write.future.set_result(result)
+            return
+
+        for write, result in zip(batch, results):
+            write.future.set_result(result)
+
+    def _commit(self, batch: list[PendingWrite]) -> list[Any]:
+        session: Session = database.SessionLocal()
+        try:
+            results = []
+            for write in batch:
+                results.append(write.apply(session, *write.args))
+                session.flush()  # Surface each write's errors before the shared commit
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        with self._lock:
+            self._commits += 1
+            self._writes += len(batch)
+        return results
+
+    def _record_batch(self, size: int) -> None:
+        with self._lock:
+            self._batches += 1
+            self._batched_writes += size
+            self._largest_batch = max(self._largest_batch, size)
+            for index, bound in enumerate(BATCH_SIZE_BUCKETS):
+                if size <= bound:
+                    self._histogram[index] += 1
+                    break
+            else:
+                self._histogram[-1] += 1
+
+    def stats(self) -> dict:
+        """Batch sizes and commit rates since start-up. Fallback commits after a failed batch count as commits."""
+        with self._lock:
+            uptime = time.monotonic() - self._started_at
+            return {
+                "window_ms": self.window * 1000,
+                "batches": self._batches,
+                "writes": self._writes,
+                "commits": self._commits,
+                "failed_batches": self._failed_batches,
+                "mean_batch_size": round(self._batched_writes / self._batches, 2) if self._batches else 0.0,
+                "largest_batch": self._largest_batch,
+                "commits_per_second": round(self._commits / uptime, 2) if uptime else 0.0,
+                "writes_per_commit": round(self._writes / self._commits, 2) if self._commits else 0.0,
+                "batch_sizes": {f"<={bound}": count for bound, count in zip(BATCH_SIZE_BUCKETS, self._histogram)},
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Commit anything still queued and stop the batcher thread."""
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            self._queue.put(None)
+            thread.join(timeout)
+        self._thread = None
+
+
+write_batcher = WriteBatcher()
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Background job CRUD operations for DevSaver."""
+
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from app.core.database import get_session
+from app.models.job import Job
+from app.schemas.job import Job as JobSchema
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JOBS = Job.__table__
+
+
+def _utcnow() -> datetime:
+    """Naive UTC, the way datetimes are stored."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+def enqueue_job(
+        name: str,
+        payload: Optional[dict] = None,
+        idempotency_key: Optional[str] = None,
+        delay: float = 0,
+        max_attempts: int = 5,
+        session: Optional[Session] = None,
+) -> int:
+    """Queue a job and return its id. A job still queued or running under the same idempotency key is returned instead.
+
+    A key is released when its job finishes, so later work under a reused key (e.g. a recycled resource id) is queued.
+    Pass `session` to enqueue inside the caller's transaction, so the job exists only if the write it follows commits.
+    """
+    stmt = (
+        sqlite_insert(JOBS)
+        .values(
+            name=name,
+            payload=json.dumps(payload or {}),
+            idempotency_key=idempotency_key,
+            status=QUEUED,
+            attempts=0,
+            max_attempts=max_attempts,
+            run_at=_utcnow() + timedelta(seconds=delay),
+            created_at=_utcnow(),
+        )
+        .on_conflict_do_nothing(index_elements=["idempotency_key"])
+        .returning(JOBS.c.id)
+    )
+    if session is not None:
+        return _insert_job(session, stmt, idempotency_key)
+    with get_session() as session:
+        return _insert_job(session, stmt, idempotency_key)
+
+def enqueue_jobs(name: str, jobs: list[tuple[dict, Optional[str]]], max_attempts: int = 5) -> int:
+    """Queue many jobs of one kind as (payload, idempotency_key) pairs in a single transaction. Returns the number added."""
+    if not jobs:
+        return 0
+    now = _utcnow()
+    rows = [
+        {"name": name, "payload": json.dumps(payload), "idempotency_key": key, "status": QUEUED,
+         "attempts": 0, "max_attempts": max_attempts, "run_at": now, "created_at": now}
+        for payload, key in jobs
+    ]
+    stmt = sqlite_insert(JOBS).on_conflict_do_nothing(index_elements=["idempotency_key"])
+    with get_session() as session:
+        return session.execute(stmt, rows).rowcount
+
+def _insert_job(session: Session, stmt, idempotency_key: Optional[str]) -> int:
+    job_id = session.execute(stmt).scalar()
+    if job_id is None:
+        job_id = session.execute(select(JOBS.c.id).where(JOBS.c.idempotency_key == idempotency_key)).scalar_one()
+    return job_id
+
+def claim_job(worker_id: str, names: Optional[list[str]] = None) -> Optional[JobSchema]:
+    """Atomically mark the oldest due queued job as running for `worker_id` and return it."""
+    now = _utcnow()
+    due = select(JOBS.c.id).where(JOBS.c.status == QUEUED, JOBS.c.run_at <= now)
+    if names:
+        due = due.where(JOBS.c.name.in_(names))
+    next_id = due.order_by(JOBS.c.run_at, JOBS.c.id).limit(1).scalar_subquery()
+    stmt = (
+        update(JOBS)
+        .where(JOBS.c.id == next_id, JOBS.c.status == QUEUED)
+        .values(status=RUNNING, locked_by=worker_id, locked_at=now, attempts=JOBS.c.attempts + 1)
+        .returning(*JOBS.c)
+    )
+    with get_session() as session:
+        row = session.execute(stmt).mappings().first()
+        return JobSchema.model_validate(dict(row)) if row else None
+
+def complete_job(job_id: int, worker_id: str) -> bool:
+    """Mark a job running under `worker_id` as done and release its idempotency key.
+
+    Returns False, leaving the job alone, when `worker_id` no longer holds it because its lease passed to another run.
+    """
+    with get_session() as session:
+        return session.execute(
+            update(JOBS).where(JOBS.c.id == job_id, JOBS.c.status == RUNNING, JOBS.c.locked_by == worker_id)
+            .values(status=DONE, finished_at=_utcnow(), locked_by=None, last_error=None, idempotency_key=None)
+        ).rowcount > 0
+
+def fail_job(job_id: int, worker_id: str, error: str, retry_in: Optional[float]) -> Optional[str]:
+    """Record a failed attempt. Requeue it after `retry_in` seconds, or give up when that is None. Returns the new status.
+
+    A job given up on releases its idempotency key, so the same work can be queued afresh.
+    Returns None, leaving the job alone, when `worker_id` no longer holds it because its lease passed to another run.
+    """
+    now = _utcnow()
+    if retry_in is None:
+        values = {"status": FAILED, "finished_at": now, "idempotency_key": None}
+    else:
+        values = {"status": QUEUED, "run_at": now + timedelta(seconds=retry_in)}
+    with get_session() as session:
+        updated = session.execute(
+            update(JOBS).where(JOBS.c.id == job_id, JOBS.c.status == RUNNING, JOBS.c.locked_by == worker_id)
+            .values(locked_by=None, last_error=error[:2000], **values)
+        ).rowcount
+    return values["status"] if updated else None
+
+def set_job_progress(job_id: int, progress: dict) -> None:
+    """Store a running job's progress report, and renew its lease so long jobs are not reclaimed."""
+    with get_session() as session:
+        session.execute(
+            update(JOBS).where(JOBS.c.id == job_id, JOBS.c.status == RUNNING)
+            .values(progress=json.dumps(progress), locked_at=_utcnow())
+        )
+
+def requeue_stale_jobs(lease_seconds: float) -> int:
+    """Reclaim running jobs whose worker has held them longer than the lease. Returns the number reclaimed.
+
+    Jobs with attempts left go back on the queue; those that used their last attempt fail and release their idempotency key.
+    """
+    now = _utcnow()
+    stale = (JOBS.c.status == RUNNING, JOBS.c.locked_at < now - timedelta(seconds=lease_seconds))
+    with get_session() as session:
+        failed = session.execute(
+            update(JOBS).where(*stale, JOBS.c.attempts >= JOBS.c.max_attempts)
+            .values(status=FAILED, finished_at=now, locked_by=None, idempotency_key=None,
+                    last_error="Lease expired on the last attempt; worker presumed dead")
+        ).rowcount
+        requeued = session.execute(
+            update(JOBS).where(*stale)
+            .values(status=QUEUED, locked_by=None, last_error="Lease expired; worker presumed dead")
+        ).rowcount
+    return failed + requeued
+
+def retry_failed_job(job_id: int) -> bool:
+    """Give a failed job a fresh set of attempts."""
+    with get_session() as session:
+        return session.execute(
+            update(JOBS).where(JOBS.c.id == job_id, JOBS.c.status == FAILED)
+            .values(status=QUEUED, attempts=0, run_at=_utcnow(), finished_at=None)
+        ).rowcount > 0
+
+def release_finished_keys() -> int:
+    """Clear the idempotency keys still held by finished jobs, as stored before keys were released on finishing."""
+    with get_session() as session:
+        return session.execute(
+            update(JOBS).where(JOBS.c.status.in_([DONE, FAILED]), JOBS.c.idempotency_key.is_not(None))
+            .values(idempotency_key=None)
+        ).rowcount
+
+def get_job(job_id: int) -> Optional[JobSchema]:
+    """Retrieve a job by its ID."""
+    with get_session() as session:
+        job = session.get(Job, job_id)
+        return JobSchema.model_validate(job) if job else None
+
+def list_jobs(status: Optional[str] = None, limit: int = 50) -> list[JobSchema]:
+    """List the most recent jobs, optionally of one status."""
+    stmt = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status:
+        stmt = stmt.where(Job.status == status)
+    with get_session() as session:
+        return [JobSchema.model_validate(job) for job in session.scalars(stmt)]
+
+def count_jobs_by_status() -> dict[str, int]:
+    """Count jobs per status."""
+    with get_session() as session:
+        return dict(session.execute(select(JOBS.c.status, func.count()).group_by(JOBS.c.status)).all())
+
+def delete_finished_jobs(older_than_seconds: float) -> int:
+    """Delete jobs that finished successfully before the cutoff. Failed jobs are kept for inspection."""
+    cutoff = _utcnow() - timedelta(seconds=older_than_seconds)
+    with get_session() as session:
+        return session.execute(JOBS.delete().where(JOBS.c.status == DONE, JOBS.c.finished_at < cutoff)).rowcount
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Extracted media metadata CRUD operations for DevSaver."""
+
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.database import get_session
+from app.models.resource import Resource
+from app.models.resource_media import ResourceMedia
+from app.schemas.resource_media import ResourceMedia as ResourceMediaSchema
+
+
+def get_media(resource_id: int) -> Optional[ResourceMediaSchema]:
+    """Retrieve the extracted metadata of a resource, if any."""
+    with get_session() as session:
+        media = session.get(ResourceMedia, resource_id)
+        return ResourceMediaSchema.model_validate(media) if media else None
+
+def get_media_by_hash(content_hash: str) -> Optional[ResourceMediaSchema]:
+    """Retrieve metadata already extracted from a file with the same content, if any."""
+    with get_session() as session:
+        media = session.scalars(select(ResourceMedia).where(ResourceMedia.content_hash == content_hash).limit(1)).first()
+        return ResourceMediaSchema.model_validate(media) if media else None
+
+def save_media(resource_id: int, **values) -> ResourceMediaSchema:
+    """Insert or replace the extracted metadata of a resource."""
+    stmt = sqlite_insert(ResourceMedia).values(resource_id=resource_id, **values)
+    stmt = stmt.on_conflict_do_update(index_elements=["resource_id"], set_={
+        column: stmt.excluded[column] for column in values
+    }).returning(ResourceMedia)
+    with get_session() as session:
+        return ResourceMediaSchema.model_validate(session.scalars(stmt).one())
+
+def get_uploads_without_media() -> list[tuple[int, str, str]]:
+    """(id, original_filename, url) of uploaded resources that have no extracted metadata yet."""
+    stmt = (
+        select(Resource.id, Resource.original_filename, Resource.url)
+        .outerjoin(ResourceMedia, ResourceMedia.resource_id == Resource.id)
+        .where(Resource.original_filename.is_not(None), ResourceMedia.resource_id.is_(None))
+    )
+    with get_session() as session:
+        return [tuple(row) for row in session.execute(stmt)]
+
+def get_existing_thumbnails(names: list[str]) -> set[str]:
+    """Return which of the given thumbnail names some resource's metadata points at."""
+    if not names:
+        return set()
+    with get_session() as session:
+        return set(session.scalars(select(ResourceMedia.thumbnail).where(ResourceMedia.thumbnail.in_(names)).distinct()))
@@ -1,11 +1,56 @@
 #!/usr/bin/env python3
 """Resource CRUD operations for DevSaver."""
 
+from datetime import datetime
+from sqlalchemy import bindparam, delete, func, or_, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
 from app.core.database import get_session
 from app.models.resource import Resource
+from app.models.resource_media import ResourceMedia
+from app.models.user import User
 from typing import Optional
-from app.schemas.resource import Resource as ResourceSchema
- 
+from app.schemas.resource import Resource as ResourceSchema, ResourceRow
+from app.core.events import change_feed, ResourceEvent, CREATED, UPDATED, DELETED, RESET
+from app.core.write_batcher import write_batcher
+from app.utils.urls import URL_KEY_PREFIX, resource_key, url_hash
+
+RESOURCE_ROW_COLUMNS = tuple(getattr(Resource, field) for field in ResourceRow._fields)
+
+# Resources of soft-deleted users stay in the table until their purge job removes them
+OWNER_ACTIVE = Resource.user_id.not_in(select(User.id).where(User.deleted_at.is_not(None)))
+
+
+class DuplicateResource(ValueError):
+    """A write would give a user a second resource with the same canonical URL or uploaded file name."""
+
+    def __init__(self, existing: ResourceSchema):
+        super().__init__("Resource already exists!")
+        self.existing = existing
+
+
+def _publish(action: str, resource: ResourceSchema) -> None:
+    """Announce a committed write on the change feed."""
+    row = ResourceRow(*(getattr(resource, field) for field in ResourceRow._fields))
+    change_feed.publish(ResourceEvent(action, resource.user_id, resource.id, row, resource.description))
+
+
+def _construct_resources(session: Session, *criteria, order_by=None, offset: int = None, limit: int = None) -> list[ResourceSchema]:
+    """Select plain column rows and build schemas without ORM instances.
+
+    Rows come straight from our own table, so model_construct skips re-validating them.
+    """
+    stmt = select(Resource.__table__).where(*criteria)
+    if order_by is not None:
+        stmt = stmt.order_by(order_by)
+    if offset:
+        stmt = stmt.offset(offset)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    construct = ResourceSchema.model_construct
+    return [construct(**row) for row in session.connection().execute(stmt).mappings()]
+
 def create_resource(
         title: str,
         type: str,
@@ -16,30 +61,59 @@ def create_resource(
         url: str = None,
         original_filename: Optional[str] = None,
 ) -> ResourceSchema:
-    """Create a new resource in the database."""
-    with get_session() as session:
-        new_resource = Resource(            
-            title=title,
-            description=description,
-            tags=tags,
-            type=type,
-            source=source,
-            url=url,
-            original_filename=original_filename,
-            user_id=user_id,
-        )
-        session.add(new_resource)
-        session.commit() # forces INSERT so id is assigned
-        session.refresh(new_resource) # reloads from db
+    """Create a new resource in the database.
+
+    The duplicate check is the insert itself: ON CONFLICT on the unique (user_id, url_hash) index skips it, and
+    DuplicateResource carries the resource the user already has, so concurrent uploads cannot both get in.
+    """
+    key = resource_key(url, original_filename)
+    stmt = sqlite_insert(Resource).values(
+        title=title, description=description, tags=tags, type=type, source=source, url=url,
+        original_filename=original_filename, user_id=user_id, url_key=key, url_hash=url_hash(key),
+    ).on_conflict_do_nothing(index_elements=["user_id", "url_hash"]).returning(Resource.__table__)
+    with get_session() as session:
+        row = session.execute(stmt).mappings().first()
+        existing = None if row else _get_resource_by_key(session, user_id, key)
+    if existing is not None:
+        raise DuplicateResource(existing)
+    created = ResourceSchema.model_validate(dict(row))
+
+    _publish(CREATED, created)
+    return created
+
+def _get_resource_by_key(session: Session, user_id: int, key: str) -> Optional[ResourceSchema]:
+    resource = session.scalars(select(Resource).where(Resource.user_id == user_id, Resource.url_hash == url_hash(key))).first()
+    return ResourceSchema.model_validate(resource) if resource else None
 
-        return ResourceSchema.model_validate(new_resource)
-    
 def get_resources_by_user(user_id: int) -> list[ResourceSchema]:
     """Retrieve all resources for a given user."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
-    
+        return _construct_resources(session, Resource.user_id == user_id)
+
+def get_resource_rows(user_id: int, resource_type: Optional[str] = None, tags: Optional[list[str]] = None) -> list[ResourceRow]:
+    """Retrieve compact list rows for a user, optionally filtered by type or by any of several tags."""
+    stmt = select(*RESOURCE_ROW_COLUMNS).where(Resource.user_id == user_id).order_by(Resource.id)
+    if resource_type:
+        stmt = stmt.where(Resource.type == resource_type)
+    if tags:
+        stmt = stmt.where(or_(*(Resource.tags.contains(tag) for tag in tags)))
+    with get_session() as session:
+        return list(map(ResourceRow._make, session.connection().execute(stmt)))
+
+def get_resource_validator(user_id: Optional[int] = None) -> tuple[int, Optional[datetime]]:
+    """Return (count, latest updated_at) of a user's resources, or of all resources when user_id is None.
+
+    Together they change on every insert, edit and delete, so they validate cached listings in one indexed query.
+    """
+    stmt = select(func.count(Resource.id), func.max(Resource.updated_at))
+    if user_id is not None:
+        stmt = stmt.where(Resource.user_id == user_id)
+    else:
+        stmt = stmt.where(OWNER_ACTIVE)
+    with get_session() as session:
+        count, latest = session.connection().execute(stmt).one()
+        return count, latest
+
 def update_resource(resource_id: int, **kwargs) -> Optional[ResourceSchema]:
     """Update an existing resource."""
     with get_session() as session:
@@ -48,19 +122,42 @@ def update_resource(resource_id: int, **kwargs) -> Optional[ResourceSchema]:
             for key, value in kwargs.items():
                 setattr(resource, key, value)
             session.add(resource)
-            session.commit() 
+            try:
+                session.commit()
+            except IntegrityError:
+                # Moved onto the URL or file name of another of the user's resources
+                session.rollback()
+                existing = _get_resource_by_key(session, resource.user_id, resource_key(kwargs.get("url", resource.url), kwargs.get("original_filename", resource.original_filename)))
+                if existing is None:
+                    raise
+                raise DuplicateResource(existing)
             session.refresh(resource) # reloads from db
-            return ResourceSchema.model_validate(resource)
-        return None
+            updated = ResourceSchema.model_validate(resource)
+        else:
+            return None
+
+    _publish(UPDATED, updated)
+    return updated
     
-def delete_resource(resource_id: int) -> bool:
-    """Delete a resource from the database."""
+def delete_resource(resource_id: int) -> Optional[ResourceSchema]:
+    """Delete a resource from the database. Returns the deleted resource, or None if it did not exist."""
     with get_session() as session:
         resource = session.query(Resource).filter(Resource.id == resource_id).first()
-        if resource:
-            session.delete(resource)
-            return True
-        return False
+        if not resource:
+            return None
+        deleted = ResourceSchema.model_validate(resource)
+        session.execute(delete(ResourceMedia).where(ResourceMedia.resource_id == resource_id))
+        session.delete(resource)
+
+    change_feed.publish(ResourceEvent(DELETED, deleted.user_id, resource_id))
+    return deleted
+    
+def get_existing_urls(urls: list[str]) -> set[str]:
+    """Return which of the given URLs some resource points at, in one indexed lookup."""
+    if not urls:
+        return set()
+    with get_session() as session:
+        return set(session.execute(select(Resource.url).where(Resource.url.in_(urls)).distinct()).scalars())
     
 def get_resource_by_id(resource_id: int) -> Optional[ResourceSchema]:
     """Retrieve a resource by its ID."""
@@ -71,14 +168,12 @@ def get_resource_by_id(resource_id: int) -> Optional[ResourceSchema]:
 def get_resources_by_tag(user_id: int, tag: str) -> list[ResourceSchema]:
     """Retrieve resources for a user filtered by a specific tag."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id, Resource.tags.contains(tag)).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, Resource.tags.contains(tag))
     
 def get_resources_by_type(user_id: int, resource_type: str) -> list[ResourceSchema]:
     """Retrieve resources for a user filtered by a specific type."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id, Resource.type == resource_type).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, Resource.type == resource_type)
     
 def get_resource_by_original_filename(user_id: int, original_filename: str) -> Optional[ResourceSchema]:
     """Retrieve a resource by its original filename."""
@@ -87,86 +182,138 @@ def get_resource_by_original_filename(user_id: int, original_filename: str) -> O
         return ResourceSchema.model_validate(resource) if resource else None
     
 def get_resource_by_url(user_id: int, url: str) -> Optional[ResourceSchema]:
-    """Retrieve a resource by its URL."""
+    """Retrieve a resource by its URL, compared in identity_url form through the (user_id, url_hash) index."""
     with get_session() as session:
-        resource = session.query(Resource).filter(Resource.user_id == user_id, Resource.url == url).first()
-        print("Resource crud: ", resource)
-        return ResourceSchema.model_validate(resource) if resource else None
+        return _get_resource_by_key(session, user_id, resource_key(url, None))
+
+def backfill_url_hashes() -> int:
+    """Fill in the duplicate key of resources stored before it existed, or recompute one stored in an older form
+    (a link key without the "url:" prefix). Returns how many were filled in.
+
+    The second and later copies of a URL or file already saved twice by a user are left without one (UPDATE OR
+    IGNORE), so the unique index can still be built; the oldest copy keeps the key.
+    """
+    with get_session() as session:
+        session.execute(
+            update(Resource)
+            .where(Resource.url_key.is_not(None), Resource.url_key.not_like("file:%"), Resource.url_key.not_like(f"{URL_KEY_PREFIX}%"))
+            .values(url_key=None, url_hash=None)
+            .execution_options(synchronize_session=False)
+        )
+        rows = session.execute(
+            select(Resource.id, Resource.url, Resource.original_filename).where(Resource.url_hash.is_(None)).order_by(Resource.id)
+        ).all()
+        if not rows:
+            return 0
+        keys = [(resource_id, resource_key(url, original_filename)) for resource_id, url, original_filename in rows]
+        # Rows are updated oldest first, so the oldest copy of a duplicate is the one that gets the key
+        stmt = (
+            update(Resource).prefix_with("OR IGNORE").where(Resource.id == bindparam("resource_id"))
+            .values(url_key=bindparam("key"), url_hash=bindparam("hash"))
+            .execution_options(synchronize_session=False)
+        )
+        connection = session.connection()
+        connection.execute(stmt, [{"resource_id": resource_id, "key": key, "hash": url_hash(key)} for resource_id, key in keys])
+        remaining = connection.execute(select(func.count()).where(Resource.url_hash.is_(None))).scalar()
+        return len(rows) - remaining
     
 def get_starred_resources(user_id: int) -> list[ResourceSchema]:
     """Retrieve all starred resources for a given user."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id, Resource.starred == True).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, Resource.starred == True)
     
 def get_unread_resources(user_id: int) -> list[ResourceSchema]:
     """Retrieve all unread resources for a given user."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id, Resource.read_status == False).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, Resource.read_status == False)
     
-def mark_resource_as_read(resource_id: int) -> Optional[ResourceSchema]:
-    """Mark a resource as read."""
-    with get_session() as session:
-        resource = session.query(Resource).filter(Resource.id == resource_id).first()
-        if resource:
-            resource.read_status = True
-            session.add(resource)
-            return ResourceSchema.model_validate(resource)
+def _owned_resource(session: Session, resource_id: int, user_id: Optional[int]) -> Optional[Resource]:
+    """Load a resource, or None when it is missing or belongs to someone other than `user_id` (if given)."""
+    resource = session.get(Resource, resource_id)
+    if resource is None or (user_id is not None and resource.user_id != user_id):
         return None
-    
-def toggle_star_resource(resource_id: int) -> Optional[ResourceSchema]:
-    """Toggle the starred status of a resource."""
-    with get_session() as session:
-        resource = session.query(Resource).filter(Resource.id == resource_id).first()
-        if resource:
-            resource.starred = not resource.starred
-            session.add(resource)
-            return ResourceSchema.model_validate(resource)
+    return resource
+
+def _apply_mark_read(session: Session, resource_id: int, user_id: Optional[int]) -> Optional[ResourceSchema]:
+    resource = _owned_resource(session, resource_id, user_id)
+    if resource is None:
         return None
-    
-def search_resources(user_id: int, query: str) -> list[ResourceSchema]:
-    """Search resources for a user by title or description."""
-    with get_session() as session:
-        resources = session.query(Resource).filter(
-            Resource.user_id == user_id,
-            (Resource.title.contains(query) | Resource.description.contains(query))
-        ).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+    resource.read_status = True
+    session.flush() # fills in the new updated_at
+    return ResourceSchema.model_validate(resource)
+
+def _apply_toggle_star(session: Session, resource_id: int, user_id: Optional[int]) -> Optional[ResourceSchema]:
+    resource = _owned_resource(session, resource_id, user_id)
+    if resource is None:
+        return None
+    resource.starred = not resource.starred
+    session.flush() # fills in the new updated_at
+    return ResourceSchema.model_validate(resource)
+
+def mark_resource_as_read(resource_id: int, user_id: Optional[int] = None) -> Optional[ResourceSchema]:
+    """Mark a resource as read. Concurrent toggles are group-committed by the write batcher."""
+    updated = write_batcher.execute(_apply_mark_read, resource_id, user_id)
+    if updated:
+        _publish(UPDATED, updated)
+    return updated
+    
+def toggle_star_resource(resource_id: int, user_id: Optional[int] = None) -> Optional[ResourceSchema]:
+    """Toggle the starred status of a resource. Concurrent toggles are group-committed by the write batcher."""
+    updated = write_batcher.execute(_apply_toggle_star, resource_id, user_id)
+    if updated:
+        _publish(UPDATED, updated)
+    return updated
     
 def get_recent_resources(user_id: int, limit: int = 10) -> list[ResourceSchema]:
     """Retrieve the most recent resources for a given user."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id).order_by(Resource.created_at.desc()).limit(limit).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, order_by=Resource.created_at.desc(), limit=limit)
     
 def get_resources_by_date_range(user_id: int, start_date: str, end_date: str) -> list[ResourceSchema]:
     """Retrieve resources for a user within a specific date range."""
     with get_session() as session:
-        resources = session.query(Resource).filter(
+        return _construct_resources(
+            session,
             Resource.user_id == user_id,
             Resource.created_at >= start_date,
             Resource.created_at <= end_date
-        ).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        )
     
 def get_resources_by_source(user_id: int, source: str) -> list[ResourceSchema]:   
     """Retrieve resources for a user filtered by a specific source."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id, Resource.source == source).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, Resource.source == source)
     
 def get_all_resources() -> list[ResourceSchema]:
-    """Retrieve all resources in the database."""
+    """Retrieve all resources in the database, except those of deleted users."""
     with get_session() as session:
-        resources = session.query(Resource).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, OWNER_ACTIVE)
     
 def delete_resources_by_user(user_id: int) -> int:
     """Delete all resources for a given user. Returns the number of deleted resources."""
     with get_session() as session:
+        session.execute(delete(ResourceMedia).where(ResourceMedia.resource_id.in_(select(Resource.id).where(Resource.user_id == user_id))))
         deleted_count = session.query(Resource).filter(Resource.user_id == user_id).delete()
-        return deleted_count
+
+    if deleted_count:
+        change_feed.publish(ResourceEvent(RESET, user_id))
+    return deleted_count
+    
+def delete_resources_chunk(user_id: int, limit: int = 500) -> list[tuple[int, str, Optional[str]]]:
+    """Delete up to `limit` of a user's resources in one short transaction. Returns (id, url, original_filename) of each."""
+    chunk = select(Resource.id).where(Resource.user_id == user_id).limit(limit).scalar_subquery()
+    stmt = (
+        delete(Resource.__table__)
+        .where(Resource.id.in_(chunk))
+        .returning(Resource.id, Resource.url, Resource.original_filename)
+    )
+    with get_session() as session:
+        rows = [tuple(row) for row in session.execute(stmt)]
+        session.execute(delete(ResourceMedia).where(ResourceMedia.resource_id.in_([row[0] for row in rows])))
+
+    for resource_id, _, _ in rows:
+        change_feed.publish(ResourceEvent(DELETED, user_id, resource_id))
+    return rows
     
 def count_resources_by_user(user_id: int) -> int:
     """Count the number of resources for a given user."""
@@ -214,19 +361,28 @@ def bulk_update_resources(resource_ids: list[int], **kwargs) -> int:
             for key, value in kwargs.items():
                 setattr(resource, key, value)
             session.add(resource)
-        return len(resources)
+        session.commit()
+        updated = _construct_resources(session, Resource.id.in_(resource_ids)) if resources else []
+
+    for resource in updated:
+        _publish(UPDATED, resource)
+    return len(updated)
     
 def bulk_delete_resources(resource_ids: list[int]) -> int:
     """Bulk delete multiple resources. Returns the number of deleted resources."""
     with get_session() as session:
+        owners = session.query(Resource.id, Resource.user_id).filter(Resource.id.in_(resource_ids)).all()
+        session.execute(delete(ResourceMedia).where(ResourceMedia.resource_id.in_(resource_ids)))
         deleted_count = session.query(Resource).filter(Resource.id.in_(resource_ids)).delete(synchronize_session='fetch')
-        return deleted_count
+
+    for resource_id, user_id in owners:
+        change_feed.publish(ResourceEvent(DELETED, user_id, resource_id))
+    return deleted_count
     
 def get_resources_paginated(user_id: int, page: int = 1, page_size: int = 10) -> list[ResourceSchema]:
     """Retrieve resources for a user with pagination."""
     with get_session() as session:
-        resources = session.query(Resource).filter(Resource.user_id == user_id).offset((page - 1) * page_size).limit(page_size).all()
-        return [ResourceSchema.model_validate(res) for res in resources] if resources else []
+        return _construct_resources(session, Resource.user_id == user_id, offset=(page - 1) * page_size, limit=page_size)
     
 def count_resources_by_tag(user_id: int, tag: str) -> int:
     """Count the number of resources for a user filtered by a specific tag."""
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Saved search (smart collection) CRUD operations for DevSaver."""
+
+from typing import Optional
+from sqlalchemy import delete, func, insert, select, text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.database import get_session
+from app.crud.resource_crud import RESOURCE_ROW_COLUMNS
+from app.models.resource import Resource
+from app.models.saved_search import SavedSearch, SavedSearchMember, SavedSearchTag, matches_search
+from app.schemas.resource import ResourceRow
+from app.schemas.saved_search import SavedSearch as SavedSearchSchema
+
+# Members of a new saved search, found with the same condition the triggers apply to each write afterwards
+POPULATE_MEMBERS = text(f"""
+    INSERT INTO saved_search_members (search_id, resource_id)
+    SELECT s.id, r.id FROM saved_searches s JOIN resources r ON r.user_id = s.user_id
+    WHERE s.id = :search_id AND {matches_search("r")}
+""")
+
+
+def create_saved_search(
+        user_id: int,
+        name: str,
+        type: Optional[str] = None,
+        tags: Optional[list[str]] = None,
+        read_status: Optional[bool] = None,
+        starred: Optional[bool] = None,
+) -> Optional[SavedSearchSchema]:
+    """Save a search and materialize its current members in one transaction. None if the name is taken."""
+    stmt = (
+        sqlite_insert(SavedSearch)
+        .values(user_id=user_id, name=name, type=type, tags=", ".join(tags) if tags else None,
+                read_status=read_status, starred=starred, member_count=0)
+        .on_conflict_do_nothing()
+        .returning(SavedSearch.id)
+    )
+    with get_session() as session:
+        search_id = session.execute(stmt).scalar()
+        if search_id is None:
+            return None
+        if tags:
+            session.execute(insert(SavedSearchTag), [{"search_id": search_id, "tag": tag.lower()} for tag in dict.fromkeys(tags)])
+        session.execute(POPULATE_MEMBERS, {"search_id": search_id})
+        return SavedSearchSchema.model_validate(session.get(SavedSearch, search_id))
+
+def get_saved_searches(user_id: int) -> list[SavedSearchSchema]:
+    """Retrieve a user's saved searches with their member counts, by name."""
+    with get_session() as session:
+        searches = session.scalars(select(SavedSearch).where(SavedSearch.user_id == user_id).order_by(SavedSearch.name))
+        return [SavedSearchSchema.model_validate(search) for search in searches]
+
+def get_saved_search(search_id: int, user_id: int) -> Optional[SavedSearchSchema]:
+    """Retrieve one of a user's saved searches."""
+    with get_session() as session:
+        search = session.scalars(select(SavedSearch).where(SavedSearch.id == search_id, SavedSearch.user_id == user_id)).first()
+        return SavedSearchSchema.model_validate(search) if search else None
+
+def get_member_rows(search_id: int) -> list[ResourceRow]:
+    """Retrieve the list rows of a saved search's members: a range scan of its membership, joined by primary key."""
+    stmt = (
+        select(*RESOURCE_ROW_COLUMNS)
+        .join(SavedSearchMember, SavedSearchMember.resource_id == Resource.id)
+        .where(SavedSearchMember.search_id == search_id)
+        .order_by(SavedSearchMember.resource_id)
+    )
+    with get_session() as session:
+        return list(map(ResourceRow._make, session.connection().execute(stmt)))
+
+def delete_saved_search(search_id: int, user_id: int) -> bool:
+    """Delete one of a user's saved searches; its membership goes with it. Returns True if it existed."""
+    with get_session() as session:
+        return session.execute(delete(SavedSearch).where(SavedSearch.id == search_id, SavedSearch.user_id == user_id)).rowcount > 0
+
+def rebuild_members() -> int:
+    """Recompute the membership and counts of every saved search from scratch. Returns the number of memberships.
+
+    The triggers keep membership current on every write; this repairs a database edited with them missing.
+    """
+    with get_session() as session:
+        session.execute(delete(SavedSearchMember))
+        session.execute(update(SavedSearch).values(member_count=0))
+        search_ids = session.execute(select(SavedSearch.id)).scalars().all()
+        if search_ids:
+            session.execute(POPULATE_MEMBERS, [{"search_id": search_id} for search_id in search_ids])
+        return session.execute(select(func.count()).select_from(SavedSearchMember)).scalar()
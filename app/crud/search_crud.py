@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Full-text search CRUD operations for DevSaver."""
+
+import re
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import column, func, literal_column, select, table, text, update
+from app.core.database import get_session
+from app.models.resource import Resource
+from app.models.resource_search import RESOURCE_SEARCH
+from app.schemas.resource import Resource as ResourceSchema
+
+# bm25 column weights: a hit in the title counts most, one deep inside an uploaded document least
+SEARCH_WEIGHTS = {"title": 10.0, "description": 4.0, "tags": 6.0, "body": 1.0}
+SEARCH_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+SEARCH = table(RESOURCE_SEARCH, column("rowid"), column("body"))
+SEARCH_TABLE = literal_column(RESOURCE_SEARCH)  # FTS5 auxiliary functions take the table itself as first argument
+RESOURCE_COLUMNS = [c.name for c in Resource.__table__.columns]
+
+
+def fts_query(query: str) -> Optional[str]:
+    """Turn free text into an FTS5 query: every word must match, as a prefix. None when there are no words.
+
+    Words are quoted, so user input can never be read as FTS5 syntax (NEAR, column filters, unbalanced quotes).
+    """
+    tokens = SEARCH_TOKEN_RE.findall(query)
+    if not tokens:
+        return None
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def set_resource_text(resource_id: int, body: Optional[str], url: str) -> bool:
+    """Store the text extracted from the document at `url`. Returns False if the resource is gone or now points elsewhere.
+
+    The resource's updated_at is bumped with it, so list validators (count, max(updated_at)) change and cached
+    search results that could now include the resource are revalidated.
+    """
+    with get_session() as session:
+        indexed = session.execute(
+            text(f"""UPDATE {RESOURCE_SEARCH} SET body = :body WHERE rowid = :id
+                     AND EXISTS (SELECT 1 FROM resources WHERE id = :id AND url = :url)"""),
+            {"body": body, "id": resource_id, "url": url}
+        ).rowcount > 0
+        if indexed:
+            session.execute(
+                update(Resource).where(Resource.id == resource_id)
+                .values(updated_at=datetime.now(timezone.utc)).execution_options(synchronize_session=False)
+            )
+        return indexed
+
+def get_unindexed_documents() -> list[tuple[int, str, str]]:
+    """(id, original_filename, url) of uploaded resources whose document text has not been indexed."""
+    stmt = (
+        select(Resource.id, Resource.original_filename, Resource.url)
+        .join_from(Resource.__table__, SEARCH, SEARCH.c.rowid == Resource.id)
+        .where(Resource.original_filename.is_not(None), SEARCH.c.body.is_(None))
+    )
+    with get_session() as session:
+        return [tuple(row) for row in session.execute(stmt)]
+
+def get_resource_text(resource_id: int) -> Optional[str]:
+    """The indexed document text of a resource, if any."""
+    with get_session() as session:
+        return session.execute(
+            text(f"SELECT body FROM {RESOURCE_SEARCH} WHERE rowid = :id"), {"id": resource_id}
+        ).scalar()
+
+def search_resources(user_id: int, query: str, limit: int = 50) -> list[tuple[ResourceSchema, str]]:
+    """A user's resources matching a query, best first by bm25, each with a snippet of the matching text."""
+    match = fts_query(query)
+    if match is None:
+        return []
+    weights = ", ".join(str(weight) for weight in SEARCH_WEIGHTS.values())
+    stmt = (
+        select(Resource.__table__, func.snippet(SEARCH_TABLE, -1, "[", "]", "…", 12).label("snippet"))
+        .join_from(Resource.__table__, SEARCH, SEARCH.c.rowid == Resource.id)
+        .where(text(f"{RESOURCE_SEARCH} MATCH :match"), Resource.user_id == user_id)
+        .order_by(text(f"bm25({RESOURCE_SEARCH}, {weights})"))
+        .limit(limit)
+    )
+    with get_session() as session:
+        rows = session.connection().execute(stmt, {"match": match}).mappings().all()
+    construct = ResourceSchema.model_construct
+    return [(construct(**{key: row[key] for key in RESOURCE_COLUMNS}), row["snippet"]) for row in rows]
+
+def get_index_rows(user_id: int, fields: tuple[str, ...]) -> list[tuple]:
+    """(id, *fields) of every resource of a user in id order, for building in-memory search indexes."""
+    stmt = (
+        select(Resource.id, *(getattr(Resource, field) for field in fields))
+        .where(Resource.user_id == user_id)
+        .order_by(Resource.id)
+    )
+    with get_session() as session:
+        return [tuple(row) for row in session.connection().execute(stmt)]
+
+def get_resources_in_order(user_id: int, resource_ids: list[int]) -> list[ResourceSchema]:
+    """A user's resources with the given ids, in the order given. Ids that are gone or not the user's are skipped."""
+    if not resource_ids:
+        return []
+    stmt = select(Resource.__table__).where(Resource.user_id == user_id, Resource.id.in_(resource_ids))
+    with get_session() as session:
+        rows = {row.id: row for row in session.connection().execute(stmt)}
+    construct = ResourceSchema.model_construct
+    return [construct(**rows[resource_id]._mapping) for resource_id in resource_ids if resource_id in rows]
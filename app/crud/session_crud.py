@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Login session CRUD operations for DevSaver."""
+
+from app.core.database import get_session
+from app.models.session import UserSession
+from app.models.user import User
+from typing import Optional
+from datetime import datetime, timezone
+from app.schemas.user import User as UserSchema
+
+def create_user_session(session_id: str, user_id: int, expires_at: datetime) -> None:
+    """Store a new login session."""
+    with get_session() as session:
+        session.add(UserSession(id=session_id, user_id=user_id, expires_at=expires_at))
+
+def get_session_user(session_id: str) -> Optional[tuple[UserSchema, datetime]]:
+    """Retrieve the user behind a live session and the session expiry in one query."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with get_session() as session:
+        row = (
+            session.query(User, UserSession.expires_at)
+            .join(UserSession, UserSession.user_id == User.id)
+            .filter(UserSession.id == session_id, UserSession.expires_at > now, User.deleted_at.is_(None))
+            .first()
+        )
+        return (UserSchema.model_validate(row[0]), row[1]) if row else None
+
+def delete_user_session(session_id: str) -> bool:
+    """Delete one login session."""
+    with get_session() as session:
+        return session.query(UserSession).filter(UserSession.id == session_id).delete() > 0
+
+def delete_user_sessions(user_id: int, keep_session_id: Optional[str] = None) -> list[str]:
+    """Delete all login sessions of a user, optionally keeping one. Returns the deleted session ids."""
+    with get_session() as session:
+        query = session.query(UserSession).filter(UserSession.user_id == user_id)
+        if keep_session_id:
+            query = query.filter(UserSession.id != keep_session_id)
+        session_ids = [row.id for row in query.with_entities(UserSession.id).all()]
+        if session_ids:
+            session.query(UserSession).filter(UserSession.id.in_(session_ids)).delete(synchronize_session=False)
+        return session_ids
+
+def delete_expired_sessions() -> int:
+    """Delete expired login sessions. Returns the number deleted."""
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with get_session() as session:
+        return session.query(UserSession).filter(UserSession.expires_at <= now).delete()
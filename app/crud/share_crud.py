@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Public share link CRUD operations for DevSaver."""
+
+import secrets
+from typing import Optional
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from app.core.database import get_session
+from app.crud.resource_crud import _construct_resources
+from app.models.resource import Resource
+from app.models.share_link import ShareLink
+from app.models.user import User
+from app.schemas.resource import Resource as ResourceSchema
+from app.schemas.share_link import ShareLink as ShareLinkSchema
+from app.schemas.user import User as UserSchema
+
+TOKEN_BYTES = 18  # 144 random bits, 24 URL-safe characters
+
+
+def create_share_link(user_id: int, resource_id: Optional[int] = None, tag: Optional[str] = None) -> ShareLinkSchema:
+    """Create the public link to a resource or to a tag collection, or return the one that already exists."""
+    stmt = (
+        sqlite_insert(ShareLink)
+        .values(token=secrets.token_urlsafe(TOKEN_BYTES), user_id=user_id, resource_id=resource_id, tag=tag)
+        .on_conflict_do_nothing()
+        .returning(ShareLink.__table__)
+    )
+    with get_session() as session:
+        row = session.execute(stmt).mappings().first()
+        if row is None:
+            target = ShareLink.resource_id == resource_id if resource_id is not None else ShareLink.tag == tag
+            row = session.execute(select(ShareLink.__table__).where(ShareLink.user_id == user_id, target)).mappings().one()
+        return ShareLinkSchema.model_validate(row)
+
+def get_share_links_by_user(user_id: int) -> list[tuple[ShareLinkSchema, Optional[str]]]:
+    """Retrieve a user's share links, newest first, each with the title of the resource it shares (None for a tag)."""
+    stmt = (
+        select(ShareLink, Resource.title)
+        .outerjoin(Resource, Resource.id == ShareLink.resource_id)
+        .where(ShareLink.user_id == user_id)
+        .order_by(ShareLink.id.desc())
+    )
+    with get_session() as session:
+        return [(ShareLinkSchema.model_validate(link), title) for link, title in session.execute(stmt)]
+
+def get_share_link_for_resource(user_id: int, resource_id: int) -> Optional[ShareLinkSchema]:
+    """Retrieve the share link of one of a user's resources, if it is shared."""
+    with get_session() as session:
+        link = session.scalars(select(ShareLink).where(ShareLink.user_id == user_id, ShareLink.resource_id == resource_id)).first()
+        return ShareLinkSchema.model_validate(link) if link else None
+
+def delete_share_link(link_id: int, user_id: int) -> Optional[ShareLinkSchema]:
+    """Delete one of a user's share links. Returns the deleted link, or None if the user has no such link."""
+    stmt = delete(ShareLink).where(ShareLink.id == link_id, ShareLink.user_id == user_id).returning(ShareLink.__table__)
+    with get_session() as session:
+        row = session.execute(stmt).mappings().first()
+        return ShareLinkSchema.model_validate(row) if row else None
+
+def get_shared_content(token: str) -> Optional[tuple[ShareLinkSchema, UserSchema, list[ResourceSchema]]]:
+    """Load what a share link shows: the link, its owner and the shared resource or the resources that may carry
+    the tag (matched as a substring, like the dashboard filter). None for an unknown link or a deleted owner."""
+    stmt = (
+        select(ShareLink, User)
+        .join(User, User.id == ShareLink.user_id)
+        .where(ShareLink.token == token, User.deleted_at.is_(None))
+    )
+    with get_session() as session:
+        found = session.execute(stmt).first()
+        if found is None:
+            return None
+        link, owner = ShareLinkSchema.model_validate(found[0]), UserSchema.model_validate(found[1])
+        if link.resource_id is not None:
+            criteria = (Resource.id == link.resource_id, Resource.user_id == link.user_id)
+        else:
+            criteria = (Resource.user_id == link.user_id, Resource.tags.contains(link.tag))
+        return link, owner, _construct_resources(session, *criteria, order_by=Resource.id)
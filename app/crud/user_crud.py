@@ -3,8 +3,24 @@
 
 from app.core.database import get_session
 from app.models.user import User
+from app.models.resource import Resource
 from typing import Optional
-from app.schemas.user import UserInDB, User as UserSchema
+from datetime import datetime, timezone
+from sqlalchemy import select, func, or_, update
+from app.schemas.user import UserInDB, User as UserSchema, UserListItem
+
+# Soft-deleted accounts cannot sign in and are hidden from lookups and listings
+ACTIVE = User.deleted_at.is_(None)
+
+# Columns the admin user directory can be sorted by; "resources" sorts by resource count
+USER_SORT_FIELDS = {
+    "id": User.id,
+    "username": User.username,
+    "email": User.email,
+    "created_at": User.created_at,
+    "last_login_at": User.last_login_at,
+    "resources": None,
+}
 
 def create_user(username: str, email: str, password_hash: str, fullname: Optional[str] = None) -> UserSchema:
     """Create a new user in the database."""
@@ -17,22 +33,28 @@ def create_user(username: str, email: str, password_hash: str, fullname: Optiona
          
         return UserSchema.model_validate(new_user)
     
-def get_user_by_username(username: str) -> UserInDB | None:
-    """Retrieve a user by their username."""
+def get_user_by_username(username: str, include_deleted: bool = False) -> UserInDB | None:
+    """Retrieve a user by their username. Deleted accounts still awaiting purge only with include_deleted."""
     with get_session() as session:
-        user = session.query(User).filter(User.username == username).first()
+        query = session.query(User).filter(User.username == username)
+        if not include_deleted:
+            query = query.filter(ACTIVE)
+        user = query.first()
         return UserInDB.model_validate(user) if user else None # Using Pydantic model here to prevent detachment issues
     
-def get_user_by_email(email: str) -> UserSchema | None:
-    """Retrieve a user by their email."""
+def get_user_by_email(email: str, include_deleted: bool = False) -> UserSchema | None:
+    """Retrieve a user by their email. Deleted accounts still awaiting purge only with include_deleted."""
     with get_session() as session:
-        user = session.query(User).filter(User.email == email).first()
+        query = session.query(User).filter(User.email == email)
+        if not include_deleted:
+            query = query.filter(ACTIVE)
+        user = query.first()
         return UserSchema.model_validate(user) if user else None
     
 def get_user_by_id(user_id: int) -> UserSchema | None:
     """Retrieve a user by their ID."""
     with get_session() as session:
-        user = session.query(User).filter(User.id == user_id).first()
+        user = session.query(User).filter(User.id == user_id, ACTIVE).first()
         return UserSchema.model_validate(user) if user else None
 
 def update_user(user_id: int, **kwargs) -> UserSchema | None:
@@ -60,21 +82,80 @@ def update_password(user_id: int, password_hash: str) -> UserSchema | None:
             return UserSchema.model_validate(user)
         return None
     
+def soft_delete_user(user_id: int) -> bool:
+    """Mark a user as deleted. Returns False if there is no such active user."""
+    with get_session() as session:
+        return session.execute(
+            update(User).where(User.id == user_id, ACTIVE).values(deleted_at=datetime.now(timezone.utc))
+        ).rowcount > 0
+
 def delete_user(user_id: int) -> bool:
-    """Delete a user from the database."""
+    """Remove a soft-deleted user's row once their resources have been purged."""
     with get_session() as session:
-        user = session.query(User).filter(User.id == user_id).first()
-        if user:
-            session.delete(user)
-            return True
-        return False
+        # A bulk delete, so the ORM does not try to null out resources.user_id first
+        return session.query(User).filter(User.id == user_id, User.deleted_at.is_not(None)).delete(synchronize_session=False) > 0
     
 def list_users() -> list[UserSchema]:
     """List all users in the database."""
     with get_session() as session:
-        users = session.query(User).all()
-        print(f"DEBUG: Found {len(users)} users")
-        for user in users:
-            session.refresh(user)
-            # session.expunge(user)  # detach safely
-        return [UserSchema.model_validate(user) for user in users] if users else []
\ No newline at end of file
+        users = session.query(User).filter(ACTIVE).all()
+        return [UserSchema.model_validate(user) for user in users] if users else []
+
+def list_users_page(
+        page: int = 1,
+        page_size: int = 25,
+        search: Optional[str] = None,
+        sort: str = "created_at",
+        descending: bool = True,
+) -> tuple[list[UserListItem], int]:
+    """List one page of users with their resource counts in a single query. Returns (users, total)."""
+    if sort not in USER_SORT_FIELDS:
+        raise ValueError(f"Cannot sort users by '{sort}'.")
+    page = max(page, 1)
+
+    resource_counts = select(Resource.user_id, func.count(Resource.id).label("resource_count")).group_by(Resource.user_id)
+    page_users = select(User.id).where(ACTIVE)
+    if sort == "resources":
+        # Sorting by count needs every user's count; other sorts only count resources on the page
+        all_counts = resource_counts.subquery()
+        page_users = page_users.outerjoin(all_counts, all_counts.c.user_id == User.id)
+        sort_column = func.coalesce(all_counts.c.resource_count, 0)
+    else:
+        sort_column = USER_SORT_FIELDS[sort]
+
+    order = (sort_column.desc(), User.id.desc()) if descending else (sort_column.asc(), User.id.asc())
+    matching = [ACTIVE]
+    if search:
+        pattern = f"%{search.strip()}%"
+        matching.append(or_(User.username.ilike(pattern), User.email.ilike(pattern), User.fullname.ilike(pattern)))
+        page_users = page_users.where(matching[-1])
+
+    page_users = (
+        page_users.add_columns(
+            func.count().over().label("total"),
+            func.row_number().over(order_by=order).label("position"),
+        )
+        .order_by(*order)
+        .limit(page_size)
+        .offset((page - 1) * page_size)
+        .cte("page_users")
+    )
+    counts = resource_counts.where(Resource.user_id.in_(select(page_users.c.id))).subquery()
+    statement = (
+        select(User, func.coalesce(counts.c.resource_count, 0), page_users.c.total)
+        .join(page_users, page_users.c.id == User.id)
+        .outerjoin(counts, counts.c.user_id == User.id)
+        .order_by(page_users.c.position)
+    )
+
+    with get_session() as session:
+        rows = session.execute(statement).all()
+        users = []
+        for user, resource_count, _ in rows:
+            item = UserListItem.model_validate(user)
+            item.resource_count = resource_count
+            users.append(item)
+        if rows:
+            return users, rows[0][2]
+        # Past the last page the window carries no total, so count the matching users directly
+        return users, session.execute(select(func.count()).select_from(User).where(*matching)).scalar()
\ No newline at end of file
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Database background job model for DevSaver."""
+
+from sqlalchemy import Index, Integer, String, Text, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from typing import Optional
+from datetime import datetime, timezone
+
+class Job(Base):
+    """Model representing a unit of deferred work in the persistent job queue.
+
+    Status moves queued -> running -> done, or back to queued with a later run_at after a failed attempt,
+    and finally to failed once max_attempts is used up.
+    """
+    __tablename__ = 'jobs'
+    __table_args__ = (
+        # Workers claim the oldest due job of a status
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    name: Mapped[str] = mapped_column(String, nullable=False, index=True)
+    payload: Mapped[str] = mapped_column(Text, nullable=False, default="{}")
+    # Enqueueing a key held by a queued or running job is a no-op, so retried requests cannot schedule duplicate work;
+    # finished jobs release their key
+    idempotency_key: Mapped[Optional[str]] = mapped_column(String, nullable=True, unique=True)
+    status: Mapped[str] = mapped_column(String, nullable=False, default="queued")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    max_attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=5)
+    run_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    locked_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    locked_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    progress: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # JSON reported by long-running handlers
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True, index=True)
+
+    def __repr__(self):
+        return f"Job(id={self.id}, name={self.name}, status={self.status}, attempts={self.attempts})"
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 """Database resources models for DevSaver."""
 
-from sqlalchemy import ForeignKey, Integer, String, DateTime, Boolean   
+from sqlalchemy import ForeignKey, Index, Integer, String, DateTime, Boolean, event, inspect
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.core.database import Base
+from app.utils.urls import resource_key, url_hash
 # from typing import Optional
 # from user import User
 from datetime import datetime, timezone
@@ -11,6 +12,12 @@ from datetime import datetime, timezone
 class Resource(Base):
     """Model representing a resource in DevSaver."""
     __tablename__ = 'resources'
+    __table_args__ = (
+        # Covers the per-user count/max(updated_at) validator used for conditional GETs
+        Index("ix_resources_user_id_updated_at", "user_id", "updated_at"),
+        # One resource per canonical URL or uploaded file name per user; inserts use ON CONFLICT on it
+        Index("ix_resources_user_id_url_hash", "user_id", "url_hash", unique=True),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True, index=True)
     title: Mapped[str] = mapped_column(String, nullable=False, index=True)
@@ -19,6 +26,10 @@ class Resource(Base):
     type: Mapped[str] = mapped_column(String, nullable=False, index=True)
     url: Mapped[str] = mapped_column(String, nullable=False, index=True)
     original_filename: Mapped[str] = mapped_column(String, nullable=True, index=True)
+    # Kept in step with url and original_filename by the listener below; NULL only on rows that duplicated another
+    # resource before the unique index existed
+    url_key: Mapped[str] = mapped_column(String, nullable=True)
+    url_hash: Mapped[str] = mapped_column(String, nullable=True)
     source: Mapped[str] = mapped_column(String, nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False, index=True)
@@ -26,7 +37,7 @@ class Resource(Base):
     starred: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False, index=True)
     
     # Foreign key relationship to User model
-    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     user = relationship("User", back_populates="resources")
 
     def __repr__(self):
@@ -48,4 +59,21 @@ class Resource(Base):
             "read_status": self.read_status,
             "starred": self.starred,
             "user_id": self.user_id,
-        }
\ No newline at end of file
+        }
+
+
+def set_url_hash(resource: Resource) -> None:
+    """Derive the duplicate key of a resource from its URL or uploaded file name."""
+    resource.url_key = resource_key(resource.url, resource.original_filename)
+    resource.url_hash = url_hash(resource.url_key)
+
+@event.listens_for(Resource, "before_insert")
+def _hash_new_resource(mapper, connection, resource: Resource) -> None:
+    set_url_hash(resource)
+
+@event.listens_for(Resource, "before_update")
+def _rehash_moved_resource(mapper, connection, resource: Resource) -> None:
+    # Only when the URL or file changes, so other edits never trip the index on a duplicate left from before it
+    state = inspect(resource)
+    if state.attrs.url.history.has_changes() or state.attrs.original_filename.history.has_changes():
+        set_url_hash(resource)
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""Database model for metadata extracted from uploaded media."""
+
+from sqlalchemy import ForeignKey, Integer, Float, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from typing import Optional
+from datetime import datetime, timezone
+
+class ResourceMedia(Base):
+    """Dimensions, page count, duration and thumbnail of an uploaded image, PDF or video.
+
+    Rows with the same content_hash describe identical files, so a re-upload reuses them instead of extracting again.
+    """
+    __tablename__ = 'resource_media'
+
+    resource_id: Mapped[int] = mapped_column(Integer, ForeignKey('resources.id'), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(String, nullable=False, index=True)  # sha256 of the file
+    kind: Mapped[str] = mapped_column(String, nullable=False)
+    width: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    height: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    pages: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    duration_seconds: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    thumbnail: Mapped[Optional[str]] = mapped_column(String, nullable=True, index=True)  # Stored name of the JPEG thumbnail
+    extracted_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"ResourceMedia(resource_id={self.resource_id}, kind={self.kind}, thumbnail={self.thumbnail})"
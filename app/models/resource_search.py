@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Full-text search index over resources, kept in an SQLite FTS5 table."""
+
+from sqlalchemy import event
+from app.core.database import Base
+from app.core.logging_config import logger
+
+RESOURCE_SEARCH = "resource_search"
+
+# rowid is the resource id. Triggers keep title, description and tags in step with the resources table inside
+# the writing transaction; body holds text extracted from an uploaded document, and is cleared when the URL
+# (and so the file) changes until extraction runs again.
+SEARCH_INDEX_DDL = (
+    f"""CREATE VIRTUAL TABLE {RESOURCE_SEARCH} USING fts5(
+        title, description, tags, body, tokenize = 'porter unicode61 remove_diacritics 2', prefix = '2 3'
+    )""",
+    f"""CREATE TRIGGER resources_search_insert AFTER INSERT ON resources BEGIN
+        INSERT INTO {RESOURCE_SEARCH}(rowid, title, description, tags) VALUES (new.id, new.title, new.description, new.tags);
+    END""",
+    f"""CREATE TRIGGER resources_search_update AFTER UPDATE OF title, description, tags ON resources BEGIN
+        UPDATE {RESOURCE_SEARCH} SET title = new.title, description = new.description, tags = new.tags WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER resources_search_url AFTER UPDATE OF url ON resources BEGIN
+        UPDATE {RESOURCE_SEARCH} SET body = NULL WHERE rowid = new.id;
+    END""",
+    f"""CREATE TRIGGER resources_search_delete AFTER DELETE ON resources BEGIN
+        DELETE FROM {RESOURCE_SEARCH} WHERE rowid = old.id;
+    END""",
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_search_index(target, connection, **kw) -> None:
+    """Create the FTS5 table and its triggers alongside the other tables, indexing any resources that already exist."""
+    if connection.dialect.name != "sqlite":
+        return
+    if connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = ?", (RESOURCE_SEARCH,)).first():
+        return
+    for statement in SEARCH_INDEX_DDL:
+        connection.exec_driver_sql(statement)
+    indexed = connection.exec_driver_sql(
+        f"INSERT INTO {RESOURCE_SEARCH}(rowid, title, description, tags) SELECT id, title, description, tags FROM resources"
+    ).rowcount
+    if indexed:
+        logger.info("Search index created for %s existing resources.", indexed)
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Database models for saved searches (smart collections) and their materialized membership."""
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, Integer, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from typing import Optional
+from datetime import datetime, timezone
+
+class SavedSearch(Base):
+    """A named ResourceFilter: resources of the user matching every criterion set (None matches anything).
+
+    Tags match like the dashboard tag filter: a resource qualifies when its tags contain any of them.
+    member_count is kept equal to the number of saved_search_members rows by triggers.
+    """
+    __tablename__ = 'saved_searches'
+    __table_args__ = (
+        Index("ix_saved_searches_user_id_name", "user_id", "name", unique=True),
+        {"sqlite_autoincrement": True},  # Never reuse the id of a deleted collection in cached dashboard URLs
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    type: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    tags: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Comma-separated, as shown to the user
+    read_status: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    starred: Mapped[Optional[bool]] = mapped_column(Boolean, nullable=True)
+    member_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"SavedSearch(id={self.id}, user_id={self.user_id}, name={self.name}, member_count={self.member_count})"
+
+
+class SavedSearchTag(Base):
+    """One lowercased tag of a saved search, in a form the membership triggers can match against."""
+    __tablename__ = 'saved_search_tags'
+
+    search_id: Mapped[int] = mapped_column(Integer, ForeignKey('saved_searches.id'), primary_key=True)
+    tag: Mapped[str] = mapped_column(String, primary_key=True)
+
+
+class SavedSearchMember(Base):
+    """A resource currently matching a saved search. Maintained by triggers inside each resource write."""
+    __tablename__ = 'saved_search_members'
+    __table_args__ = (
+        # The primary key serves opening a collection; this one serves the triggers of a resource write
+        Index("ix_saved_search_members_resource_id", "resource_id"),
+    )
+
+    search_id: Mapped[int] = mapped_column(Integer, ForeignKey('saved_searches.id'), primary_key=True)
+    resource_id: Mapped[int] = mapped_column(Integer, ForeignKey('resources.id'), primary_key=True)
+
+
+def matches_search(row: str) -> str:
+    """SQL condition under which resource `row` (e.g. "new" in a trigger) belongs to saved search `s`."""
+    return f"""(s.type IS NULL OR s.type = {row}.type)
+        AND (s.read_status IS NULL OR s.read_status = {row}.read_status)
+        AND (s.starred IS NULL OR s.starred = {row}.starred)
+        AND (s.tags IS NULL OR EXISTS (
+            SELECT 1 FROM saved_search_tags t WHERE t.search_id = s.id AND instr(lower(coalesce({row}.tags, '')), t.tag) > 0
+        ))"""
+
+# Membership changes in the same transaction as the resource write that causes it, whichever code path writes
+# (single edits, batched star/read toggles, bulk updates, purges), so collections never drift from the library.
+# Only the user's own saved searches are evaluated, through their user_id.
+SAVED_SEARCH_DDL = (
+    f"""CREATE TRIGGER saved_search_members_insert AFTER INSERT ON resources BEGIN
+        INSERT INTO saved_search_members (search_id, resource_id)
+            SELECT s.id, new.id FROM saved_searches s WHERE s.user_id = new.user_id AND {matches_search("new")};
+    END""",
+    f"""CREATE TRIGGER saved_search_members_update AFTER UPDATE OF type, tags, read_status, starred ON resources BEGIN
+        DELETE FROM saved_search_members WHERE resource_id = new.id AND search_id IN (
+            SELECT s.id FROM saved_searches s WHERE s.user_id = new.user_id AND NOT ({matches_search("new")})
+        );
+        INSERT INTO saved_search_members (search_id, resource_id)
+            SELECT s.id, new.id FROM saved_searches s WHERE s.user_id = new.user_id AND {matches_search("new")}
+            AND NOT EXISTS (SELECT 1 FROM saved_search_members m WHERE m.search_id = s.id AND m.resource_id = new.id);
+    END""",
+    """CREATE TRIGGER saved_search_members_delete AFTER DELETE ON resources BEGIN
+        DELETE FROM saved_search_members WHERE resource_id = old.id;
+    END""",
+    """CREATE TRIGGER saved_search_members_count_insert AFTER INSERT ON saved_search_members BEGIN
+        UPDATE saved_searches SET member_count = member_count + 1 WHERE id = new.search_id;
+    END""",
+    """CREATE TRIGGER saved_search_members_count_delete AFTER DELETE ON saved_search_members BEGIN
+        UPDATE saved_searches SET member_count = member_count - 1 WHERE id = old.search_id;
+    END""",
+    """CREATE TRIGGER saved_searches_delete AFTER DELETE ON saved_searches BEGIN
+        DELETE FROM saved_search_members WHERE search_id = old.id;
+        DELETE FROM saved_search_tags WHERE search_id = old.id;
+    END""",
+    """CREATE TRIGGER saved_searches_user_delete AFTER DELETE ON users BEGIN
+        DELETE FROM saved_searches WHERE user_id = old.id;
+    END""",
+)
+
+
+@event.listens_for(Base.metadata, "after_create")
+def create_saved_search_triggers(target, connection, **kw) -> None:
+    """Create the membership triggers once every table they touch exists."""
+    if connection.dialect.name != "sqlite":
+        return
+    if connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE name = 'saved_search_members_insert'").first():
+        return
+    for statement in SAVED_SEARCH_DDL:
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Database login session model for DevSaver."""
+
+from sqlalchemy import ForeignKey, Integer, String, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from datetime import datetime, timezone
+
+class UserSession(Base):
+    """Model representing a server-side login session.
+
+    The id is a SHA-256 digest of the token kept in the signed session cookie, so a leaked table cannot be replayed.
+    """
+    __tablename__ = 'user_sessions'
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"UserSession(user_id={self.user_id}, expires_at={self.expires_at})"
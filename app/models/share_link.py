@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""Database model for public share links."""
+
+from sqlalchemy import DDL, ForeignKey, Index, Integer, String, DateTime, event
+from sqlalchemy.orm import Mapped, mapped_column
+from app.core.database import Base
+from typing import Optional
+from datetime import datetime, timezone
+
+class ShareLink(Base):
+    """An unguessable public link to one resource, or to a user's resources with a tag (a collection).
+
+    Sharing the same resource or tag again reuses the link; deleting the link revokes it.
+    """
+    __tablename__ = 'share_links'
+    __table_args__ = (
+        Index("ix_share_links_user_id_resource_id", "user_id", "resource_id", unique=True),
+        Index("ix_share_links_user_id_tag", "user_id", "tag", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    token: Mapped[str] = mapped_column(String, nullable=False, unique=True, index=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey('users.id'), nullable=False)
+    resource_id: Mapped[Optional[int]] = mapped_column(Integer, ForeignKey('resources.id'), nullable=True)
+    tag: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+
+    def __repr__(self):
+        return f"ShareLink(id={self.id}, user_id={self.user_id}, resource_id={self.resource_id}, tag={self.tag})"
+
+
+# Links die with what they point at, however the resource or user is deleted (one by one, in bulk or by a purge)
+event.listen(ShareLink.__table__, "after_create", DDL(
+    """CREATE TRIGGER share_links_resource_delete AFTER DELETE ON resources BEGIN
+        DELETE FROM share_links WHERE resource_id = old.id;
+    END"""
+).execute_if(dialect="sqlite"))
+event.listen(ShareLink.__table__, "after_create", DDL(
+    """CREATE TRIGGER share_links_user_delete AFTER DELETE ON users BEGIN
+        DELETE FROM share_links WHERE user_id = old.id;
+    END"""
+).execute_if(dialect="sqlite"))
@@ -18,7 +18,8 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(255, collation="NOCASE"), unique=True, nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     updated_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
-    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    # Set when an account is deleted; the row is removed once a background job has purged its resources
+    deleted_at: Mapped[datetime] = mapped_column(DateTime, nullable=True, index=True)
     last_login_at: Mapped[datetime] = mapped_column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False, index=True)
     password_hash: Mapped[str] = mapped_column(String, nullable=False)
     resources: Mapped[List[Resource]] = relationship("Resource", back_populates="user")
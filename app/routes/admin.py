@@ -5,14 +5,22 @@ from fastapi import APIRouter, Request, Depends, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from app.utils.auth.session import check_current_user
 from app.core.templates import templates
-from app.services.user_services import list_all_users, remove_user, get_user_by_id, update_user_profile
-from app.schemas.user import UserUpdate
+from app.services.user_services import list_users_paginated, remove_user, get_user_profile, update_user_profile
+from app.schemas.user import UserUpdate, User as UserSchema
 from typing import Optional
 
 router = APIRouter()
 
 @router.get("/admin", response_class=HTMLResponse)
-async def admin_dashboard(request: Request, user: str = Depends(check_current_user))-> HTMLResponse:
+async def admin_dashboard(
+    request: Request,
+    user: Optional[UserSchema] = Depends(check_current_user),
+    page: int = 1,
+    size: int = 25,
+    q: Optional[str] = None,
+    sort: str = "created_at",
+    order: str = "desc",
+)-> HTMLResponse:
     """Render the admin dashboard page."""
     if not user:
         return RedirectResponse("/login", status_code=303)
@@ -20,12 +28,27 @@ async def admin_dashboard(request: Request, user: str = Depends(check_current_us
     msg = request.query_params.get("msg")
     if msg == "user_deleted":
         msg = "User has been successfully deleted."
-    users = list_all_users()
+    if msg == "user_updated":
+        msg = "User has been successfully updated."
+    directory = list_users_paginated(page, size, q, sort, descending=order != "asc")
 
-    return templates.TemplateResponse("pages/admin.html", {"request": request, "title": "Admin Dashboard", "users": users})
+    return templates.TemplateResponse(
+        "pages/admin.html",
+        {
+            "request": request,
+            "title": "Admin Dashboard",
+            "users": directory.users,
+            "directory": directory,
+            "pages": max(1, -(-directory.total // directory.size)),
+            "q": q or "",
+            "sort": sort,
+            "order": order,
+            "msg": msg,
+        },
+    )
 
 @router.post("/admin/delete-user/{user_id}", response_class=HTMLResponse, name="delete-user")
-async def delete_user(request: Request, user_id: int, user: str = Depends(check_current_user)) -> RedirectResponse:
+async def delete_user(request: Request, user_id: int, user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
     """Handle user deletion (admin only)."""
     if not user:
         return RedirectResponse("/login", status_code=303)
@@ -35,16 +58,16 @@ async def delete_user(request: Request, user_id: int, user: str = Depends(check_
     return RedirectResponse("/admin?msg=user_deleted", status_code=303)
 
 @router.get("/admin/edit-user/{user_id}", response_class=HTMLResponse)
-async def edit_user_get(request: Request, user_id: int, user: str = Depends(check_current_user)) -> HTMLResponse:
+async def edit_user_get(request: Request, user_id: int, user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Render the edit user page (admin only)."""
     if not user:
         return RedirectResponse("/login", status_code=303)
     
-    user_obj = get_user_by_id(user_id)
+    user_obj = get_user_profile(user_id)
     return templates.TemplateResponse("pages/edit_user.html", {"request": request, "data": user_obj, "title": "Edit User", "errors": {}, "msg": ""})
 
 @router.post("/admin/edit-user/{user_id}", response_class=HTMLResponse)
-async def edit_user_post(request: Request, user_id: int, form: UserUpdate = Depends(UserUpdate.as_form), user: str = Depends(check_current_user)) -> HTMLResponse:
+async def edit_user_post(request: Request, user_id: int, form: UserUpdate = Depends(UserUpdate.as_form), user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Handle user update (admin only)."""
     request.state.template = "pages/edit_user.html"
 
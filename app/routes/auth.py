@@ -2,9 +2,10 @@
 """ The App's authentication routes."""
 
 from fastapi import APIRouter, Request, Form, Depends
-from app.schemas.user import UserLogin
+from app.schemas.user import UserLogin, User as UserSchema
 from fastapi.responses import HTMLResponse, RedirectResponse
 from app.services.user_services import authenticate_user
+from app.services.session_services import start_session, end_session
 from app.utils.auth.session import check_current_user
 from typing import Optional
 from app.core.templates import templates
@@ -13,7 +14,7 @@ from app.core.logging_config import logger
 router = APIRouter()
 
 @router.get("/login", response_class=HTMLResponse)
-async def login_page(request: Request, user: Optional[str] = Depends(check_current_user)):
+async def login_page(request: Request, user: Optional[UserSchema] = Depends(check_current_user)):
     """Render the login page."""
     if user:
         return RedirectResponse("/dashboard", status_code=303)
@@ -31,14 +32,16 @@ async def login_action(request: Request, form: UserLogin = Depends(UserLogin.as_
         logger.error("Login failed! Invalid username or password.")
         raise ValueError("Login failed! Invalid username or password.")
 
-    request.session["user"] = user["id"]
+    request.session["sid"] = start_session(user)
+    request.session["user"] = user["id"] # Kept for the logging context only; auth goes through "sid"
     return RedirectResponse("/dashboard", status_code=303)
 
 @router.get("/logout")
-async def logout_action(request: Request, user: Optional[str] = Depends(check_current_user)) -> RedirectResponse:
+async def logout_action(request: Request, user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
     """Handle logout action."""
     if not user:
         return RedirectResponse("/login", status_code=303)
-    request.session.pop("user", None) # request.session.clear()
-    logger.info(f"User ID {user} logged out successfully.")
+    end_session(request.session["sid"])
+    request.session.clear()
+    logger.info(f"User ID {user.id} logged out successfully.")
     return RedirectResponse("/login?msg=logged_out", status_code=303)
\ No newline at end of file
@@ -1,33 +1,67 @@
 #!/usr/bin/env python3
 """Dashboard page route (refactored to use GET filters)."""
 
+import asyncio
+import json
+from typing import AsyncIterator, Optional
 from fastapi import APIRouter, Request, Depends, HTTPException
-from fastapi.responses import HTMLResponse
-from typing import Optional
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.utils.auth.session import check_current_user
-from app.core.templates import templates
+from app.schemas.user import User as UserSchema
+from app.core.templates import templates, TEMPLATES_VERSION
+from app.core.fragments import get_preview_fragment, store_preview_fragment, render_fragment, RESOURCE_ROW
+from app.core.events import change_feed, ResourceEvent, Subscription, DELETED, RESET
+from app.utils.http import build_etag, conditional_headers, etag_matches, is_not_modified, not_modified
+from app.services.media_services import get_resource_media
+from app.services.related_services import get_related_resources
+from app.services.share_services import get_resource_share
+from app.services.saved_search_services import get_saved_search, list_collection_rows
 from app.services.resource_services import (
     get_resource_by_id_service,
-    list_resources_by_user,
-    list_resources_by_type,
-    list_resources_by_tag,
+    get_list_validator,
+    list_resource_rows,
+    search_for_resources,
 )
 
 router = APIRouter()
 
+# Comment lines keep idle event streams open through proxies that drop silent connections
+SSE_KEEPALIVE_SECONDS = 15
+
 
 @router.get("/dashboard", name="dashboard")
 async def dashboard(
     request: Request,
-    session_user: Optional[str] = Depends(check_current_user),
+    session_user: Optional[UserSchema] = Depends(check_current_user),
     filter: Optional[str] = None,
     tags: Optional[str] = None,
+    q: Optional[str] = None,
+    fuzzy: bool = False,
+    collection: Optional[int] = None,
 ):
-    """Render the dashboard with optional filtering by type or tags."""
+    """Render the dashboard with optional search, a smart collection, or filtering by type or tags.
+
+    A search that finds nothing falls back to fuzzy matching, so a misspelt query still lists close matches.
+    The page is validated by an ETag of the user's resource count and latest updated_at, so an unchanged
+    dashboard is answered with 304 before any listing query runs. There is no Last-Modified: deleting
+    anything but the newest resource leaves the latest updated_at as it was.
+    """
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
 
-    user_id = request.session.get("user")
+    user_id = session_user.id
+    # Looked up before revalidating, so a deleted collection is not answered with a stale 304
+    saved_search = get_saved_search(user_id, collection) if collection is not None else None
+    if collection is not None and saved_search is None:
+        raise HTTPException(status_code=404, detail="Collection not found")
+
+    count, last_modified = get_list_validator(user_id)
+    etag = build_etag("dashboard", user_id, count, last_modified, request.url.query, TEMPLATES_VERSION)
+    headers = conditional_headers(etag)
+    if is_not_modified(request, etag):
+        return not_modified(headers)
+
     msg = request.query_params.get("msg")
     if msg == "uploaded":
         msg = "Resource uploaded successfully!"
@@ -35,31 +69,42 @@ async def dashboard(
         msg = "Resource updated successfully!"
     if msg == "no-change":
         msg = "No changes detected."
+    if msg == "starred":
+        msg = "Resource star updated."
+    if msg == "deleted":
+        msg = "Resource has been successfully deleted."
     if msg == "password_changed":
         msg = "Password changed successfully!"
 
-    resources = []
-
-    # Tag-based search takes priority
-    if tags:
-        tag_list = [t.strip() for t in tags.split(",") if t.strip()]
-        found = []
-        for tag in tag_list:
-            tag_resources = list_resources_by_tag(user_id, tag)
-            for r in tag_resources:
-                if r not in found:
-                    found.append(r)
-        resources = found
+    # A search query takes priority, then tags; a resource matching any of the tags is listed once
+    query = q.strip() if q else ""
+    tag_list = [t.strip() for t in tags.split(",") if t.strip()] if tags else []
+    if query:
+        # Off the event loop: the first fuzzy search of a user builds their trigram index
+        resources = await run_in_threadpool(search_for_resources, user_id, query, fuzzy=fuzzy)
+        if not resources and not fuzzy:
+            resources = await run_in_threadpool(search_for_resources, user_id, query, fuzzy=True)
+            if resources:
+                msg = f'No exact matches for "{query}". Showing close matches.'
+        active_type = "Search"
+
+    # A smart collection reads its materialized members instead of filtering the library
+    elif saved_search:
+        resources = list_collection_rows(saved_search.id)
+        active_type = "Collection"
+
+    elif tag_list:
+        resources = list_resource_rows(user_id, tags=tag_list)
         active_type = "Tag"
 
     # Otherwise, filter by resource type
     elif filter and filter.lower() != "all":
-        resources = list_resources_by_type(user_id, filter.capitalize())
+        resources = list_resource_rows(user_id, resource_type=filter.capitalize())
         active_type = filter.capitalize()
 
     # Otherwise, show all resources
     else:
-        resources = list_resources_by_user(user_id)
+        resources = list_resource_rows(user_id)
         active_type = "All"
 
     return templates.TemplateResponse(
@@ -71,32 +116,91 @@ async def dashboard(
             "user": session_user,
             "msg": msg,
             "type": active_type,
+            "collection": saved_search,
         },
+        headers=headers,
 )
 
 @router.get("/dashboard/{resource_id}/preview", response_class=HTMLResponse)
-async def resource_preview(request: Request, resource_id: int, session_user: Optional[str] = Depends(check_current_user)):
-    """Render the resource preview page."""
+async def resource_preview(request: Request, resource_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)):
+    """Render the resource preview partial, served from the fragment cache and revalidated by ETag."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
 
-    resource = get_resource_by_id_service(resource_id)
-    if not resource:
+    fragment = get_preview_fragment(resource_id)
+    if fragment is None:
+        resource = get_resource_by_id_service(resource_id)
+        if not resource:
+            return HTMLResponse("<p>Resource not found!</p>", status_code=404)
+        media = get_resource_media(resource_id)
+        html = templates.get_template("partials/resource_preview.html").render(request=request, resource=resource, media=media)
+        # A thumbnail arriving later must change the ETag even though the resource row did not change
+        version = max(resource.updated_at, media.extracted_at) if media else resource.updated_at
+        fragment = store_preview_fragment(resource.id, resource.user_id, version, html)
+
+    if fragment.user_id != session_user.id:
         return HTMLResponse("<p>Resource not found!</p>", status_code=404)
-    
-    return templates.TemplateResponse(
-        "partials/resource_preview.html",
-        {"request": request, "resource": resource}
-    )
+
+    headers = {"ETag": fragment.etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), fragment.etag):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(fragment.html, headers=headers)
 
 @router.get("/dashboard/{resource_id}/view", response_class=HTMLResponse)
-async def resource_view(request: Request, resource_id: int, session_user: Optional[str] = Depends(check_current_user)):
+async def resource_view(request: Request, resource_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)):
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     resource = get_resource_by_id_service(resource_id)
     if not resource:
         raise HTTPException(status_code=404, detail="Resource not found")
+    # Only ever recommend from the viewer's own library; the first lookup may load the user's TF-IDF index
+    related, share = [], None
+    if resource.user_id == session_user.id:
+        related = await run_in_threadpool(get_related_resources, resource.id, session_user.id)
+        share = get_resource_share(session_user.id, resource.id)
     return templates.TemplateResponse(
         "pages/resource_view.html",
-        {"request": request, "resource": resource, "user": session_user}
+        {"request": request, "resource": resource, "user": session_user, "related": related, "share": share}
+    )
+
+
+def format_resource_event(event: ResourceEvent) -> str:
+    """Encode a change as an SSE message carrying the rendered row for the dashboard to patch in."""
+    data = {"action": event.action, "id": event.resource_id}
+    if event.row is not None and event.action not in (DELETED, RESET):
+        row = event.row
+        data.update({
+            "type": row.type,
+            "tags": row.tags or "",
+            "read_status": row.read_status,
+            "starred": row.starred,
+            "html": render_fragment(templates.env, RESOURCE_ROW, (row.id, row.updated_at), resource=row),
+        })
+    return f"event: resource\ndata: {json.dumps(data)}\n\n"
+
+async def resource_event_stream(subscription: Subscription, keepalive: float = SSE_KEEPALIVE_SECONDS) -> AsyncIterator[str]:
+    """Yield SSE messages for a subscription until the client goes away."""
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_resource_event(event)
+    finally:
+        change_feed.unsubscribe(subscription)
+
+@router.get("/dashboard/events")
+async def dashboard_events(session_user: Optional[UserSchema] = Depends(check_current_user)):
+    """Stream row-level changes to the user's resources as Server-Sent Events."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    subscription = change_feed.subscribe(session_user.id)
+    return StreamingResponse(
+        resource_event_stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
@@ -6,11 +6,12 @@ from fastapi.responses import HTMLResponse
 from app.core.templates import templates
 from typing import Optional
 from app.utils.auth.session import check_current_user
+from app.schemas.user import User as UserSchema
 
 
 router = APIRouter()
 
 @router.get("/", response_class=HTMLResponse)
-async def read_home(request: Request, session_user: Optional[str] = Depends(check_current_user)):
+async def read_home(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)):
     """Render the home page."""
     return templates.TemplateResponse("pages/home.html", {"request": request, "title": "Welcome Home", "user": session_user})
\ No newline at end of file
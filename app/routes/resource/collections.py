@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Smart collection (saved search) routes."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+from app.core.templates import templates
+from app.schemas.saved_search import SavedSearchCreate
+from app.schemas.user import User as UserSchema
+from app.services.saved_search_services import list_saved_searches, remove_saved_search, save_search
+from app.utils.auth.session import check_current_user
+
+router = APIRouter()
+
+
+@router.get("/collections", response_class=HTMLResponse)
+def collections(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
+    """Render the user's smart collections with their counts, and a form to save a new one.
+
+    type and tags query parameters prefill the form, e.g. from a filtered dashboard.
+    """
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    msg = request.query_params.get("msg")
+    if msg == "deleted":
+        msg = "Collection deleted."
+
+    return templates.TemplateResponse(
+        "pages/collections.html",
+        {
+            "request": request,
+            "title": "Collections",
+            "user": session_user,
+            "collections": list_saved_searches(session_user.id),
+            "msg": msg,
+            "errors": {},
+            "data": request.query_params,
+        }
+    )
+
+@router.post("/collections", response_class=HTMLResponse)
+def create_collection(request: Request, form: SavedSearchCreate = Depends(SavedSearchCreate.as_form), session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Save a filter as a smart collection and open it."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    request.state.template = "pages/collections.html"
+    saved = save_search(session_user.id, form.name, form)  # ValueError → handled by global handler
+    return RedirectResponse(url=f"/dashboard?collection={saved.id}", status_code=303)
+
+@router.post("/collections/{search_id}/delete", response_class=HTMLResponse)
+def delete_collection(search_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Delete one of the user's smart collections. Its resources are untouched."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    if not remove_saved_search(session_user.id, search_id):
+        raise HTTPException(status_code=404, detail="Collection not found")
+    return RedirectResponse(url="/collections?msg=deleted", status_code=303)
@@ -2,24 +2,26 @@
 """Resources API routes."""
 
 import os
-from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Depends
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi import APIRouter, Request, HTTPException, UploadFile, File, Depends, Query
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
 from app.schemas.resource import ResourceCreate, ResourceUpdate
 from app.services.resource_services import (
-    add_resource, remove_resource, list_resources_by_user, get_resource_by_id_service, update_resource_details, get_resource_by_original_filename_service, get_resource_by_url_service)
+    add_resource, remove_resource, get_resource_by_id_service, update_resource_details, get_resource_by_original_filename_service, toggle_star,
+    delete_upload, DuplicateResource)
+from typing import Literal, Optional
 from app.utils.auth.session import check_current_user
+from app.schemas.user import User as UserSchema
 from app.core.templates import templates
+from app.core.storage import storage, upload_url
+from app.services.search_services import suggest_terms
+from app.services.duplicate_services import find_duplicates, find_duplicate_groups
 from uuid import uuid4
 
 router = APIRouter()
 
-UPLOAD_DIR = "app/uploads/"
-
-# Make sure upload directory exists
-os.makedirs(UPLOAD_DIR, exist_ok=True)
-
 @router.get("/resources/upload", response_class=HTMLResponse)
-def resource_upload(request: Request, session_user: str = Depends(check_current_user)) -> HTMLResponse:
+def resource_upload(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Render the resources uploads page."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
@@ -27,86 +29,121 @@ def resource_upload(request: Request, session_user: str = Depends(check_current_
     return templates.TemplateResponse("pages/upload_resource.html", {"request": request, "title": "Upload Resource", "user": session_user, "data": {}, "errors": {}})
 
 @router.post("/resources/upload", response_class=HTMLResponse)
-async def handle_resource_upload(request: Request, form: ResourceCreate = Depends(ResourceCreate.as_form), file: UploadFile = File(None), session_user: str = Depends(check_current_user)) -> HTMLResponse:
+async def handle_resource_upload(request: Request, form: ResourceCreate = Depends(ResourceCreate.as_form), file: UploadFile = File(None), session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Handle resource upload form submission."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
     request.state.template = "pages/upload_resource.html"
     
-    user_id = request.session.get("user")
-    resource_by_id = get_resource_by_original_filename_service(user_id, file.filename)
-    resource_by_url = get_resource_by_url_service(user_id, form.external_url)
+    user_id = session_user.id
+    # A file is checked before it is stored; links are checked by the insert itself, against the unique index
+    resource_by_id = get_resource_by_original_filename_service(user_id, file.filename) if file and file.filename else None
     if resource_by_id:
         return RedirectResponse(url=f"/resources/edit-resource/{resource_by_id.id}?msg=resource_exists", status_code=303)
-    if resource_by_url:
-        return RedirectResponse(url=f"/resources/edit-resource/{resource_by_url.id}?msg=resource_exists", status_code=303)
     
     if file and file.filename: # File upload is optional, so checks if file:
         # Generate a unique filename to avoid collisions
         file_extension = os.path.splitext(file.filename)[1]
         unique_filename = f"devsaver-{uuid4().hex}{file_extension}"
-        file_path = os.path.join(UPLOAD_DIR, unique_filename)
 
-        # Save the uploaded file
-        with open(file_path, "wb") as buffer:
-            buffer.write(await file.read())
+        # Stream the spooled upload into storage in chunks, off the event loop
+        await run_in_threadpool(storage.save, unique_filename, file.file, file.content_type)
 
-        external_url = f"/uploads/{unique_filename}"
+        external_url = upload_url(unique_filename)
         original_filename = file.filename
     else:
         external_url = form.external_url
         original_filename = None
     
-    success = add_resource(
-        title=form.title, type=form.type, source=form.source, user_id=user_id, description=form.description, tags=form.tags, url=external_url, original_filename=original_filename
-    )
+    try:
+        success = add_resource(
+            title=form.title, type=form.type, source=form.source, user_id=user_id, description=form.description, tags=form.tags, url=external_url, original_filename=original_filename
+        )
+    except DuplicateResource as duplicate:
+        # Saved already, possibly through another link or by a concurrent upload of the same file
+        if original_filename:
+            await run_in_threadpool(delete_upload, external_url)
+        return RedirectResponse(url=f"/resources/edit-resource/{duplicate.existing.id}?msg=resource_exists", status_code=303)
 
     if success:
         return RedirectResponse(url="/dashboard?msg=uploaded", status_code=303)
     
     raise ValueError("Failed to upload resource. Please try again.")
 
+@router.get("/uploads/{name}", name="uploads")
+async def download_upload(name: str, request: Request) -> Response:
+    """Serve an uploaded file from the storage backend: sent from disk (or by nginx), or redirected to the object store."""
+    return await storage.download(name, request.scope)
+
+@router.get("/resources/suggest")
+def suggest(
+    q: str = "",
+    kind: Optional[Literal["tag", "title", "source"]] = None,
+    limit: int = Query(10, ge=1, le=50),
+    session_user: Optional[UserSchema] = Depends(check_current_user),
+) -> JSONResponse:
+    """As-you-type completions from the user's tags, titles and sources, most used first."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+    suggestions = suggest_terms(session_user.id, q, kind, limit) if q.strip() else []
+    return JSONResponse([suggestion._asdict() for suggestion in suggestions])
+
+def _duplicate_json(resource) -> dict:
+    return {"id": resource.id, "title": resource.title, "url": resource.url, "type": resource.type}
+
+@router.get("/resources/duplicates")
+def check_duplicates(
+    url: str = "",
+    title: str = "",
+    description: str = "",
+    exclude: Optional[int] = None,
+    limit: int = Query(5, ge=1, le=50),
+    session_user: Optional[UserSchema] = Depends(check_current_user),
+) -> JSONResponse:
+    """The user's resources that look like the one being added (same canonical URL or near-identical text), most similar first."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+    matches = find_duplicates(session_user.id, url or None, title, description, exclude, limit) if any(value.strip() for value in (url, title, description)) else []
+    return JSONResponse([dict(_duplicate_json(resource), score=score) for resource, score in matches])
+
+@router.get("/resources/duplicates/report")
+def duplicates_report(session_user: Optional[UserSchema] = Depends(check_current_user)) -> JSONResponse:
+    """Every group of duplicates in the user's library, oldest resource of each group first."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+    return JSONResponse([[_duplicate_json(resource) for resource in group] for group in find_duplicate_groups(session_user.id)])
+
 @router.post("/resources/delete-resource/{resource_id}", response_class=HTMLResponse, name="delete-resource")
-def delete_resource(resource_id: int, request: Request, session_user: str = Depends(check_current_user)) -> HTMLResponse:
+def delete_resource(resource_id: int, request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
     """Handle resource deletion."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
-    # Step 1: Get the resource first (so we can delete its file)
     resource = get_resource_by_id_service(resource_id)
-    if not resource:
+    if not resource or resource.user_id != session_user.id:
         raise HTTPException(status_code=404, detail="Resource not found")
-    
-    # Step 2: If the resource was uploaded (local file), delete it from disk
-    if resource.original_filename and resource.url.startswith("/uploads/"):
-        # Build the full path on disk
-        file_path = os.path.join(UPLOAD_DIR, os.path.basename(resource.url))
-        if os.path.exists(file_path):
-            try:
-                os.remove(file_path)
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
-
-    # Step 3: Delete metadata from the database
+
+    # Open dashboards drop the row from the change feed; an uploaded file is removed by a background job
     remove_resource(resource_id)
 
-    # Step 4: Re-render dashboard with updated data
-    resources = list_resources_by_user(request.session.get("user"))
-    return templates.TemplateResponse(
-        "pages/dashboard.html",
-        {
-            "request": request,
-            "title": "Dashboard",
-            "resources": resources,
-            "user": session_user,
-            "msg": "Resource has been successfully deleted."
-        }
-)
+    return RedirectResponse(url="/dashboard?msg=deleted", status_code=303)
 
+@router.post("/resources/toggle-star/{resource_id}", response_class=HTMLResponse, name="toggle-star")
+def toggle_star_resource(resource_id: int, request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Handle starring or unstarring a resource."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    # The ownership check happens inside the batched write, so a toggle costs no extra round trip
+    try:
+        toggle_star(resource_id, user_id=session_user.id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return RedirectResponse(url="/dashboard?msg=starred", status_code=303)
 
 @router.get("/resources/edit-resource/{resource_id}", response_class=HTMLResponse)
-def edit_resource(resource_id: int, request: Request, session_user: str = Depends(check_current_user)) -> HTMLResponse:
+def edit_resource(resource_id: int, request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Render the resource edit page."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
@@ -121,14 +158,14 @@ def edit_resource(resource_id: int, request: Request, session_user: str = Depend
     return templates.TemplateResponse("pages/edit_resource.html", {"request": request, "title": "Edit Resource", "resource": resource, "msg": msg, "user": session_user, "errors": {}})
 
 @router.post("/resources/edit-resource/{resource_id}", response_class=HTMLResponse)
-async def handle_edit_resource(resource_id: int, request: Request, form: ResourceUpdate = Depends(ResourceUpdate.as_form), session_user: str = Depends(check_current_user)) -> HTMLResponse:
+async def handle_edit_resource(resource_id: int, request: Request, form: ResourceUpdate = Depends(ResourceUpdate.as_form), session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Handle resource edit form submission."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
     request.state.template = "pages/edit_resource.html"
     
-    user_id = request.session.get("user")
+    user_id = session_user.id
     if not user_id:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
@@ -161,7 +198,17 @@ async def handle_edit_resource(resource_id: int, request: Request, form: Resourc
     if not field_to_update:
         return RedirectResponse(url="/dashboard?msg=no-change", status_code=303)
 
-    success = update_resource_details(resource_id, user_id=user_id, **field_to_update)
+    try:
+        success = update_resource_details(resource_id, user_id=user_id, **field_to_update)
+    except DuplicateResource as duplicate:
+        return RedirectResponse(url=f"/resources/edit-resource/{duplicate.existing.id}?msg=resource_exists", status_code=303)
+    except ValueError as error:
+        # The edit form needs the resource, which the global ValueError handler does not have
+        return templates.TemplateResponse(
+            "pages/edit_resource.html",
+            {"request": request, "title": "Edit Resource", "resource": resource, "msg": None, "user": session_user, "errors": {"general": str(error)}},
+            status_code=400
+        )
 
     if success:
         return RedirectResponse(url="/dashboard?msg=updated", status_code=303)
@@ -1,32 +1,49 @@
 #!/usr/bin/env python3
 """Resources API routes."""
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Response
 from fastapi.responses import JSONResponse
 from app.schemas.resource import ResourcePublic as ResourceSchema
-from app.services.resource_services import get_resource_by_id_service, list_all_resources
+from app.services.resource_services import get_resource_by_id_service, get_list_validator, list_all_resources
+from typing import Optional
 from app.utils.auth.session import check_current_user
+from app.schemas.user import User as UserSchema
+from app.utils.pydantic.serialize import ModelListResponse
+from app.utils.http import build_etag, conditional_headers, is_not_modified, not_modified
 
 router = APIRouter()
 
 @router.get("/rss/", response_model=list[ResourceSchema])
-def list_resources(session_user: str = Depends(check_current_user)):
-    """Retrieve all resources."""
+def list_resources(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)):
+    """Retrieve all resources; unchanged listings are answered with 304 after one count/max query.
+
+    Only the ETag validates the list: its newest updated_at survives deletes, so Last-Modified would not.
+    """
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
-    
+
+    count, last_modified = get_list_validator()
+    headers = conditional_headers(build_etag("rss", count, last_modified))
+    if count and is_not_modified(request, headers["ETag"]):
+        return not_modified(headers)
+
     resources = list_all_resources()
     if not resources:
         return JSONResponse(content={"message": "No resources found"}, status_code=404)
-    return resources
+    return ModelListResponse(ResourceSchema, resources, headers=headers)
 
 @router.get("/rss/{resource_id}", response_model=ResourceSchema)
-def get_resource_by_id(resource_id: int, session_user: str = Depends(check_current_user)):
-    """Retrieve a resource by ID."""
+def get_resource_by_id(request: Request, response: Response, resource_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)):
+    """Retrieve a resource by ID, with ETag and Last-Modified derived from its updated_at."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
     resource = get_resource_by_id_service(resource_id)
     if not resource:
         return JSONResponse(content={"message": f"Resource not found"}, status_code=404)
+
+    headers = conditional_headers(build_etag("rss", resource.id, resource.updated_at.isoformat()), resource.updated_at)
+    if is_not_modified(request, headers["ETag"], resource.updated_at):
+        return not_modified(headers)
+    response.headers.update(headers)
     return resource
\ No newline at end of file
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Public share pages and the routes that manage share links."""
+
+from typing import Optional
+from fastapi import APIRouter, Depends, Form, HTTPException, Request
+from fastapi.responses import HTMLResponse, RedirectResponse, Response
+from app.core.compression_middleware import choose_encoding
+from app.core.config import SHARE_PAGE_MAX_AGE_SECONDS
+from app.core.shared_pages import get_shared_page, store_shared_page
+from app.core.templates import templates
+from app.schemas.user import User as UserSchema
+from app.services.share_services import list_shares, load_shared_content, revoke_share, share_resource, share_tag
+from app.utils.auth.session import check_current_user
+from app.utils.http import etag_matches, not_modified
+
+router = APIRouter()
+
+
+@router.get("/s/{token}", response_class=HTMLResponse, name="shared-page")
+def shared_page(token: str, request: Request) -> Response:
+    """Serve a public share page.
+
+    The page is rendered and compressed once, then served from memory, with no database query, until its owner
+    changes what it shows. Browsers and proxies may reuse it for SHARE_PAGE_MAX_AGE_SECONDS, then revalidate
+    with the ETag.
+    """
+    page = get_shared_page(token)
+    if page is None:
+        content = load_shared_content(token)
+        if content is None:
+            raise HTTPException(status_code=404, detail="This link is not shared anymore.")
+        link, owner, resources = content
+        # Rendered without the request or a session user: the same bytes are served to everyone
+        html = templates.get_template("pages/shared.html").render(
+            title=resources[0].title if link.resource_id else f"#{link.tag}", user=None, link=link, owner=owner, resources=resources
+        )
+        page = store_shared_page(token, link.user_id, link.resource_id, html)
+
+    encoding, body, etag = page.variant(choose_encoding(request.headers.get("accept-encoding", "")))
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={SHARE_PAGE_MAX_AGE_SECONDS}", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding  # Already compressed; the compression middleware passes it through
+    return Response(body, media_type="text/html; charset=utf-8", headers=headers)
+
+@router.get("/shares", response_class=HTMLResponse)
+def shares(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
+    """Render the user's share links, with a form to share a tag."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    msg = request.query_params.get("msg")
+    if msg == "shared":
+        msg = "Anyone with the link can now see it."
+    if msg == "revoked":
+        msg = "Link revoked. It no longer works."
+
+    return templates.TemplateResponse(
+        "pages/shares.html",
+        {"request": request, "title": "Shared Links", "user": session_user, "links": list_shares(session_user.id), "msg": msg, "errors": {}, "data": {}}
+    )
+
+@router.post("/shares/resource/{resource_id}", response_class=HTMLResponse)
+def share_resource_action(resource_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Share one of the user's resources publicly."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    try:
+        share_resource(session_user.id, resource_id)
+    except ValueError:
+        raise HTTPException(status_code=404, detail="Resource not found")
+    return RedirectResponse(url=f"/dashboard/{resource_id}/view", status_code=303)
+
+@router.post("/shares/tag", response_class=HTMLResponse)
+def share_tag_action(request: Request, tag: str = Form(...), session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Share every resource of the user with a tag, including ones tagged later."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    request.state.template = "pages/shares.html"
+    share_tag(session_user.id, tag)  # ValueError → handled by global handler
+    return RedirectResponse(url="/shares?msg=shared", status_code=303)
+
+@router.post("/shares/{link_id}/revoke", response_class=HTMLResponse)
+def revoke_share_action(link_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
+    """Revoke one of the user's share links."""
+    if not session_user:
+        raise HTTPException(status_code=401, detail="Unauthorized Access!")
+
+    if not revoke_share(session_user.id, link_id):
+        raise HTTPException(status_code=404, detail="Link not found")
+    return RedirectResponse(url="/shares?msg=revoked", status_code=303)
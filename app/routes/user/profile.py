@@ -3,8 +3,8 @@
 
 from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
-from app.schemas.user import UserUpdate, PasswordChange
-from app.services.user_services import update_user_profile, get_user_by_id, authenticate_user, get_user_profile, update_user_password
+from app.schemas.user import UserUpdate, PasswordChange, User as UserSchema
+from app.services.user_services import update_user_profile, authenticate_user, update_user_password
 from app.utils.auth.session import check_current_user
 from typing import Optional
 from app.core.templates import templates
@@ -13,7 +13,7 @@ from app.core.logging_config import logger
 router = APIRouter()
 
 @router.get("/profile/")
-async def profile(request: Request, session_user: Optional[str] = Depends(check_current_user)) -> HTMLResponse:
+async def profile(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Render the profile page."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
@@ -22,24 +22,20 @@ async def profile(request: Request, session_user: Optional[str] = Depends(check_
     if msg == "updated":
         msg = "Profile updated successfully!"
 
-    user_id = request.session.get("user")
-    user = get_user_by_id(user_id)
     return templates.TemplateResponse(
         "pages/profile.html",
-        {"request": request, "title": "Profile Update", "errors": {}, "user": session_user, "data": user, "msg": msg}
+        {"request": request, "title": "Profile Update", "errors": {}, "user": session_user, "data": session_user, "msg": msg}
     )
 
 @router.post("/profile/")
-async def update_profile(request: Request, form: UserUpdate = Depends(UserUpdate.as_form), session_user: Optional[str] = Depends(check_current_user)) -> RedirectResponse:
+async def update_profile(request: Request, form: UserUpdate = Depends(UserUpdate.as_form), session_user: Optional[UserSchema] = Depends(check_current_user)) -> RedirectResponse:
     """Handle user profile update. Just fullname update for now"""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
     request.state.template = "pages/profile.html"
 
-    user_id = request.session.get("user")
-    print("Session exists:", "session" in request.scope)
-
+    user_id = session_user.id
 
     if form.fullname == "":
         form.fullname = None  
@@ -54,7 +50,7 @@ async def update_profile(request: Request, form: UserUpdate = Depends(UserUpdate
     return RedirectResponse("/profile?msg=updated", status_code=303)
 
 @router.get("/profile/change-password", response_class=HTMLResponse)
-async def change_password_get(request: Request, session_user: Optional[str] = Depends(check_current_user)) -> HTMLResponse:
+async def change_password_get(request: Request, session_user: Optional[UserSchema] = Depends(check_current_user)) -> HTMLResponse:
     """Render the change password page."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
@@ -70,7 +66,7 @@ async def change_password_get(request: Request, session_user: Optional[str] = De
 
 @router.post("/profile/change-password", response_class=HTMLResponse)
 async def change_password_post(
-    request: Request, form: PasswordChange = Depends(PasswordChange.as_form), session_user: Optional[str] = Depends(check_current_user)
+    request: Request, form: PasswordChange = Depends(PasswordChange.as_form), session_user: Optional[UserSchema] = Depends(check_current_user)
 ) -> HTMLResponse:
     """Handle password change with reusable error handling."""
     if not session_user:
@@ -83,14 +79,12 @@ async def change_password_post(
         logger.error("New password and confirm password do not match.")
         raise ValueError("New password and confirm password do not match.")
     
-    user_id = request.session.get("user")
-    user = get_user_profile(user_id)
-
-    if not user or not authenticate_user(user.username, form.old_password):
+    user_id = session_user.id
+    if not authenticate_user(session_user.username, form.old_password):
         logger.error("Old password is incorrect.")
         raise ValueError("Old password is incorrect.")
 
-    success = update_user_password(user_id, password=form.new_password)
+    success = update_user_password(user_id, password=form.new_password, keep_session=request.session.get("sid"))
     if not success:
         logger.error("Password change failed.")
         raise ValueError("Password change failed. Please ensure your old password is correct.")
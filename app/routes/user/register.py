@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """ User registration route."""
 
-from app.schemas.user import UserCreate
+from app.schemas.user import UserCreate, User as UserSchema
 from app.services.user_services import register_user
 from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
@@ -12,7 +12,7 @@ from app.core.templates import templates
 router = APIRouter()
 
 @router.get("/register", response_class=HTMLResponse)
-async def register_page(request: Request, user: Optional[str] = Depends(check_current_user)):
+async def register_page(request: Request, user: Optional[UserSchema] = Depends(check_current_user)):
     """Render the registration page."""
     if user:
         return RedirectResponse("/dashboard", status_code=303)
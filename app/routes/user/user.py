@@ -3,26 +3,35 @@
 
 from fastapi import APIRouter, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from app.schemas.user import User as UserSchema
-from app.services.user_services import list_all_users, get_user_profile
+from typing import Literal, Optional
+from app.schemas.user import User as UserSchema, UserListItem, UserSortField
+from app.services.user_services import list_users_paginated, get_user_profile
 from app.utils.auth.session import check_current_user
+from app.utils.pydantic.serialize import ModelListResponse
 
 
 router = APIRouter()
 
-@router.get("/users/", response_model=list[UserSchema])
-def list_users(sesssion_user: str = Depends(check_current_user)):
-    """Retrieve all users."""
+@router.get("/users/", response_model=list[UserListItem])
+def list_users(
+    sesssion_user: Optional[UserSchema] = Depends(check_current_user),
+    page: int = 1,
+    size: int = 50,
+    q: Optional[str] = None,
+    sort: UserSortField = "created_at",
+    order: Literal["asc", "desc"] = "desc",
+):
+    """Retrieve a page of users; the total is sent in the X-Total-Count header."""
     if not sesssion_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
     
-    users = list_all_users()
-    if not users:
-        return JSONResponse(content={"message": "No users found"}, status_code=404)
-    return users
+    directory = list_users_paginated(page, size, q, sort, descending=order != "asc")
+    if not directory.users:
+        return JSONResponse(content={"message": "No users found"}, status_code=404, headers={"X-Total-Count": str(directory.total)})
+    return ModelListResponse(UserListItem, directory.users, headers={"X-Total-Count": str(directory.total)})
 
 @router.get("/users/{user_id}", response_model=UserSchema)
-def get_user(user_id: int, session_user: str = Depends(check_current_user)):
+def get_user(user_id: int, session_user: Optional[UserSchema] = Depends(check_current_user)):
     """Retrieve a user by ID."""
     if not session_user:
         raise HTTPException(status_code=401, detail="Unauthorized Access!")
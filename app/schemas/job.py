@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""Schema definitions for background jobs."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class Job(BaseModel):
+    """Schema for a queued, running or finished job."""
+    id: int
+    name: str
+    payload: str
+    idempotency_key: Optional[str] = None
+    status: str
+    attempts: int
+    max_attempts: int
+    run_at: datetime
+    locked_by: Optional[str] = None
+    locked_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    progress: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Schema definitions for resource-related data."""
 from pydantic import BaseModel
-from typing import Optional
+from typing import NamedTuple, Optional
 from datetime import datetime
 from app.utils.pydantic.schema import as_form
 
@@ -44,6 +44,19 @@ class Resource(ResourceInDBBase):
     """Schema for resource data returned to clients."""
     pass
 
+class ResourceRow(NamedTuple):
+    """Read-only resource row with only the columns list pages render. Built straight from DB rows, never validated."""
+    id: int
+    title: str
+    type: str
+    url: str
+    original_filename: Optional[str]
+    tags: Optional[str]
+    source: str
+    read_status: bool
+    starred: bool
+    updated_at: datetime
+
 @as_form
 class ResourceUpdate(BaseModel):
     """Schema for updating resource information."""
@@ -104,11 +117,11 @@ class ResourceStats(BaseModel):
 
 @as_form
 class ResourceFilter(BaseModel):
-    """Schema for filtering resources."""
+    """Schema for filtering resources. Criteria left as None match anything; tags match any of several."""
     type: Optional[str] = None
     tags: Optional[str] = None
-    read_status: Optional[bool] = False
-    starred: Optional[bool] = False
+    read_status: Optional[bool] = None
+    starred: Optional[bool] = None
     user_id: Optional[int] = None
 
     class Config:
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""Schema definitions for extracted media metadata."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ResourceMedia(BaseModel):
+    """Schema for the metadata and thumbnail of an uploaded media file."""
+    resource_id: int
+    content_hash: str
+    kind: str
+    width: Optional[int] = None
+    height: Optional[int] = None
+    pages: Optional[int] = None
+    duration_seconds: Optional[float] = None
+    thumbnail: Optional[str] = None
+    extracted_at: datetime
+
+    class Config:
+        from_attributes = True
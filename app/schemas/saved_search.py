@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Schema definitions for saved searches (smart collections)."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+from app.schemas.resource import ResourceFilter
+from app.utils.pydantic.schema import as_form
+
+
+@as_form
+class SavedSearchCreate(ResourceFilter):
+    """Schema for saving a resource filter under a name."""
+    name: str
+
+
+class SavedSearch(BaseModel):
+    """Schema for a saved search with its precomputed member count."""
+    id: int
+    user_id: int
+    name: str
+    type: Optional[str] = None
+    tags: Optional[str] = None
+    read_status: Optional[bool] = None
+    starred: Optional[bool] = None
+    member_count: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""Schema definitions for public share links."""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ShareLink(BaseModel):
+    """Schema for a public link to a resource or a tag collection."""
+    id: int
+    token: str
+    user_id: int
+    resource_id: Optional[int] = None
+    tag: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
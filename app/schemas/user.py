@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Schema definitions for user-related data."""
 from pydantic import BaseModel, EmailStr, field_serializer, constr
-from typing import Optional, Annotated
+from typing import Literal, Optional, Annotated
 from datetime import datetime as datatime
 from app.utils.pydantic.schema import as_form
 
@@ -72,6 +72,25 @@ class User(BaseModel):
     class Config:
         from_attributes = True
 
+# Columns the user directory can be sorted by; see user_crud.USER_SORT_FIELDS
+UserSortField = Literal["id", "username", "email", "created_at", "last_login_at", "resources"]
+
+@as_form
+class UserListItem(User):
+    """Schema for a user row in the admin directory."""
+    resource_count: int = 0
+
+@as_form
+class UserList(BaseModel):
+    """Schema for a page of users."""
+    users: list[UserListItem]
+    total: int
+    page: int
+    size: int
+
+    class Config:
+        from_attributes = True
+
 @as_form
 class UserPublic(BaseModel):
     """Schema for public user data."""
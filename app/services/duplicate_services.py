@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""Duplicate detection within a user's library: the same canonical URL, or near-identical titles and descriptions."""
+
+from typing import Optional
+import app.crud.search_crud as search_crud
+from app.core.config import DUPLICATE_MIN_SIMILARITY, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS
+from app.schemas.resource import Resource as ResourceSchema
+from app.services.search_services import UserIndexCache
+from app.utils.minhash import DuplicateIndex
+
+duplicate_indexes = UserIndexCache(
+    DuplicateIndex, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS, fields=("url", "title", "description")
+)
+
+
+def find_duplicates(
+        user_id: int,
+        url: Optional[str] = None,
+        title: Optional[str] = None,
+        description: Optional[str] = None,
+        exclude_id: Optional[int] = None,
+        limit: int = 5,
+) -> list[tuple[ResourceSchema, float]]:
+    """The user's resources that look like the one described, most similar first, with similarity scores.
+
+    A resource with the same canonical URL (ignoring tracking parameters, www., fragments and the like) scores 1.0.
+    """
+    matches = duplicate_indexes.get(user_id).lookup(url, title, description, DUPLICATE_MIN_SIMILARITY, exclude_id)[:limit]
+    scores = dict(matches)
+    resources = search_crud.get_resources_in_order(user_id, [match_id for match_id, _ in matches])
+    return [(resource, scores[resource.id]) for resource in resources]
+
+def find_duplicate_groups(user_id: int) -> list[list[ResourceSchema]]:
+    """Every group of the user's resources that duplicate one another, oldest resource of each group first."""
+    groups = duplicate_indexes.get(user_id).duplicate_groups(DUPLICATE_MIN_SIMILARITY)
+    resources = {
+        resource.id: resource
+        for resource in search_crud.get_resources_in_order(user_id, [doc_id for group in groups for doc_id in group])
+    }
+    return [[resources[doc_id] for doc_id in group if doc_id in resources] for group in groups]
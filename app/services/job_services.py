@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Persistent background jobs for DevSaver: handler registry, enqueueing and workers."""
+
+import contextvars
+import json
+import os
+import random
+import socket
+import threading
+import time
+from typing import Callable, NamedTuple, Optional
+from sqlalchemy.orm import Session
+from app.core.config import JOB_WORKERS, JOB_POLL_SECONDS, JOB_LEASE_SECONDS, JOB_MAX_ATTEMPTS, JOB_RETRY_BASE_SECONDS, JOB_RETRY_MAX_SECONDS
+from app.core.logging_config import logger
+from app.crud import job_crud
+from app.schemas.job import Job as JobSchema
+
+
+class JobHandler(NamedTuple):
+    """A registered job function and how many attempts it gets."""
+    func: Callable[..., None]
+    max_attempts: int
+
+
+_handlers: dict[str, JobHandler] = {}
+_wakeup = threading.Event()  # Set on enqueue so in-process workers start without waiting out a poll
+_workers: list["JobWorker"] = []
+_current_job: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("current_job", default=None)
+
+
+def job_handler(name: str, max_attempts: int = JOB_MAX_ATTEMPTS):
+    """Register a function as the handler for jobs called `name`; it receives the payload as keyword arguments.
+
+    Handlers run at least once and may run again after a crash or a failed attempt, so they must be idempotent.
+    """
+    def register(func: Callable[..., None]) -> Callable[..., None]:
+        _handlers[name] = JobHandler(func, max_attempts)
+        return func
+    return register
+
+def enqueue(
+        name: str,
+        payload: Optional[dict] = None,
+        key: Optional[str] = None,
+        delay: float = 0,
+        session: Optional[Session] = None,
+) -> int:
+    """Queue a job for a worker and return its id; see job_crud.enqueue_job for `key` and `session`."""
+    handler = _handlers.get(name)
+    max_attempts = handler.max_attempts if handler else JOB_MAX_ATTEMPTS
+    job_id = job_crud.enqueue_job(name, payload, idempotency_key=key, delay=delay, max_attempts=max_attempts, session=session)
+    _wakeup.set()
+    return job_id
+
+def enqueue_many(name: str, jobs: list[tuple[dict, Optional[str]]]) -> int:
+    """Queue many (payload, key) jobs of one kind with one commit. Returns the number added."""
+    handler = _handlers.get(name)
+    added = job_crud.enqueue_jobs(name, jobs, max_attempts=handler.max_attempts if handler else JOB_MAX_ATTEMPTS)
+    if added:
+        _wakeup.set()
+    return added
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter for the next attempt after `attempts` tries."""
+    delay = min(JOB_RETRY_MAX_SECONDS, JOB_RETRY_BASE_SECONDS * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+def report_progress(**progress) -> None:
+    """Record progress of the job running on this thread, e.g. report_progress(done=500, total=12000).
+
+    Shown by `list-jobs`. Reporting also renews the job's lease, so long handlers should report regularly.
+    Does nothing outside a job, so handlers can also be called directly.
+    """
+    job_id = _current_job.get()
+    if job_id is not None:
+        job_crud.set_job_progress(job_id, progress)
+
+def execute_job(job: JobSchema) -> str:
+    """Run a claimed job and record the outcome. Returns the job's new status.
+
+    If the job's lease expired mid-run and another worker took it over, that run's outcome is kept and the status is
+    the job's current one.
+    """
+    handler = _handlers.get(job.name)
+    token = _current_job.set(job.id)
+    try:
+        if handler is None:
+            raise LookupError(f"No handler registered for job {job.name!r}")
+        handler.func(**json.loads(job.payload))
+    except Exception as exc:
+        retry_in = retry_delay(job.attempts) if job.attempts < job.max_attempts else None
+        status = job_crud.fail_job(job.id, job.locked_by, f"{type(exc).__name__}: {exc}", retry_in)
+        if status is None:
+            return _lost_lease(job)
+        logger.warning("Job %s (%s) attempt %d failed: %s; now %s", job.id, job.name, job.attempts, exc, status)
+        return status
+    finally:
+        _current_job.reset(token)
+    if not job_crud.complete_job(job.id, job.locked_by):
+        return _lost_lease(job)
+    return job_crud.DONE
+
+def _lost_lease(job: JobSchema) -> str:
+    logger.warning("Job %s (%s) finished after %s lost its lease; outcome discarded", job.id, job.name, job.locked_by)
+    current = job_crud.get_job(job.id)
+    return current.status if current else job_crud.DONE
+
+def run_pending_jobs(worker_id: str = "inline", limit: Optional[int] = None) -> int:
+    """Run due jobs on the calling thread until none are left (or `limit` ran). Returns the number run."""
+    ran = 0
+    while limit is None or ran < limit:
+        job = job_crud.claim_job(worker_id)
+        if job is None:
+            break
+        execute_job(job)
+        ran += 1
+    return ran
+
+
+class JobWorker(threading.Thread):
+    """Thread that claims and runs jobs until stopped, sleeping between polls while the queue is empty."""
+
+    def __init__(self, index: int = 0, poll_interval: float = JOB_POLL_SECONDS, lease_seconds: float = JOB_LEASE_SECONDS):
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{index}"
+        super().__init__(name=f"job-worker-{index}", daemon=True)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._stopping = threading.Event()
+
+    def run(self) -> None:
+        next_reap = 0.0
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() >= next_reap:
+                    # Jobs left running by a crashed worker become claimable again once their lease expires
+                    reclaimed = job_crud.requeue_stale_jobs(self.lease_seconds)
+                    if reclaimed:
+                        logger.warning("Reclaimed %d jobs with expired leases", reclaimed)
+                    next_reap = time.monotonic() + self.lease_seconds / 2
+                job = job_crud.claim_job(self.worker_id)
+            except Exception:
+                logger.exception("Job worker %s could not reach the queue", self.worker_id)
+                job = None
+            if job is None:
+                _wakeup.wait(self.poll_interval)
+                _wakeup.clear()
+                continue
+            execute_job(job)
+
+    def stop(self) -> None:
+        """Ask the worker to exit after its current job."""
+        self._stopping.set()
+        _wakeup.set()
+
+
+def start_workers(count: int = JOB_WORKERS) -> list[JobWorker]:
+    """Start `count` in-process worker threads."""
+    workers = [JobWorker(index) for index in range(count)]
+    for worker in workers:
+        worker.start()
+    _workers.extend(workers)
+    return workers
+
+def stop_workers(timeout: float = 5.0) -> None:
+    """Stop the in-process workers, letting running jobs finish."""
+    for worker in _workers:
+        worker.stop()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
+
+def queue_status() -> dict[str, int]:
+    """Number of jobs per status."""
+    return job_crud.count_jobs_by_status()
+
+def list_recent_jobs(status: Optional[str] = None, limit: int = 50) -> list[JobSchema]:
+    """Most recent jobs, optionally of one status."""
+    return job_crud.list_jobs(status, limit)
+
+def retry_job(job_id: int) -> bool:
+    """Requeue a failed job with fresh attempts."""
+    if job_crud.retry_failed_job(job_id):
+        _wakeup.set()
+        return True
+    return False
+
+def purge_finished_jobs(older_than_seconds: float = 7 * 24 * 60 * 60) -> int:
+    """Delete successful jobs older than the cutoff."""
+    return job_crud.delete_finished_jobs(older_than_seconds)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Thumbnail and metadata extraction for uploaded images, PDFs and videos."""
+
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+import app.crud.media_crud as media_crud
+import app.crud.resource_crud as resource_crud
+from app.core.config import MEDIA_WORKERS, MEDIA_TIMEOUT_SECONDS, MEDIA_THUMBNAIL_SIZE
+from app.core.events import change_feed, ResourceEvent, UPDATED
+from app.core.logging_config import logger
+from app.core.storage import storage, upload_name
+from app.schemas.resource_media import ResourceMedia as ResourceMediaSchema
+from app.services.job_services import enqueue, enqueue_many, job_handler
+from app.utils.media import extract_media, media_kind
+from app.utils.urls import url_hash
+
+THUMBNAIL_PREFIX = "thumb-"  # Thumbnails are stored as thumb-<content sha256>.jpg, so identical files share one
+HASH_BUFFER_SIZE = 1024 * 1024
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """The shared extraction pool, started on first use.
+
+    Workers are spawned rather than forked: forking a process that runs threads can copy held locks into the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MEDIA_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def shutdown_media_pool() -> None:
+    """Stop the extraction processes, letting running extractions finish."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True, cancel_futures=True)
+            _pool = None
+
+def run_in_pool(function, *args):
+    """Run a picklable function in the extraction pool and wait for its result, bounded by the extraction time limit."""
+    return _get_pool().submit(function, *args).result(timeout=MEDIA_TIMEOUT_SECONDS * 2)
+
+def thumbnail_name(content_hash: str) -> str:
+    return f"{THUMBNAIL_PREFIX}{content_hash}.jpg"
+
+def file_hash(path: str) -> str:
+    """sha256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_BUFFER_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def media_extraction_key(resource_id: int, url: str) -> str:
+    """Idempotency key of extracting one file of a resource: a resource pointed at a new file is extracted again."""
+    return f"extract_media:{resource_id}:{url_hash(url)}"
+
+def queue_media_extraction(resource_id: int, original_filename: Optional[str], url: str) -> None:
+    """Queue extraction for an uploaded file we know how to read."""
+    if media_kind(original_filename):
+        enqueue("extract_media", {"resource_id": resource_id}, key=media_extraction_key(resource_id, url))
+
+def queue_missing_media_extraction() -> int:
+    """Queue extraction for every uploaded media file without metadata, e.g. ones uploaded before extraction existed."""
+    jobs = [
+        ({"resource_id": resource_id}, media_extraction_key(resource_id, url))
+        for resource_id, original_filename, url in media_crud.get_uploads_without_media() if media_kind(original_filename)
+    ]
+    return enqueue_many("extract_media", jobs)
+
+@job_handler("extract_media")
+def extract_resource_media(resource_id: int) -> Optional[ResourceMediaSchema]:
+    """Job: store the dimensions, page count, duration and thumbnail of an uploaded file.
+
+    Results are cached by content hash: a file already extracted for any resource is not opened again, and its
+    thumbnail is shared. Otherwise the file is probed and its thumbnail rendered in the process pool, so decoding
+    never holds the GIL of the web workers.
+    """
+    resource = resource_crud.get_resource_by_id(resource_id)
+    kind = media_kind(resource.original_filename) if resource else None
+    if kind is None:
+        return None  # Deleted before the job ran, or not media
+
+    with storage.local_copy(upload_name(resource.url)) as path:
+        content_hash = file_hash(path)
+        cached = media_crud.get_media_by_hash(content_hash)
+        if cached is not None:
+            values = cached.model_dump(include={"kind", "width", "height", "pages", "duration_seconds", "thumbnail"})
+        else:
+            values = _extract(path, kind, content_hash)
+
+    media = media_crud.save_media(
+        resource_id, content_hash=content_hash, extracted_at=datetime.now(timezone.utc).replace(tzinfo=None), **values
+    )
+    # Open previews and dashboards pick up the thumbnail
+    change_feed.publish(ResourceEvent(UPDATED, resource.user_id, resource_id))
+    return media
+
+def _extract(path: str, kind: str, content_hash: str) -> dict:
+    with tempfile.TemporaryDirectory() as workdir:
+        thumbnail_path = os.path.join(workdir, "thumbnail.jpg")
+        info = run_in_pool(extract_media, path, kind, thumbnail_path, MEDIA_THUMBNAIL_SIZE, MEDIA_TIMEOUT_SECONDS)
+        thumbnail = None
+        if info.pop("thumbnail") and os.path.exists(thumbnail_path):
+            thumbnail = thumbnail_name(content_hash)
+            with open(thumbnail_path, "rb") as f:
+                storage.save(thumbnail, f, "image/jpeg")
+    logger.info("Extracted %s metadata for %s: %s", kind, content_hash[:12], info)
+    return {"kind": kind, "thumbnail": thumbnail, **info}
+
+def get_resource_media(resource_id: int) -> Optional[ResourceMediaSchema]:
+    """The extracted metadata of a resource, if extraction has run."""
+    return media_crud.get_media(resource_id)
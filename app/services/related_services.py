@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""'Related resources' recommendations from TF-IDF similarity within a user's library."""
+
+import app.crud.search_crud as search_crud
+from app.core.config import RELATED_RESOURCES_LIMIT, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS
+from app.schemas.resource import Resource as ResourceSchema
+from app.services.search_services import UserIndexCache
+from app.utils.tfidf import TfidfIndex
+
+related_indexes = UserIndexCache(
+    TfidfIndex, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS, fields=("title", "description", "tags")
+)
+
+
+def get_related_resources(resource_id: int, user_id: int, limit: int = RELATED_RESOURCES_LIMIT) -> list[tuple[ResourceSchema, float]]:
+    """The user's resources most similar to one by title, description and tags, best first, with cosine scores."""
+    matches = related_indexes.get(user_id).neighbours(resource_id, limit)
+    scores = dict(matches)
+    resources = search_crud.get_resources_in_order(user_id, [match_id for match_id, _ in matches])
+    return [(resource, scores[resource.id]) for resource in resources]
+
+def get_all_related_ids(user_id: int, limit: int = RELATED_RESOURCES_LIMIT) -> dict[int, list[tuple[int, float]]]:
+    """(id, score) neighbours of every resource of a user, computed in batches; also warms the per-resource memo."""
+    return related_indexes.get(user_id).all_neighbours(limit)
@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 """Service layer for resource-related operations."""
 
+import time
+from datetime import datetime
 from typing import Optional
 import app.crud.resource_crud as resource_crud
-from app.services.user_services import get_user_profile
+from app.crud.resource_crud import DuplicateResource
+from app.core.storage import storage, UPLOAD_URL
+from app.schemas.resource import ResourceRow
+from app.core.config import PURGE_CHUNK_SIZE, PURGE_CHUNK_PAUSE_SECONDS
+from app.services.job_services import enqueue, enqueue_many, job_handler, report_progress
+from app.services.media_services import queue_media_extraction
+from app.services.search_services import queue_text_extraction, search_resource_matches, fuzzy_search_resources
+from app.services.user_services import get_user_profile, finish_user_removal
+from app.utils.urls import is_linkable_url
 
 def add_resource(
         title: str,
@@ -15,14 +25,22 @@ def add_resource(
         url: str = None,
         original_filename: Optional[str] = None
 ) -> dict:
-    """Add a new resource."""
+    """Add a new resource. Thumbnails and metadata of an uploaded media file are extracted in the background.
+
+    Raises DuplicateResource when the user already has the same canonical URL or uploaded file name.
+    """
+    check_url(url)
     # from app.crud.user_crud import get_user_by_id
     # # if not get_user_by_id(user_id):
     # #     raise ValueError("User does not exist.")
     
-    return resource_crud.create_resource(
+    created = resource_crud.create_resource(
         title=title, description=description, tags=tags, type=type, url=url, source=source, user_id=user_id, original_filename=original_filename
     )
+    if is_upload(url, original_filename):
+        queue_media_extraction(created.id, original_filename, url)
+        queue_text_extraction(created.id, original_filename, url)
+    return created
 
 def get_resource_by_id_service(resource_id: int) -> Optional[dict]:
     """Get a resource by its ID."""
@@ -42,13 +60,62 @@ def update_resource_details(resource_id: int, **kwargs) -> Optional[dict]:
     """Update resource details."""
     if not resource_crud.get_resource_by_id(resource_id):
         raise ValueError("Resource does not exist.")
-    return resource_crud.update_resource(resource_id, **kwargs)
+    if "url" in kwargs:
+        check_url(kwargs["url"])
+    updated = resource_crud.update_resource(resource_id, **kwargs)
+    if updated and "url" in kwargs and is_upload(updated.url, updated.original_filename):
+        # A new file: the search index dropped the old text when the URL changed
+        queue_media_extraction(resource_id, updated.original_filename, updated.url)
+        queue_text_extraction(resource_id, updated.original_filename, updated.url)
+    return updated
+
+def check_url(url: Optional[str]) -> None:
+    """Reject a resource URL that is neither an http(s) link nor an upload, since pages render it as a link."""
+    if url and not is_linkable_url(url):
+        raise ValueError("The URL must start with http:// or https://.")
+
+def is_upload(url: str, original_filename: Optional[str]) -> bool:
+    """Whether a resource points at a file we store, rather than an external link."""
+    return bool(original_filename) and url.startswith(UPLOAD_URL)
 
 def remove_resource(resource_id: int) -> bool:
-    """Remove a resource by its ID."""
-    if not resource_crud.get_resource_by_id(resource_id):
+    """Remove a resource by its ID. An uploaded file is deleted by a background job."""
+    deleted = resource_crud.delete_resource(resource_id)
+    if not deleted:
         raise ValueError("Resource does not exist.")
-    return resource_crud.delete_resource(resource_id)
+    if is_upload(deleted.url, deleted.original_filename):
+        enqueue("delete_upload", {"url": deleted.url}, key=f"delete_upload:{deleted.url}")
+    return True
+
+@job_handler("delete_upload")
+def delete_upload(url: str) -> None:
+    """Job: delete an uploaded file from storage. Already-missing files count as deleted."""
+    storage.delete(url)
+
+@job_handler("purge_user_resources")
+def purge_user_resources(user_id: int) -> None:
+    """Job: delete a removed user's resources, queue deletion of their uploaded files, then delete the user.
+
+    Each chunk is its own short transaction, with a pause between chunks, so purging a heavy account never
+    holds the SQLite write lock long enough to stall other requests.
+    """
+    total = resource_crud.count_resources_by_user(user_id)
+    deleted = files = 0
+    report_progress(deleted=0, files=0, total=total)
+    while True:
+        rows = resource_crud.delete_resources_chunk(user_id, PURGE_CHUNK_SIZE)
+        uploads = [
+            ({"url": url}, f"delete_upload:{url}")
+            for resource_id, url, original_filename in rows if is_upload(url, original_filename)
+        ]
+        enqueue_many("delete_upload", uploads)
+        files += len(uploads)
+        deleted += len(rows)
+        report_progress(deleted=deleted, files=files, total=total)
+        if len(rows) < PURGE_CHUNK_SIZE:
+            break
+        time.sleep(PURGE_CHUNK_PAUSE_SECONDS)
+    finish_user_removal(user_id)
 
 def list_all_resources() -> list[dict]:
     """List all resources."""
@@ -56,12 +123,18 @@ def list_all_resources() -> list[dict]:
 
 def list_resources_by_user(user_id: int) -> list[dict]:
     """List resources by a specific user."""
-    from app.services.user_services import get_user_by_id
-
-    if not get_user_by_id(user_id):
+    if not get_user_profile(user_id):
         raise ValueError("User does not exist.")
     return resource_crud.get_resources_by_user(user_id)
 
+def list_resource_rows(user_id: int, resource_type: Optional[str] = None, tags: Optional[list[str]] = None) -> list[ResourceRow]:
+    """List compact rows for rendering a user's resources, filtered by type or by any of the given tags."""
+    return resource_crud.get_resource_rows(user_id, resource_type, tags)
+
+def get_list_validator(user_id: Optional[int] = None) -> tuple[int, Optional[datetime]]:
+    """Get the (count, latest updated_at) pair that changes whenever a listing of the user's resources would."""
+    return resource_crud.get_resource_validator(user_id)
+
 def list_resources_by_type(user_id: int, resource_type: str) -> list[dict]:
     """List resources by type."""
     return resource_crud.get_resources_by_type(user_id, resource_type)
@@ -82,21 +155,28 @@ def list_resources_by_source(user_id: int, source: str) -> list[dict]:
     """List resources by source."""
     return resource_crud.get_resources_by_source(user_id, source)
 
-def mark_as_read(resource_id: int) -> Optional[dict]:
-    """Mark a resource as read."""
-    if not resource_crud.get_resource_by_id(resource_id):
+def mark_as_read(resource_id: int, user_id: Optional[int] = None) -> Optional[dict]:
+    """Mark a resource as read, optionally only if `user_id` owns it."""
+    resource = resource_crud.mark_resource_as_read(resource_id, user_id)
+    if not resource:
         raise ValueError("Resource does not exist.")
-    return resource_crud.mark_resource_as_read(resource_id)
+    return resource
 
-def toggle_star(resource_id: int) -> Optional[dict]:
-    """Toggle the star status of a resource."""
-    if not resource_crud.get_resource_by_id(resource_id):
+def toggle_star(resource_id: int, user_id: Optional[int] = None) -> Optional[dict]:
+    """Toggle the star status of a resource, optionally only if `user_id` owns it."""
+    resource = resource_crud.toggle_star_resource(resource_id, user_id)
+    if not resource:
         raise ValueError("Resource does not exist.")
-    return resource_crud.toggle_star_resource(resource_id)
+    return resource
+
+def search_for_resources(user_id: int, query: str, limit: int = 50, fuzzy: bool = False) -> list[dict]:
+    """Search a user's resources by title, description, tags and uploaded document text, best matches first.
 
-def search_for_resources(user_id: int, query: str) -> list[dict]:
-    """Search for resources by a query string."""
-    return resource_crud.search_resources(user_id, query)
+    With `fuzzy`, titles, tags and sources are matched by trigram similarity instead, so misspelt words still match.
+    """
+    if fuzzy:
+        return [resource for resource, _ in fuzzy_search_resources(user_id, query, limit)]
+    return [resource for resource, _ in search_resource_matches(user_id, query, limit)]
 
 def list_recent_resources(user_id: int, limit: int = 10) -> list[dict]:
     """List recent resources for a user."""
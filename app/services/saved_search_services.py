@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Saved searches: named resource filters whose members are materialized and kept current on every write."""
+
+from typing import Optional
+import app.crud.saved_search_crud as saved_search_crud
+from app.schemas.resource import ResourceFilter, ResourceRow
+from app.schemas.saved_search import SavedSearch
+
+
+def split_tags(tags: Optional[str]) -> list[str]:
+    """The distinct non-empty tags of a comma-separated list, in order."""
+    return list(dict.fromkeys(tag.strip() for tag in (tags or "").split(",") if tag.strip()))
+
+def save_search(user_id: int, name: str, criteria: ResourceFilter) -> SavedSearch:
+    """Save a filter as a smart collection. Its current members are materialized straight away."""
+    name = name.strip()
+    if not name:
+        raise ValueError("Give the collection a name.")
+    tags = split_tags(criteria.tags)
+    if not (criteria.type or tags or criteria.read_status is not None or criteria.starred is not None):
+        raise ValueError("Choose at least one of type, tags, read or starred.")
+    saved = saved_search_crud.create_saved_search(
+        user_id, name, type=criteria.type or None, tags=tags, read_status=criteria.read_status, starred=criteria.starred
+    )
+    if saved is None:
+        raise ValueError(f"You already have a collection named '{name}'.")
+    return saved
+
+def list_saved_searches(user_id: int) -> list[SavedSearch]:
+    """The user's saved searches with their member counts, by name."""
+    return saved_search_crud.get_saved_searches(user_id)
+
+def get_saved_search(user_id: int, search_id: int) -> Optional[SavedSearch]:
+    """One of the user's saved searches, if it exists."""
+    return saved_search_crud.get_saved_search(search_id, user_id)
+
+def list_collection_rows(search_id: int) -> list[ResourceRow]:
+    """The list rows of a saved search's members, read from its membership rather than by filtering the library."""
+    return saved_search_crud.get_member_rows(search_id)
+
+def remove_saved_search(user_id: int, search_id: int) -> bool:
+    """Delete one of the user's saved searches."""
+    return saved_search_crud.delete_saved_search(search_id, user_id)
+
+def rebuild_collections() -> int:
+    """Recompute every saved search's members. Returns the number of memberships."""
+    return saved_search_crud.rebuild_members()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""Full-text search over resources, including the text of uploaded documents, fuzzy search and autocomplete."""
+
+import threading
+from typing import Optional
+import app.crud.resource_crud as resource_crud
+import app.crud.search_crud as search_crud
+from app.core.config import TEXT_EXTRACT_MAX_CHARS, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS, FUZZY_MIN_SIMILARITY
+from app.core.events import change_feed, ResourceEvent, CREATED, UPDATED, DELETED, RESET
+from app.core.logging_config import logger
+from app.core.storage import storage, upload_name
+from app.schemas.resource import Resource as ResourceSchema, ResourceRow
+from app.services.job_services import enqueue, enqueue_many, job_handler
+from app.services.media_services import run_in_pool
+from app.utils.autocomplete import PrefixIndex, Suggestion
+from app.utils.cache import TTLCache
+from app.utils.documents import document_kind, extract_text
+from app.utils.trigrams import TrigramIndex
+from app.utils.urls import url_hash
+
+
+
+class UserIndexCache:
+    """Per-user in-memory indexes over some resource columns, loaded from the database on first use.
+
+    A change-feed listener applies every write to the loaded indexes, including writes committed while one is
+    loading. The TTL bounds staleness left by writes on other workers, like the fragment cache. Index classes
+    provide build(rows of id and the fields), add(id, *fields) and remove(id).
+    """
+
+    def __init__(self, index_class, maxsize: int, ttl: float, fields: tuple[str, ...] = ("title", "tags", "source")):
+        self.index_class = index_class
+        self.fields = fields
+        # Events carry a ResourceRow and the description; other fields are read back from the database
+        self._row_has_fields = set(fields) <= {*ResourceRow._fields, "description"}
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._building: dict[int, list[ResourceEvent]] = {}  # user id -> events to replay onto the index loading
+        self._loads: dict[int, list] = {}  # user id -> [load lock, callers holding or waiting for it]
+        self._lock = threading.Lock()
+        change_feed.add_listener(self.apply)
+
+    def get(self, user_id: int):
+        """The user's index, loading it on first use.
+
+        Concurrent first calls for a user (e.g. back-to-back keystrokes) wait for one load instead of each building.
+        """
+        index = self.cache.get(user_id)
+        if index is not None:
+            return index
+        with self._lock:
+            load = self._loads.setdefault(user_id, [threading.Lock(), 0])
+            load[1] += 1
+        try:
+            with load[0]:
+                index = self.cache.get(user_id)
+                if index is None:
+                    index = self._load(user_id)
+            return index
+        finally:
+            with self._lock:
+                load[1] -= 1
+                if not load[1]:
+                    del self._loads[user_id]
+
+    def _load(self, user_id: int):
+        """Build the user's index from the database and cache it. Callers hold the user's load lock."""
+        with self._lock:
+            self._building[user_id] = []
+        try:
+            index = self.index_class.build(search_crud.get_index_rows(user_id, self.fields))
+        finally:
+            with self._lock:
+                missed = self._building.pop(user_id)
+        # Writes committed while the rows were read may or may not be in them; applying them again is harmless
+        for event in missed:
+            self._apply(index, event)
+        self.cache.set(user_id, index)
+        return index
+
+    def apply(self, event: ResourceEvent) -> None:
+        """Change-feed listener that applies a write to the user's index, if one is loaded or loading."""
+        with self._lock:
+            if event.user_id in self._building:
+                self._building[event.user_id].append(event)
+        if event.action == RESET:
+            self.cache.invalidate(event.user_id)
+            return
+        index = self.cache.get(event.user_id)
+        if index is not None and event.action in (CREATED, UPDATED, DELETED):
+            self._apply(index, event)
+
+    def _apply(self, index, event: ResourceEvent) -> None:
+        if event.action == DELETED:
+            index.remove(event.resource_id)
+            return
+        if event.row is not None and self._row_has_fields:
+            index.add(event.resource_id, *(
+                event.description if field == "description" else getattr(event.row, field) for field in self.fields
+            ))
+            return
+        # Media jobs publish without the row
+        resource = resource_crud.get_resource_by_id(event.resource_id)
+        if resource is None:
+            index.remove(event.resource_id)
+        else:
+            index.add(event.resource_id, *(getattr(resource, field) for field in self.fields))
+
+    def clear(self) -> None:
+        """Drop every loaded index."""
+        self.cache.clear()
+
+
+fuzzy_indexes = UserIndexCache(TrigramIndex, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS)
+suggestion_indexes = UserIndexCache(PrefixIndex, SEARCH_INDEX_USERS, SEARCH_INDEX_TTL_SECONDS)
+
+def text_extraction_key(resource_id: int, url: str) -> str:
+    """Idempotency key of indexing one file of a resource: a resource pointed at a new file is indexed again."""
+    return f"extract_text:{resource_id}:{url_hash(url)}"
+
+def queue_text_extraction(resource_id: int, original_filename: Optional[str], url: str) -> None:
+    """Queue indexing of an uploaded document's text, for file types we can read."""
+    if document_kind(original_filename):
+        enqueue("extract_text", {"resource_id": resource_id}, key=text_extraction_key(resource_id, url))
+
+def queue_missing_text_extraction() -> int:
+    """Queue indexing for every uploaded document without indexed text, e.g. ones uploaded before indexing existed."""
+    jobs = [
+        ({"resource_id": resource_id}, text_extraction_key(resource_id, url))
+        for resource_id, original_filename, url in search_crud.get_unindexed_documents() if document_kind(original_filename)
+    ]
+    return enqueue_many("extract_text", jobs)
+
+@job_handler("extract_text")
+def index_resource_text(resource_id: int) -> Optional[int]:
+    """Job: extract the text of an uploaded document in the process pool and add it to the search index.
+
+    Returns the number of characters indexed, or None when the resource is gone or not a document.
+    """
+    resource = resource_crud.get_resource_by_id(resource_id)
+    kind = document_kind(resource.original_filename) if resource else None
+    if kind is None:
+        return None
+
+    with storage.local_copy(upload_name(resource.url)) as path:
+        body = run_in_pool(extract_text, path, kind, TEXT_EXTRACT_MAX_CHARS)
+    # An empty string, not NULL, marks a document that was read but had no text, so it is not queued again.
+    # Text read from a file the resource no longer points at is discarded; the job queued by the edit indexes the new one.
+    if not search_crud.set_resource_text(resource_id, body, resource.url):
+        return None
+    logger.info("Indexed %s characters of text for resource %s", len(body), resource_id)
+    return len(body)
+
+def search_resource_matches(user_id: int, query: str, limit: int = 50) -> list[tuple[ResourceSchema, str]]:
+    """Search titles, descriptions, tags and document text; best matches first, each with a snippet."""
+    return search_crud.search_resources(user_id, query, limit)
+
+def fuzzy_search_resources(user_id: int, query: str, limit: int = 50) -> list[tuple[ResourceSchema, float]]:
+    """Resources whose titles, tags or source words are close to the query words, despite typos; best first, with scores.
+
+    Similarity is the share of trigrams two words have in common, averaged over the query words.
+    """
+    matches = fuzzy_indexes.get(user_id).search(query, FUZZY_MIN_SIMILARITY, limit)
+    scores = dict(matches)
+    resources = search_crud.get_resources_in_order(user_id, [resource_id for resource_id, _ in matches])
+    return [(resource, scores[resource.id]) for resource in resources]
+
+def suggest_terms(user_id: int, prefix: str, kind: Optional[str] = None, limit: int = 10) -> list[Suggestion]:
+    """The user's most used tags, titles and sources starting with `prefix`, optionally of one kind only."""
+    return suggestion_indexes.get(user_id).complete(prefix, kind, limit)
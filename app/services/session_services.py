@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Service layer for server-side login sessions and cached user profiles."""
+
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from app.core.config import SESSION_MAX_AGE_SECONDS, SESSION_CACHE_TTL_SECONDS, USER_CACHE_SIZE
+from app.crud.session_crud import (
+    create_user_session, get_session_user, delete_user_session, delete_user_sessions, delete_expired_sessions
+)
+from app.crud.user_crud import get_user_by_id
+from app.schemas.user import User as UserSchema
+from app.utils.cache import TTLCache
+
+# session id -> (user id, session expiry); user id -> profile. Both are per-process, so revocations
+# made by another worker are picked up once the cached entry's TTL runs out.
+session_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl=SESSION_CACHE_TTL_SECONDS)
+
+
+def _session_id(token: str) -> str:
+    """Hash a cookie token into the id stored server-side."""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def start_session(user: UserSchema | dict) -> str:
+    """Create a server-side session for a logged-in user and return the token for the cookie."""
+    user = UserSchema.model_validate(user)
+    token = secrets.token_urlsafe(32)
+    expires_at = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=SESSION_MAX_AGE_SECONDS)
+    create_user_session(_session_id(token), user.id, expires_at)
+
+    session_cache.set(_session_id(token), (user.id, expires_at))
+    user_cache.set(user.id, user)
+    return token
+
+def get_session_user_profile(token: str) -> Optional[UserSchema]:
+    """Return the user behind a session token, served from cache on most requests."""
+    session_id = _session_id(token)
+    cached = session_cache.get(session_id)
+    if cached:
+        user_id, expires_at = cached
+        if expires_at > datetime.now(timezone.utc).replace(tzinfo=None):
+            user = user_cache.get(user_id)
+            if user is not None:
+                return user
+        else:
+            session_cache.invalidate(session_id)
+            return None
+
+    found = get_session_user(session_id)
+    if not found:
+        return None
+    user, expires_at = found
+    session_cache.set(session_id, (user.id, expires_at))
+    user_cache.set(user.id, user)
+    return user
+
+def end_session(token: str) -> None:
+    """Revoke one session, e.g. on logout."""
+    session_id = _session_id(token)
+    session_cache.invalidate(session_id)
+    delete_user_session(session_id)
+
+def revoke_user_sessions(user_id: int, keep_token: Optional[str] = None) -> int:
+    """Revoke every session of a user, optionally keeping the caller's own. Returns the number revoked."""
+    session_ids = delete_user_sessions(user_id, _session_id(keep_token) if keep_token else None)
+    for session_id in session_ids:
+        session_cache.invalidate(session_id)
+    invalidate_user(user_id)
+    return len(session_ids)
+
+def get_cached_user(user_id: int) -> Optional[UserSchema]:
+    """Get a user profile by ID through the profile cache."""
+    return user_cache.get_or_set(user_id, lambda: get_user_by_id(user_id))
+
+def invalidate_user(user_id: int) -> None:
+    """Drop a cached profile after the user row changes."""
+    user_cache.invalidate(user_id)
+
+def purge_expired_sessions() -> int:
+    """Delete expired sessions from the database."""
+    return delete_expired_sessions()
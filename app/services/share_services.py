@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Public sharing of single resources and tag collections through unguessable links."""
+
+from typing import Optional
+import app.crud.resource_crud as resource_crud
+import app.crud.share_crud as share_crud
+from app.core.shared_pages import invalidate_shared_page
+from app.schemas.resource import Resource as ResourceSchema
+from app.schemas.share_link import ShareLink
+from app.schemas.user import User as UserSchema
+
+
+def has_tag(resource: ResourceSchema, tag: str) -> bool:
+    """Whether one of a resource's comma-separated tags is `tag`, ignoring case and surrounding spaces."""
+    tag = tag.strip().lower()
+    return any(part.strip().lower() == tag for part in (resource.tags or "").split(","))
+
+def share_resource(user_id: int, resource_id: int) -> ShareLink:
+    """Publish one of the user's resources at a public link, reusing its link if it is already shared."""
+    resource = resource_crud.get_resource_by_id(resource_id)
+    if not resource or resource.user_id != user_id:
+        raise ValueError("Resource not found!")
+    return share_crud.create_share_link(user_id, resource_id=resource_id)
+
+def share_tag(user_id: int, tag: str) -> ShareLink:
+    """Publish every resource of the user carrying a tag, now or later, at a public link."""
+    tag = tag.strip()
+    if not tag or "," in tag:
+        raise ValueError("Enter a single tag to share.")
+    return share_crud.create_share_link(user_id, tag=tag)
+
+def revoke_share(user_id: int, link_id: int) -> bool:
+    """Delete one of the user's share links; its page stops being served straight away."""
+    revoked = share_crud.delete_share_link(link_id, user_id)
+    if revoked is None:
+        return False
+    invalidate_shared_page(revoked.token)
+    return True
+
+def list_shares(user_id: int) -> list[tuple[ShareLink, Optional[str]]]:
+    """The user's share links, newest first, with the titles of shared resources."""
+    return share_crud.get_share_links_by_user(user_id)
+
+def get_resource_share(user_id: int, resource_id: int) -> Optional[ShareLink]:
+    """The public link of one of the user's resources, if shared."""
+    return share_crud.get_share_link_for_resource(user_id, resource_id)
+
+def load_shared_content(token: str) -> Optional[tuple[ShareLink, UserSchema, list[ResourceSchema]]]:
+    """What a share link shows: the link, its owner, and the shared resource or the resources tagged with the
+    shared tag. None when the link is unknown, revoked, or its owner or resource is gone."""
+    content = share_crud.get_shared_content(token)
+    if content is None:
+        return None
+    link, owner, resources = content
+    if link.resource_id is not None:
+        return content if resources else None
+    return link, owner, [resource for resource in resources if has_tag(resource, link.tag)]
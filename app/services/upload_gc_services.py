@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Reconcile the uploads directory against the resources table and collect orphaned files."""
+
+import os
+import time
+from typing import Iterator
+import app.crud.media_crud as media_crud
+import app.crud.resource_crud as resource_crud
+from app.core.config import (
+    STORAGE_BACKEND, UPLOAD_DIR, UPLOAD_QUARANTINE_DIR, UPLOAD_GC_MIN_AGE_SECONDS, UPLOAD_GC_GRACE_SECONDS, UPLOAD_GC_INTERVAL_HOURS
+)
+from app.core.logging_config import logger
+from app.services.job_services import enqueue, job_handler, report_progress
+from app.services.media_services import THUMBNAIL_PREFIX
+
+from app.core.storage import UPLOAD_URL
+
+UPLOAD_PREFIX = "devsaver-"  # Every stored upload is named devsaver-<uuid><ext>
+STORED_PREFIXES = (UPLOAD_PREFIX, THUMBNAIL_PREFIX)
+GC_BATCH_SIZE = 1000
+
+
+def _stored_files(directory: str, min_age: float) -> Iterator[os.DirEntry]:
+    """Stream the upload files in a directory, skipping ones modified within the last `min_age` seconds."""
+    cutoff = time.time() - min_age
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith(STORED_PREFIXES) and entry.is_file(follow_symlinks=False):
+                    if entry.stat(follow_symlinks=False).st_mtime <= cutoff:
+                        yield entry
+    except FileNotFoundError:
+        return
+
+def _batches(entries: Iterator[os.DirEntry], size: int) -> Iterator[list[os.DirEntry]]:
+    batch = []
+    for entry in entries:
+        batch.append(entry)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _unreferenced(batch: list[os.DirEntry]) -> list[os.DirEntry]:
+    """The entries of a batch that no resource URL or thumbnail points at, checked with indexed IN queries."""
+    referenced = resource_crud.get_existing_urls([UPLOAD_URL + entry.name for entry in batch])
+    referenced = {url.removeprefix(UPLOAD_URL) for url in referenced}
+    referenced |= media_crud.get_existing_thumbnails([entry.name for entry in batch if entry.name.startswith(THUMBNAIL_PREFIX)])
+    return [entry for entry in batch if entry.name not in referenced]
+
+def sweep_quarantine(report: dict, grace: float, dry_run: bool = False) -> None:
+    """Delete quarantined files older than the grace period, restoring any that became referenced again."""
+    for batch in _batches(_stored_files(UPLOAD_QUARANTINE_DIR, grace), GC_BATCH_SIZE):
+        orphans = {entry.name for entry in _unreferenced(batch)}
+        for entry in batch:
+            if entry.name not in orphans:
+                if not dry_run:
+                    os.replace(entry.path, os.path.join(UPLOAD_DIR, entry.name))
+                report["restored"] += 1
+                continue
+            size = entry.stat(follow_symlinks=False).st_size
+            if not dry_run:
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+            report["deleted"] += 1
+            report["bytes_reclaimed"] += size
+
+def quarantine_orphans(report: dict, min_age: float, dry_run: bool = False) -> None:
+    """Move uploads that no resource references into the quarantine directory, batch by batch."""
+    if not dry_run:
+        os.makedirs(UPLOAD_QUARANTINE_DIR, exist_ok=True)
+    for batch in _batches(_stored_files(UPLOAD_DIR, min_age), GC_BATCH_SIZE):
+        report["scanned"] += len(batch)
+        for entry in _unreferenced(batch):
+            size = entry.stat(follow_symlinks=False).st_size
+            if not dry_run:
+                target = os.path.join(UPLOAD_QUARANTINE_DIR, entry.name)
+                try:
+                    os.replace(entry.path, target)
+                except FileNotFoundError:
+                    continue
+                os.utime(target)  # The grace period counts from quarantine, not from upload
+            report["quarantined"] += 1
+            report["quarantined_bytes"] += size
+        report_progress(**report)
+
+def reconcile_uploads(
+        min_age: float = UPLOAD_GC_MIN_AGE_SECONDS,
+        grace: float = UPLOAD_GC_GRACE_SECONDS,
+        dry_run: bool = False,
+) -> dict:
+    """Collect uploads that no resource references.
+
+    Files are streamed from the directory and checked against the url index in batches, so memory stays flat
+    however many files there are. Orphans older than `min_age` (so uploads still being saved are left alone)
+    are moved to the quarantine directory; quarantined files still unreferenced after `grace` seconds are
+    deleted on a later run. Returns counts and the bytes reclaimed.
+    """
+    report = {"scanned": 0, "quarantined": 0, "quarantined_bytes": 0, "restored": 0, "deleted": 0, "bytes_reclaimed": 0}
+    if STORAGE_BACKEND != "local":
+        # Only UPLOAD_DIR is reconciled; a bucket is not scanned from the app
+        logger.info("Upload reconciliation skipped: STORAGE_BACKEND is %s", STORAGE_BACKEND)
+        return {**report, "seconds": 0}
+    started = time.perf_counter()
+    sweep_quarantine(report, grace, dry_run)
+    quarantine_orphans(report, min_age, dry_run)
+    report["seconds"] = round(time.perf_counter() - started, 2)
+    logger.info("Upload reconciliation%s: %s", " (dry run)" if dry_run else "", report)
+    return report
+
+def schedule_upload_reconciliation(ahead: int = 0) -> None:
+    """Queue the run for the current interval (or `ahead` intervals later); each interval's run is queued once."""
+    if UPLOAD_GC_INTERVAL_HOURS <= 0 or STORAGE_BACKEND != "local":
+        return
+    interval = UPLOAD_GC_INTERVAL_HOURS * 60 * 60
+    slot = int(time.time() // interval) + ahead
+    enqueue("reconcile_uploads", key=f"reconcile_uploads:{slot}", delay=max(0.0, slot * interval - time.time()))
+
+@job_handler("reconcile_uploads")
+def reconcile_uploads_job() -> None:
+    """Job: reconcile uploads, then schedule the next interval's run."""
+    reconcile_uploads()
+    schedule_upload_reconciliation(ahead=1)
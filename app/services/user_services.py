@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Service layer for user-related operations."""
+
+from passlib.hash import argon2
+from typing import List, Optional
+from app.crud.user_crud import (
+    create_user, get_user_by_username, get_user_by_email,
+    get_user_by_id, update_user, soft_delete_user, delete_user, list_users, update_password, list_users_page
+)
+from app.schemas.user import UserList
+from app.services.session_services import get_cached_user, invalidate_user, revoke_user_sessions
+from app.services.job_services import enqueue
+from app.core.shared_pages import invalidate_user_pages
+
+MAX_USER_PAGE_SIZE = 100
+
+def register_user(username: str, email: str, password: str, fullname: Optional[str] = None) -> dict:
+    """Register a new user with unique username and email."""
+    # Accounts awaiting purge still hold their username and email
+    if get_user_by_username(username, include_deleted=True):
+        raise ValueError(f"The username '{username}' is already taken. Please choose a different username.")
+    
+    if '@' not in email or '.' not in email:
+        raise ValueError("Invalid email format")
+    
+    if len(password) < 8:
+        raise ValueError("Password must be at least 8 characters long.")
+    
+    if get_user_by_email(email, include_deleted=True):
+        raise ValueError("Email already exists! Please use a different email.")
+    password_hash = argon2.hash(password)
+    return create_user(username, email, password_hash, fullname)
+
+def authenticate_user(username: str, password: str) -> Optional[dict]:
+    """Authenticate a user by username and password."""
+    user = get_user_by_username(username)
+    if user and argon2.verify(password, user.password_hash):
+        return user.model_dump(exclude={"password_hash"}) # Exclude password hash from returned data
+    return None
+
+def get_user_profile(user_id: int) -> Optional[dict]:
+    """Get user profile by user ID, served from the profile cache when possible."""
+    return get_cached_user(user_id)
+
+def update_user_profile(user_id: int, **kwargs) -> Optional[dict]:
+    """Update user profile."""
+    if 'email' in kwargs:
+        if '@' not in kwargs['email'] or '.' not in kwargs['email']:
+            raise ValueError("Invalid email format!")
+        existing_user = get_user_by_email(kwargs['email'], include_deleted=True)
+        if existing_user and existing_user['id'] != user_id:
+            raise ValueError("Email already exists!")
+        
+    if 'username' in kwargs:
+        existing_user = get_user_by_username(kwargs['username'], include_deleted=True)
+        if existing_user and existing_user['id'] != user_id:
+            raise ValueError(f"Username {kwargs['username']} already taken!")
+
+    updated = update_user(user_id, **kwargs)
+    invalidate_user(user_id)
+    return updated
+
+def update_user_password(user_id: int, password: str, keep_session: Optional[str] = None) -> Optional[dict]:
+    """Update user password and sign out every other session of the user."""
+    if len(password) < 8:
+        raise ValueError("Password must be at least 8 characters long!")
+    updated = update_password(user_id, argon2.hash(password))
+    if updated:
+        revoke_user_sessions(user_id, keep_token=keep_session)
+    return updated
+
+def remove_user(user_id: int) -> bool:
+    """Soft-delete a user and revoke their sessions. Their resources, files and finally the row are purged in the background."""
+    if not soft_delete_user(user_id):
+        return False
+    revoke_user_sessions(user_id)
+    invalidate_user_pages(user_id)  # Their share links stop working with the account
+    # No idempotency key: user ids are reused, and soft_delete_user already lets only one call get this far
+    enqueue("purge_user_resources", {"user_id": user_id})
+    return True
+
+def finish_user_removal(user_id: int) -> bool:
+    """Delete a soft-deleted user's row after their resources are gone."""
+    invalidate_user(user_id)
+    return delete_user(user_id)
+
+def list_all_users() -> List[dict]:
+    """List all users."""
+    return [user.model_dump() for user in list_users()] 
+
+def list_users_paginated(
+        page: int = 1, page_size: int = 25, search: Optional[str] = None, sort: str = "created_at", descending: bool = True
+) -> UserList:
+    """List a page of users with resource counts, optionally filtered by a search term."""
+    page_size = min(max(page_size, 1), MAX_USER_PAGE_SIZE)
+    users, total = list_users_page(page, page_size, search or None, sort, descending)
+    return UserList(users=users, total=total, page=max(page, 1), size=page_size)
+
+def get_user_by_email_service(email: str) -> Optional[dict]:
+    """Get user by email."""
+    return get_user_by_email(email)
+
+def get_user_by_username_service(username: str) -> Optional[dict]:
+    """Get user by username."""
+    return get_user_by_username(username)
\ No newline at end of file
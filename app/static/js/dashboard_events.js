@@ -0,0 +1,67 @@
+// Keeps the dashboard list in sync with writes made in this or other tabs via /dashboard/events.
+(function () {
+  const rows = document.getElementById('resource-rows');
+  if (!rows || !window.EventSource) return;
+
+  const filter = rows.dataset.filter || 'All';
+  const tags = (rows.dataset.tags || '').split(',').map(t => t.trim().toLowerCase()).filter(Boolean);
+  const source = new EventSource('/dashboard/events');
+
+  function hasTag(event) {
+    const resourceTags = (event.tags || '').toLowerCase();
+    return tags.some(tag => resourceTags.includes(tag));
+  }
+
+  function matches(event, existing) {
+    // Search results are ranked server-side: keep listed rows up to date, but do not guess at new matches
+    if (filter === 'Search') return Boolean(existing);
+    if (filter === 'Tag') return hasTag(event);
+    if (filter === 'Collection') {
+      // The same criteria the server keeps the collection's membership with; empty ones match anything
+      const criteria = rows.dataset;
+      return (!criteria.collectionType || event.type === criteria.collectionType)
+        && (!criteria.readStatus || String(event.read_status) === criteria.readStatus)
+        && (!criteria.starred || String(event.starred) === criteria.starred)
+        && (!tags.length || hasTag(event));
+    }
+    return filter === 'All' || event.type === filter;
+  }
+
+  function refreshCount() {
+    const count = rows.querySelectorAll('[data-resource-id]').length;
+    const counter = document.getElementById('resource-count');
+    if (counter) counter.textContent = count;
+    const empty = document.getElementById('resource-empty');
+    if (empty) empty.hidden = count > 0;
+  }
+
+  source.addEventListener('resource', function (message) {
+    const event = JSON.parse(message.data);
+    if (event.action === 'reset') {
+      window.location.reload();
+      return;
+    }
+
+    const existing = rows.querySelector(`[data-resource-id="${event.id}"]`);
+    if (event.action === 'deleted' || !matches(event, existing)) {
+      if (existing) existing.remove();
+    } else {
+      const template = document.createElement('template');
+      template.innerHTML = event.html.trim();
+      const row = template.content.firstElementChild;
+      if (existing) existing.replaceWith(row);
+      else rows.appendChild(row);
+    }
+    refreshCount();
+  });
+
+  // While the stream is live, star and delete without a full reload; the pushed event updates the row
+  rows.addEventListener('submit', function (e) {
+    const form = e.target;
+    if (source.readyState !== EventSource.OPEN) return;
+    if (!form.classList.contains('star-form') && !form.classList.contains('delete-form')) return;
+    e.preventDefault();
+    fetch(form.action, { method: 'POST', redirect: 'manual', credentials: 'same-origin' })
+      .catch(() => form.submit());
+  });
+})();
@@ -0,0 +1,48 @@
+// Warns on forms marked data-duplicate-check when the resource being entered looks like one already saved, asking
+// /resources/duplicates as the title, description or link change. data-duplicate-exclude names the resource being edited.
+(function () {
+  const DELAY_MS = 400;
+
+  document.querySelectorAll('form[data-duplicate-check]').forEach(function (form) {
+    const warning = form.querySelector('.duplicate-warning');
+    if (!warning || !window.fetch) return;
+    const list = warning.querySelector('ul');
+    const link = form.elements.external_url || form.elements.url;
+    const fields = [form.elements.title, form.elements.description, link].filter(Boolean);
+    let timer = null;
+    let controller = null;
+
+    function check() {
+      const params = new URLSearchParams({
+        title: form.elements.title ? form.elements.title.value : '',
+        description: form.elements.description ? form.elements.description.value : '',
+        url: link ? link.value : '',
+        limit: 3,
+      });
+      if (form.dataset.duplicateExclude) params.set('exclude', form.dataset.duplicateExclude);
+      if (controller) controller.abort();
+      controller = new AbortController();
+      fetch('/resources/duplicates?' + params, { credentials: 'same-origin', signal: controller.signal })
+        .then(response => response.ok ? response.json() : [])
+        .then(function (duplicates) {
+          list.replaceChildren(...duplicates.map(function (duplicate) {
+            const item = document.createElement('li');
+            const anchor = document.createElement('a');
+            anchor.href = '/dashboard/' + duplicate.id + '/view';
+            anchor.textContent = duplicate.title;
+            item.append(anchor, ' (' + Math.round(duplicate.score * 100) + '% similar)');
+            return item;
+          }));
+          warning.hidden = duplicates.length === 0;
+        })
+        .catch(() => {});
+    }
+
+    fields.forEach(function (field) {
+      field.addEventListener('input', function () {
+        clearTimeout(timer);
+        timer = setTimeout(check, DELAY_MS);
+      });
+    });
+  });
+})();
@@ -0,0 +1,45 @@
+// As-you-type suggestions for inputs marked data-suggest (optionally ="tag", "title" or "source"), filled into their
+// datalist from /resources/suggest. Inputs marked data-suggest-list hold comma-separated values; the last one is completed.
+(function () {
+  const DELAY_MS = 120;
+
+  document.querySelectorAll('input[data-suggest]').forEach(function (input) {
+    const list = input.list;
+    if (!list || !window.fetch) return;
+    const kind = input.dataset.suggest;
+    const multiple = input.hasAttribute('data-suggest-list');
+    let timer = null;
+    let controller = null;
+
+    function complete() {
+      const value = input.value;
+      const cut = multiple ? value.lastIndexOf(',') + 1 : 0;
+      const head = cut ? value.slice(0, cut) + ' ' : '';
+      const prefix = value.slice(cut).trim();
+      if (!prefix) {
+        list.replaceChildren();
+        return;
+      }
+      const params = new URLSearchParams({ q: prefix });
+      if (kind) params.set('kind', kind);
+      if (controller) controller.abort();
+      controller = new AbortController();
+      fetch('/resources/suggest?' + params, { credentials: 'same-origin', signal: controller.signal })
+        .then(response => response.ok ? response.json() : [])
+        .then(function (suggestions) {
+          list.replaceChildren(...suggestions.map(function (suggestion) {
+            const option = document.createElement('option');
+            option.value = head + suggestion.text;
+            if (!kind) option.label = suggestion.kind;
+            return option;
+          }));
+        })
+        .catch(() => {});
+    }
+
+    input.addEventListener('input', function () {
+      clearTimeout(timer);
+      timer = setTimeout(complete, DELAY_MS);
+    });
+  });
+})();
@@ -0,0 +1,25 @@
+#!/usr/bin/env python3
+"""Tests for the load-test report helpers."""
+
+from app.cli.loadtest import percentile, summarize, format_report
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles on a sorted sample."""
+    values = [float(n) for n in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 95) == 95.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) == 0.0
+
+def test_summarize_reports_per_route_latency_and_errors():
+    """Test the summary aggregates throughput, errors and latencies in milliseconds."""
+    samples = {"GET /dashboard": [0.01, 0.02, 0.03, 0.04], "POST /login": [0.2]}
+    report = summarize(samples, {"POST /login": 1}, elapsed=2.0)
+
+    assert report["requests"] == 5
+    assert report["errors"] == 1
+    assert report["rps"] == 2.5
+    assert report["routes"]["GET /dashboard"]["p50"] == 20.0
+    assert report["routes"]["GET /dashboard"]["p99"] == 40.0
+    assert "POST /login" in format_report(report)
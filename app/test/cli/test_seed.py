@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for the bulk seeding command."""
+
+from app.test.conftest import db_session
+from app.models.user import User
+from app.models.resource import Resource
+from app.test.factories.user_factory import UserFactory
+from app.cli.seed import seed_database, seeded_usernames, generate_resource_batch, TAG_VOCABULARY
+
+
+def test_seed_database_inserts_users_and_resources(db_session):
+    """Test seeding the requested number of rows in batches."""
+    report = seed_database(users=5, resources=250, batch_size=100, commit_every=100, workers=0, seed=7, bind=db_session.get_bind())
+
+    assert report["users"] == 5
+    assert report["resources"] == 250
+    assert db_session.query(User).count() == 5
+    assert db_session.query(Resource).count() == 250
+
+    user_ids = {user.id for user in db_session.query(User).all()}
+    owners = {row[0] for row in db_session.query(Resource.user_id).distinct().all()}
+    assert owners <= user_ids
+
+def test_seed_database_appends_after_existing_users(db_session):
+    """Test a second seed run continues user ids instead of colliding."""
+    bind = db_session.get_bind()
+    seed_database(users=3, resources=0, workers=0, seed=1, bind=bind)
+    report = seed_database(users=2, resources=10, workers=0, seed=2, bind=bind)
+
+    assert report["first_user_id"] == 4
+    assert db_session.query(User).count() == 5
+
+def test_seeded_usernames_follow_row_ids_not_a_fixed_range(db_session):
+    """Test load-test accounts are found by prefix when ids don't start at 1."""
+    UserFactory(username="alice")
+    UserFactory(username="bob")
+    db_session.commit()  # The seeder tunes pragmas, which needs no open transaction
+    bind = db_session.get_bind()
+    report = seed_database(users=3, resources=0, workers=0, seed=1, bind=bind)
+
+    assert report["usernames"] == ("seed_user_3", "seed_user_5")
+    assert seeded_usernames(10, bind=bind) == ["seed_user_3", "seed_user_4", "seed_user_5"]
+    assert seeded_usernames(2, bind=bind) == ["seed_user_3", "seed_user_4"]
+
+def test_generate_resource_batch_is_deterministic():
+    """Test the same seed produces the same batch so runs are reproducible."""
+    first = generate_resource_batch((42, 50, 1, 10, 30))
+    second = generate_resource_batch((42, 50, 1, 10, 30))
+
+    assert [row["url"] for row in first] == [row["url"] for row in second]
+    for row in first:
+        assert 1 <= row["user_id"] <= 10
+        assert all(tag in TAG_VOCABULARY for tag in row["tags"].split(", "))
+        assert row["original_filename"] is None or row["url"].startswith("/uploads/devsaver-")
@@ -7,6 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from app.core.database import Base
 from app.models.user import User
 from app.models.resource import Resource
+from app.test.query_counter import count_queries
 
 
 @pytest.fixture()
@@ -36,4 +37,10 @@ def set_factory_session(db_session, monkeypatch):
 
     # Patch the _meta.session attribute of each factory to use the db_session
     monkeypatch.setattr(UserFactory._meta, 'sqlalchemy_session', db_session)
-    monkeypatch.setattr(ResourceFactory._meta, 'sqlalchemy_session', db_session)
\ No newline at end of file
+    monkeypatch.setattr(ResourceFactory._meta, 'sqlalchemy_session', db_session)
+
+@pytest.fixture()
+def query_counter(db_session):
+    """Count SQL statements sent through the engine behind db_session."""
+    with count_queries(db_session.get_bind()) as counter:
+        yield counter
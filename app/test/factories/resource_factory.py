@@ -23,7 +23,7 @@ class ResourceFactory(factory.alchemy.SQLAlchemyModelFactory):
         lambda: ", ".join(faker.words(nb=3, ext_word_list=["python", "orm", "sqlalchemy", "fastapi", "testing"],)))
     type = factory.Faker('random_element', elements=['article', 'video', 'book', 'tutorial', 'image', 'podcast'])
     source = factory.Faker('url')
-    url = factory.Faker('url')
+    url = factory.Sequence(lambda n: f"{faker.url()}resources/{n}")  # Unique per user, as the url_hash index requires
     read_status = factory.Faker('boolean')
     starred = factory.Faker('boolean')
     created_at = factory.Faker('date_time_this_year', tzinfo=None)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""SQL statement counting for query-budget assertions in tests."""
+
+from contextlib import contextmanager
+from collections.abc import Generator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryCounter:
+    """Records every SQL statement an engine sends to the database."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    @property
+    def count(self) -> int:
+        """Number of statements recorded so far."""
+        return len(self.statements)
+
+    def reset(self) -> None:
+        """Forget statements recorded so far, e.g. after test setup."""
+        self.statements.clear()
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def assert_at_most(self, budget: int, label: str = "block") -> None:
+        """Fail with the offending statements if the budget was exceeded."""
+        assert self.count <= budget, (
+            f"{label} issued {self.count} queries, budget is {budget}:\n" + "\n".join(self.statements)
+        )
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Generator[QueryCounter, None, None]:
+    """Count the SQL statements issued through an engine inside the with block."""
+    counter = QueryCounter()
+    event.listen(engine, "before_cursor_execute", counter._record)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", counter._record)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Fixtures for route tests against the FastAPI app."""
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core import database
+from app.core.database import Base
+from app.models.user import User
+from app.services.user_services import register_user
+from app.services.session_services import session_cache, user_cache
+from app.core.fragments import fragment_cache
+from app.core.shared_pages import shared_page_cache
+from app.core.storage import LocalStorage
+from app.routes.resource import resources
+from app.services import duplicate_services, media_services, related_services, resource_services, search_services
+from main import app
+
+TEST_PASSWORD = "password123"
+
+
+@pytest.fixture()
+def app_engine(monkeypatch):
+    """Point the app's sessions at a fresh in-memory database shared across threads."""
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    monkeypatch.setattr(database.SessionLocal, "kw", {**database.SessionLocal.kw, "bind": engine})
+    session_cache.clear()
+    user_cache.clear()
+    fragment_cache.clear()
+    shared_page_cache.clear()
+    search_services.fuzzy_indexes.clear()
+    search_services.suggestion_indexes.clear()
+    related_services.related_indexes.clear()
+    duplicate_services.duplicate_indexes.clear()
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+
+@pytest.fixture()
+def local_storage(tmp_path, monkeypatch):
+    """Store uploads in a temporary directory for the routes and services that use them."""
+    storage = LocalStorage(str(tmp_path / "uploads"))
+    monkeypatch.setattr(resources, "storage", storage)
+    monkeypatch.setattr(resource_services, "storage", storage)
+    monkeypatch.setattr(media_services, "storage", storage)
+    monkeypatch.setattr(search_services, "storage", storage)
+    return storage
+
+@pytest.fixture()
+def db_session(app_engine):
+    """Session on the app database so factories write rows the routes can see."""
+    session = sessionmaker(autocommit=False, autoflush=False, bind=app_engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture()
+def client(app_engine):
+    """Test client that does not follow redirects so each response can be asserted.
+
+    Not used as a context manager so startup events do not create tables in the real database.
+    """
+    return TestClient(app, follow_redirects=False)
+
+@pytest.fixture()
+def user(db_session):
+    """A registered user with a known password."""
+    registered = register_user("routeuser", "routeuser@example.com", TEST_PASSWORD, "Route User")
+    return db_session.get(User, registered.id)
+
+@pytest.fixture()
+def auth_client(client, user):
+    """Test client logged in as `user`."""
+    response = client.post("/login", data={"username": user.username, "password": TEST_PASSWORD})
+    assert response.status_code == 303
+    return client
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""Tests for the paginated admin user directory."""
+
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def test_users_api_paginates_with_total_header(auth_client, db_session):
+    """Test /users/ returns one page and reports the total in a header."""
+    UserFactory.create_batch(7, id=None)
+    db_session.commit()
+
+    response = auth_client.get("/users/", params={"page": 2, "size": 5, "sort": "id", "order": "asc"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Total-Count"] == "8"
+    assert len(response.json()) == 3
+
+def test_total_is_reported_past_the_last_page(auth_client, db_session):
+    """Test a page beyond the last still reports how many users there are."""
+    UserFactory.create_batch(3, id=None)
+    db_session.commit()
+
+    response = auth_client.get("/users/", params={"page": 99, "size": 5})
+    assert response.status_code == 404
+    assert response.headers["X-Total-Count"] == "4"
+    assert "Total users: 4" in auth_client.get("/admin", params={"page": 99}).text
+
+def test_users_api_rejects_unknown_sort_as_json(auth_client):
+    """Test an invalid sort or order is a 422 JSON error naming the parameter, not an HTML page."""
+    for params in ({"sort": "password_hash"}, {"order": "sideways"}):
+        response = auth_client.get("/users/", params=params)
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["query", next(iter(params))]
+
+def test_users_api_includes_resource_counts_sorted(auth_client, user, db_session):
+    """Test users sorted by resource count carry their counts."""
+    other = UserFactory(id=None)
+    ResourceFactory.create_batch(3, user=user)
+    ResourceFactory.create_batch(1, user=other)
+    db_session.commit()
+
+    response = auth_client.get("/users/", params={"sort": "resources"})
+
+    body = response.json()
+    assert [row["resource_count"] for row in body] == [3, 1]
+    assert body[0]["username"] == user.username
+
+def test_admin_search_filters_users(auth_client, db_session):
+    """Test the admin search box matches username, email or full name."""
+    UserFactory(id=None, username="findme", email="findme@example.com")
+    UserFactory(id=None, username="hidden", email="hidden@example.com")
+    db_session.commit()
+
+    response = auth_client.get("/admin", params={"q": "findme"})
+
+    assert response.status_code == 200
+    assert "findme@example.com" in response.text
+    assert "hidden@example.com" not in response.text
+    assert "Total users: 1" in response.text
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests for smart collections: saved searches with incrementally maintained membership."""
+
+from sqlalchemy import select, text
+from app.models.saved_search import SavedSearch, SavedSearchMember
+from app.schemas.resource import ResourceFilter
+from app.services.resource_services import add_resource, bulk_update_resources, remove_resource, update_resource_details
+from app.services.saved_search_services import list_saved_searches, rebuild_collections, save_search
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def members(db_session, search_id: int) -> set[int]:
+    db_session.expire_all()
+    return set(db_session.scalars(select(SavedSearchMember.resource_id).where(SavedSearchMember.search_id == search_id)))
+
+def member_count(db_session, search_id: int) -> int:
+    db_session.expire_all()
+    return db_session.get(SavedSearch, search_id).member_count
+
+def test_membership_follows_every_write(auth_client, user, db_session):
+    """Test resources join and leave a collection as they are added, retagged, read, bulk-updated and deleted."""
+    unread_python = ResourceFactory(user=user, tags="python, guides", read_status=False)
+    ResourceFactory(user=user, tags="python", read_status=True)
+    ResourceFactory(user=user, tags="rust", read_status=False)
+    ResourceFactory(user=UserFactory(id=None), tags="python", read_status=False)
+    db_session.commit()
+
+    response = auth_client.post("/collections", data={"name": "Unread Python", "tags": "Python, fastapi", "read_status": "false"})
+    search_id = db_session.scalar(select(SavedSearch.id))
+    assert response.headers["location"] == f"/dashboard?collection={search_id}"
+    assert members(db_session, search_id) == {unread_python.id} and member_count(db_session, search_id) == 1
+
+    added = add_resource(title="FastAPI tips", type="Link", source="Blog", user_id=user.id, url="https://example.com/fastapi", tags="fastapi")
+    assert members(db_session, search_id) == {unread_python.id, added.id}
+
+    update_resource_details(unread_python.id, tags="guides")
+    bulk_update_resources([added.id], read_status=True)
+    assert members(db_session, search_id) == set() and member_count(db_session, search_id) == 0
+
+    bulk_update_resources([added.id], read_status=False)
+    update_resource_details(unread_python.id, title="Renamed")  # Columns the collection ignores change nothing
+    assert members(db_session, search_id) == {added.id}
+    remove_resource(added.id)
+    assert members(db_session, search_id) == set() and member_count(db_session, search_id) == 0
+
+def test_opening_a_collection_reads_its_members(auth_client, user, db_session, query_counter):
+    """Test a collection page lists its members with the stored count in a fixed number of indexed queries."""
+    starred = [ResourceFactory(user=user, title=f"Starred video {n}", type="Video", starred=True) for n in range(3)]
+    ResourceFactory(user=user, title="Plain video", type="Video", starred=False)
+    db_session.commit()
+    saved = save_search(user.id, "Starred videos", ResourceFilter(type="Video", starred=True))
+    assert saved.member_count == 3
+
+    query_counter.reset()
+    response = auth_client.get("/dashboard", params={"collection": saved.id})
+    query_counter.assert_at_most(4, "GET /dashboard?collection")  # Session, collection, validator, members
+    assert response.status_code == 200
+    assert all(resource.title in response.text for resource in starred) and "Plain video" not in response.text
+    assert 'data-filter="Collection"' in response.text and 'data-starred="true"' in response.text
+
+    query_counter.reset()
+    revalidated = auth_client.get("/dashboard", params={"collection": saved.id}, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+    query_counter.assert_at_most(3, "GET /dashboard?collection (304)")
+
+    lookup = select(SavedSearchMember.resource_id).where(SavedSearchMember.search_id == saved.id)
+    plan = db_session.execute(text(f"EXPLAIN QUERY PLAN {lookup.compile(compile_kwargs={'literal_binds': True})}")).all()
+    assert "SEARCH saved_search_members" in " ".join(row[-1] for row in plan)
+
+    assert auth_client.post(f"/collections/{saved.id}/delete").headers["location"] == "/collections?msg=deleted"
+    assert auth_client.get("/dashboard", params={"collection": saved.id}).status_code == 404
+    assert db_session.query(SavedSearchMember).count() == 0
+
+def test_collections_are_private_and_validated(auth_client, user, db_session):
+    """Test collections need a name and a criterion, names are unique per user, and others' collections are hidden."""
+    theirs = save_search(UserFactory(id=None).id, "Theirs", ResourceFilter(tags="python"))
+    db_session.commit()
+
+    assert auth_client.post("/collections", data={"name": "Everything"}).status_code == 400
+    assert auth_client.post("/collections", data={"name": "Python", "tags": "python"}).status_code == 303
+    duplicate = auth_client.post("/collections", data={"name": "Python", "type": "Link"})
+    assert duplicate.status_code == 400 and "already have a collection" in duplicate.text
+    assert [search.name for search in list_saved_searches(user.id)] == ["Python"]
+    assert "Python" in auth_client.get("/collections").text
+
+    assert auth_client.get("/dashboard", params={"collection": theirs.id}).status_code == 404
+    assert auth_client.post(f"/collections/{theirs.id}/delete").status_code == 404
+
+def test_rebuild_matches_incremental_membership(user, db_session):
+    """Test recomputing every collection from scratch gives the memberships and counts the triggers maintained."""
+    for n in range(30):
+        ResourceFactory(user=user, type=("Video", "Link")[n % 2], tags=("python", "rust, python", None)[n % 3], starred=n % 4 == 0, read_status=n % 5 == 0)
+    db_session.commit()
+    searches = [
+        save_search(user.id, "Python links", ResourceFilter(type="Link", tags="python")),
+        save_search(user.id, "Unstarred unread", ResourceFilter(starred=False, read_status=False)),
+    ]
+    resource_ids = list(db_session.scalars(select(SavedSearchMember.resource_id).distinct()))
+    bulk_update_resources(resource_ids[::2], starred=True)
+    update_resource_details(resource_ids[1], tags="rust")
+    remove_resource(resource_ids[3])
+
+    before = {search.id: (members(db_session, search.id), member_count(db_session, search.id)) for search in searches}
+    assert rebuild_collections() == sum(len(ids) for ids, _ in before.values())
+    after = {search.id: (members(db_session, search.id), member_count(db_session, search.id)) for search in searches}
+    assert after == before and all(count == len(ids) for ids, count in after.values())
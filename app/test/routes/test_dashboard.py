@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Tests for the dashboard listing."""
+
+from app.crud.resource_crud import get_resource_rows
+from app.schemas.resource import ResourceRow
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def test_tag_search_lists_each_match_once(auth_client, user, query_counter):
+    """Test a multi-tag search is one listing query and lists a resource matching several tags once."""
+    ResourceFactory(user=user, title="Both tags", tags="python, fastapi")
+    ResourceFactory(user=user, title="Only fastapi", tags="fastapi")
+    ResourceFactory(user=user, title="Neither", tags="rust")
+
+    query_counter.reset()
+    response = auth_client.get("/dashboard", params={"tags": "python, fastapi"})
+
+    assert response.status_code == 200
+    assert response.text.count("Both tags") == 1
+    assert "Only fastapi" in response.text
+    assert "Neither" not in response.text
+    query_counter.assert_at_most(2, "GET /dashboard?tags")  # validator + listing
+
+def test_resource_rows_are_plain_tuples(user):
+    """Test list rows carry only the rendered columns and are filtered by type."""
+    video = ResourceFactory(user=user, type="Video")
+    ResourceFactory(user=user, type="Link")
+
+    rows = get_resource_rows(user.id, resource_type="Video")
+
+    assert [row.id for row in rows] == [video.id]
+    assert type(rows[0]) is ResourceRow
+    assert rows[0].title == video.title and rows[0].starred == video.starred
+
+def test_preview_is_cached_and_revalidated(auth_client, user, query_counter):
+    """Test reopening a preview touches no table and a matching ETag gets 304."""
+    resource = ResourceFactory(user=user, type="Link")
+    first = auth_client.get(f"/dashboard/{resource.id}/preview")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    query_counter.reset()
+    again = auth_client.get(f"/dashboard/{resource.id}/preview")
+    revalidated = auth_client.get(f"/dashboard/{resource.id}/preview", headers={"If-None-Match": etag})
+
+    assert again.text == first.text
+    assert revalidated.status_code == 304
+    query_counter.assert_at_most(0, "cached preview")
+
+def test_preview_changes_after_edit(auth_client, user):
+    """Test a write drops the cached preview and its row so both show the new state."""
+    resource = ResourceFactory(user=user, title="Before edit", type="Link", starred=False)
+    etag = auth_client.get(f"/dashboard/{resource.id}/preview").headers["etag"]
+    assert ">Star<" in auth_client.get("/dashboard").text
+
+    auth_client.post(f"/resources/edit-resource/{resource.id}", data={"title": "After edit"})
+    auth_client.post(f"/resources/toggle-star/{resource.id}")
+
+    response = auth_client.get(f"/dashboard/{resource.id}/preview", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert "After edit" in response.text
+    assert ">Unstar<" in auth_client.get("/dashboard").text
+
+def test_preview_of_another_users_resource_is_hidden(auth_client):
+    """Test previews are only shown to the resource owner."""
+    resource = ResourceFactory(user=UserFactory(id=None))
+
+    assert auth_client.get(f"/dashboard/{resource.id}/preview").status_code == 404
+
+def test_dashboard_etag_follows_writes(auth_client, user):
+    """Test the dashboard ETag changes on insert, edit and delete, and with the query string."""
+    resource = ResourceFactory(user=user, type="Link")
+    etags = [auth_client.get("/dashboard").headers["etag"]]
+
+    auth_client.post(f"/resources/edit-resource/{resource.id}", data={"title": "Edited"})
+    etags.append(auth_client.get("/dashboard").headers["etag"])
+    auth_client.post(
+        "/resources/upload",
+        data={"title": "New", "type": "Link", "source": "docs", "external_url": "https://example.com/new"},
+    )
+    etags.append(auth_client.get("/dashboard").headers["etag"])
+    auth_client.post(f"/resources/delete-resource/{resource.id}")
+    etags.append(auth_client.get("/dashboard").headers["etag"])
+    etags.append(auth_client.get("/dashboard", params={"filter": "Video"}).headers["etag"])
+
+    assert len(set(etags)) == len(etags)
+    assert auth_client.get("/dashboard", headers={"If-None-Match": etags[-2]}).status_code == 304
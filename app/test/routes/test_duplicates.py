@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Tests for URL canonicalization, the unique URL index and near-duplicate detection."""
+
+import pytest
+from sqlalchemy import update
+import app.crud.resource_crud as resource_crud
+from app.models.resource import Resource
+from app.services import duplicate_services
+from app.services.resource_services import add_resource, update_resource_details, DuplicateResource
+from app.utils.minhash import DuplicateIndex
+from app.utils.urls import canonical_url, identity_url
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+ARTICLE = "How Python descriptors power properties, methods and slots, with examples of writing your own"
+
+
+def test_canonical_url():
+    """Test links to the same page agree once tracking, casing, www., ports, fragments and slashes are dropped."""
+    canonical = "https://example.com/blog/post?id=7&page=2"
+    assert canonical_url("HTTP://WWW.Example.com:80/blog//post/?page=2&id=7&utm_source=x&fbclid=abc#comments") == canonical
+    assert canonical_url("https://m.example.com/blog/post?id=7&page=2&gclid=1") == canonical
+    assert canonical_url("https://example.com/a%7Eb") == canonical_url("https://example.com/a~b")
+    assert canonical_url("https://youtu.be/dQw4w9WgXcQ?si=share") == "https://youtube.com/watch?v=dQw4w9WgXcQ"
+    assert canonical_url("https://example.com:8443/") == "https://example.com:8443"
+    assert canonical_url("/uploads/devsaver-abc.pdf") is None
+    assert canonical_url("mailto:someone@example.com") is None
+
+def test_identity_url_keeps_what_can_select_a_page():
+    """Test the unique-index form drops only click parameters and spelling, not schemes, hosts or content parameters."""
+    assert identity_url("HTTPS://Example.com:443/blog/post/?utm_source=x&id=7&fbclid=abc#comments") == "https://example.com/blog/post?id=7"
+    assert identity_url("https://example.com/a%7Eb") == identity_url("https://example.com/a~b")
+    assert identity_url("https://example.com/raw/file?ref=v1") != identity_url("https://example.com/raw/file?ref=v2")
+    assert identity_url("http://example.com/post") != identity_url("https://example.com/post")
+    assert identity_url("https://m.example.com/post") != identity_url("https://example.com/post")
+    assert identity_url("https://example.com/search?b=2&a=1") == "https://example.com/search?b=2&a=1"
+    assert identity_url("/uploads/devsaver-abc.pdf") is None
+
+def test_upload_with_a_tracking_link_finds_the_existing_resource(auth_client, user, db_session):
+    """Test uploading a link that differs only by tracking parameters leads to the saved resource."""
+    existing = ResourceFactory(user=user, url="https://example.com/articles/descriptors", description=ARTICLE)
+    db_session.commit()
+
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Anything", "type": "Link", "source": "Blog", "external_url": "https://example.com/articles/descriptors/?utm_campaign=feed"},
+    )
+    assert response.status_code == 303
+    assert response.headers["location"] == f"/resources/edit-resource/{existing.id}?msg=resource_exists"
+    assert db_session.query(Resource).count() == 1
+
+def test_duplicate_check_matches_near_identical_text(auth_client, user, db_session):
+    """Test the check finds resources with nearly the same title and description, but not other users' or unrelated ones."""
+    saved = ResourceFactory(user=user, title="Python descriptors explained", description=ARTICLE, url="https://a.example/descriptors")
+    other = ResourceFactory(user=user, title="Sourdough starter", description="Feeding a starter with flour and water", url="https://b.example/bread")
+    ResourceFactory(user=UserFactory(id=None), title="Python descriptors explained", description=ARTICLE)
+    db_session.commit()
+
+    params = {"title": "Python Descriptors, Explained!", "description": ARTICLE + " (updated)", "url": "https://c.example/copy"}
+    matches = auth_client.get("/resources/duplicates", params=params).json()
+    assert [match["id"] for match in matches] == [saved.id]
+    assert 0.7 <= matches[0]["score"] <= 1.0
+    assert auth_client.get("/resources/duplicates", params={**params, "exclude": saved.id}).json() == []
+    assert auth_client.get("/resources/duplicates", params={"title": "  "}).json() == []
+
+    update_resource_details(other.id, title="Python descriptors explained", description=ARTICLE)
+    assert {r.id for r, _ in duplicate_services.find_duplicates(user.id, title=params["title"], description=params["description"])} == {saved.id, other.id}
+
+def test_duplicates_report_groups_the_library(auth_client, user, db_session):
+    """Test the report joins resources sharing a canonical URL or near-identical text, and leaves the rest out."""
+    first = ResourceFactory(user=user, title="Python descriptors explained", description=ARTICLE, url="https://a.example/one")
+    second = ResourceFactory(user=user, title="Python descriptors, explained", description=ARTICLE, url="https://a.example/two")
+    linked = ResourceFactory(user=user, title="Docker volumes", description="Persisting container data", url="http://www.d.example/vol/")
+    mirror = ResourceFactory(user=user, title="Volumes", description="Where container data lives", url="https://d.example/vol?ref=feed")
+    copy = ResourceFactory(user=user, title="Bind mounts", description="Sharing host folders", url="https://d.example/elsewhere")
+    ResourceFactory(user=user, title="Sourdough starter", description="Feeding a starter with flour and water", url="https://b.example/bread")
+    db_session.commit()
+    # A copy saved before the unique index existed, which the backfill leaves without a key
+    db_session.execute(update(Resource).where(Resource.id == copy.id).values(url="http://www.d.example/vol?utm_source=feed", url_key=None, url_hash=None))
+    db_session.commit()
+    assert resource_crud.backfill_url_hashes() == 0
+
+    report = auth_client.get("/resources/duplicates/report").json()
+    assert [[resource["id"] for resource in group] for group in report] == [[first.id, second.id], [linked.id, mirror.id, copy.id]]
+
+def test_backfill_recomputes_keys_of_the_older_form(user, db_session):
+    """Test link keys stored in the old aggressive form are recomputed, freeing pages that only that form merged."""
+    resource = ResourceFactory(user=user, url="https://example.com/raw/file?ref=v1")
+    db_session.commit()
+    db_session.execute(update(Resource).where(Resource.id == resource.id).values(url_key="https://example.com/raw/file", url_hash="stale"))
+    db_session.commit()
+
+    assert resource_crud.backfill_url_hashes() == 1
+    db_session.expire_all()
+    assert db_session.get(Resource, resource.id).url_key == "url:https://example.com/raw/file?ref=v1"
+    assert add_resource(title="v2", type="Link", source="Blog", user_id=user.id, url="https://example.com/raw/file?ref=v2")
+    assert resource_crud.backfill_url_hashes() == 0
+
+def test_incremental_index_matches_bulk_build():
+    """Test adding resources one by one indexes them exactly as a bulk build does, and removal undoes an add."""
+    rows = [
+        (1, "https://a.example", "Python descriptors explained", ARTICLE),
+        (2, None, "Python descriptors, explained", ARTICLE),
+        (3, "https://b.example", "", None),
+        (4, None, "Sourdough starter", "Feeding a starter with flour and water"),
+    ]
+    built, incremental = DuplicateIndex.build(rows), DuplicateIndex()
+    for row in rows:
+        incremental.add(*row)
+    assert built._buckets == incremental._buckets and len(built) == len(incremental) == 4
+    assert built.duplicate_groups(0.7) == incremental.duplicate_groups(0.7) == [[1, 2]]
+
+    incremental.remove(2)
+    incremental.remove(3)
+    assert incremental.lookup("https://a.example/#top", "Unrelated", None, 0.7) == [(1, 1.0)]
+    assert incremental.duplicate_groups(0.7) == [] and incremental.lookup("https://b.example", None, None, 0.7) == []
+
+def test_unique_url_index_rejects_duplicates_in_one_round_trip(auth_client, user, db_session, query_counter):
+    """Test the insert itself refuses a second copy of a link or file name, while other users and new links get in."""
+    first = add_resource(title="Descriptors", type="Link", source="Blog", user_id=user.id, url="https://example.com/descriptors?utm_source=rss")
+    with pytest.raises(DuplicateResource) as duplicate:
+        add_resource(title="Again", type="Link", source="Blog", user_id=user.id, url="https://Example.com:443/descriptors/?fbclid=abc")
+    assert duplicate.value.existing.id == first.id
+    add_resource(title="Plain http", type="Link", source="Blog", user_id=user.id, url="http://www.example.com/descriptors/")
+    other = UserFactory(id=None)
+    db_session.commit()
+    add_resource(title="Theirs", type="Link", source="Blog", user_id=other.id, url="https://example.com/descriptors")
+    add_resource(title="Notes", type="File", source="Other", user_id=user.id, url="/uploads/devsaver-1.txt", original_filename="notes.txt")
+    assert db_session.query(Resource.url_key).filter(Resource.id == first.id).scalar() == "url:https://example.com/descriptors"
+
+    query_counter.reset()
+    response = auth_client.post("/resources/upload", data={"title": "Same", "type": "Link", "source": "Blog", "external_url": "https://example.com/descriptors#intro"})
+    assert response.headers["location"] == f"/resources/edit-resource/{first.id}?msg=resource_exists"
+    query_counter.assert_at_most(3, "POST /resources/upload of a duplicate")  # Session, insert, existing resource
+    assert db_session.query(Resource).filter(Resource.user_id == user.id).count() == 3
+
+def test_editing_onto_another_resources_url_leads_to_it(auth_client, user, db_session):
+    """Test changing a link to one the user already saved leads to that resource instead of failing."""
+    kept = ResourceFactory(user=user, url="https://example.com/kept")
+    moved = ResourceFactory(user=user, url="https://example.com/moved")
+    db_session.commit()
+
+    response = auth_client.post(f"/resources/edit-resource/{moved.id}", data={"title": moved.title, "type": moved.type, "source": moved.source, "url": "https://example.com/kept/#top"})
+    assert response.status_code == 303
+    assert response.headers["location"] == f"/resources/edit-resource/{kept.id}?msg=resource_exists"
+    db_session.expire_all()
+    assert db_session.get(Resource, moved.id).url == "https://example.com/moved"
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for the resource change feed and the dashboard event stream."""
+
+import asyncio
+import json
+import threading
+from app.core.events import ChangeFeed, ResourceEvent, change_feed, CREATED, UPDATED, DELETED, RESET
+from app.core.fragments import fragment_cache, store_preview_fragment, get_preview_fragment
+from app.routes.dashboard import format_resource_event, resource_event_stream
+from app.services.resource_services import toggle_star
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def test_feed_delivers_events_published_from_threads():
+    """Test a subscriber's loop receives events published from a worker thread, and only its user's."""
+    feed = ChangeFeed()
+
+    async def scenario():
+        subscription = feed.subscribe(1)
+        publisher = threading.Thread(target=lambda: [feed.publish(ResourceEvent(UPDATED, 2, 9)), feed.publish(ResourceEvent(CREATED, 1, 7))])
+        publisher.start()
+        event = await asyncio.wait_for(subscription.get(), timeout=2)
+        publisher.join()
+        feed.unsubscribe(subscription)
+        return event
+
+    assert asyncio.run(scenario()) == ResourceEvent(CREATED, 1, 7)
+    assert feed.subscriber_count() == 0
+
+def test_slow_subscriber_gets_a_reset():
+    """Test a full queue collapses into a single reset instead of growing or dropping silently."""
+    feed = ChangeFeed(queue_size=2)
+
+    async def scenario():
+        subscription = feed.subscribe(1)
+        for resource_id in range(4):
+            feed.publish(ResourceEvent(UPDATED, 1, resource_id))
+        await asyncio.sleep(0)
+        events = [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+        feed.unsubscribe(subscription)
+        return events
+
+    events = asyncio.run(scenario())
+    assert [event.action for event in events] == [RESET, UPDATED]
+
+def test_writes_publish_and_invalidate_previews(user, db_session):
+    """Test a committed write reaches listeners with the new row and drops the cached preview."""
+    resource = ResourceFactory(user=user, starred=False)
+    store_preview_fragment(resource.id, user.id, resource.updated_at, "<p>old</p>")
+    events = []
+    change_feed.add_listener(events.append)
+    try:
+        toggle_star(resource.id)
+    finally:
+        change_feed.remove_listener(events.append)
+
+    assert [(event.action, event.resource_id) for event in events] == [(UPDATED, resource.id)]
+    assert events[0].row.starred is True
+    assert get_preview_fragment(resource.id) is None
+
+def test_event_stream_renders_rows(user, db_session):
+    """Test the stream opens with a retry hint, then sends the changed row's HTML and bare deletions."""
+    resource = ResourceFactory(user=user)
+    fragment_cache.clear()
+
+    async def scenario():
+        subscription = change_feed.subscribe(user.id)
+        stream = resource_event_stream(subscription)
+        messages = [await anext(stream)]
+        toggle_star(resource.id)
+        messages.append(await anext(stream))
+        await stream.aclose()
+        return messages
+
+    retry, message = asyncio.run(scenario())
+    assert retry == "retry: 5000\n\n"
+    assert message.startswith("event: resource\ndata: ")
+    data = json.loads(message.split("data: ", 1)[1])
+    assert data["action"] == UPDATED and data["id"] == resource.id
+    assert f'data-resource-id="{resource.id}"' in data["html"]
+    assert change_feed.subscriber_count(user.id) == 0
+
+    deleted = json.loads(format_resource_event(ResourceEvent(DELETED, user.id, resource.id)).split("data: ", 1)[1])
+    assert deleted == {"action": DELETED, "id": resource.id}
+
+def test_delete_redirects_and_checks_owner(auth_client, user, db_session):
+    """Test deleting redirects back to the dashboard and refuses other users' resources."""
+    own = ResourceFactory(user=user)
+    other = ResourceFactory(user=UserFactory(id=None))
+
+    response = auth_client.post(f"/resources/delete-resource/{own.id}")
+    assert response.status_code == 303
+    assert response.headers["location"] == "/dashboard?msg=deleted"
+
+    auth_client.post(f"/resources/delete-resource/{other.id}")
+    db_session.expire_all()
+    assert db_session.get(type(other), other.id) is not None
+
+def test_event_stream_requires_login(client):
+    """Test anonymous clients are sent to the login page instead of subscribing."""
+    response = client.get("/dashboard/events")
+    assert response.status_code == 303
+    assert change_feed.subscriber_count() == 0
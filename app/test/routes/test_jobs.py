@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Tests for the persistent background job queue."""
+
+import json
+import pytest
+from pathlib import Path
+from app.crud import job_crud
+from app.models.resource import Resource
+from app.models.user import User
+from app.crud.user_crud import get_user_by_id
+from app.services import job_services, resource_services
+from app.services.job_services import enqueue, job_handler, run_pending_jobs
+from app.services.user_services import remove_user, authenticate_user
+from app.services.resource_services import list_all_resources
+from app.test.routes.conftest import TEST_PASSWORD
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+@pytest.fixture()
+def flaky_handler(monkeypatch):
+    """A handler that fails its first two calls, with retries due immediately."""
+    calls = []
+
+    @job_handler("test_flaky", max_attempts=3)
+    def flaky(value: int) -> None:
+        calls.append(value)
+        if len(calls) < 3:
+            raise RuntimeError("not yet")
+
+    monkeypatch.setattr(job_services, "retry_delay", lambda attempts: 0)
+    yield calls
+    job_services._handlers.pop("test_flaky", None)
+
+def test_idempotency_key_queues_once(app_engine):
+    """Test enqueueing the same key twice returns the first job instead of adding another."""
+    first = enqueue("test_noop", {"n": 1}, key="same")
+    second = enqueue("test_noop", {"n": 2}, key="same")
+
+    assert first == second
+    assert job_crud.count_jobs_by_status() == {"queued": 1}
+
+def test_idempotency_key_is_released_when_the_job_finishes(app_engine, local_storage):
+    """Test a key only dedupes against unfinished work: after its job runs, the same key queues new work."""
+    for name in ("first.txt", "second.txt"):
+        Path(local_storage.path(name)).write_text("data")
+        job_id = enqueue("delete_upload", {"url": f"/uploads/{name}"}, key="delete_upload:1")
+        assert job_crud.get_job(job_id).payload == json.dumps({"url": f"/uploads/{name}"})
+        assert run_pending_jobs() == 1
+        assert not local_storage.exists(name)
+    assert job_crud.count_jobs_by_status() == {"done": 2}
+
+def test_failed_jobs_retry_then_succeed(app_engine, flaky_handler):
+    """Test a failing job is requeued with its attempt count and completes on a later attempt."""
+    job_id = enqueue("test_flaky", {"value": 7})
+
+    run_pending_jobs()
+
+    job = job_crud.get_job(job_id)
+    assert flaky_handler == [7, 7, 7]
+    assert job.status == job_crud.DONE
+    assert job.attempts == 3
+
+def test_jobs_fail_after_max_attempts(app_engine, monkeypatch):
+    """Test a job that keeps failing ends up failed with its last error, and can be retried by hand."""
+    monkeypatch.setattr(job_services, "retry_delay", lambda attempts: 0)
+    job_id = enqueue("test_unregistered")
+
+    run_pending_jobs()
+
+    job = job_crud.get_job(job_id)
+    assert job.status == job_crud.FAILED
+    assert job.attempts == job.max_attempts
+    assert "No handler registered" in job.last_error
+    assert job_services.retry_job(job_id)
+    assert job_crud.get_job(job_id).status == job_crud.QUEUED
+
+def test_claim_is_exclusive(app_engine):
+    """Test a claimed job cannot be claimed again until its lease expires."""
+    enqueue("test_noop")
+
+    assert job_crud.claim_job("worker-a") is not None
+    assert job_crud.claim_job("worker-b") is None
+    assert job_crud.requeue_stale_jobs(lease_seconds=-1) == 1
+    assert job_crud.claim_job("worker-b").attempts == 2
+
+def test_expired_lease_on_last_attempt_fails_the_job(app_engine):
+    """Test a job whose lease expires on its final attempt fails and frees its key instead of running again."""
+    job_id = job_crud.enqueue_job("test_noop", idempotency_key="last-try", max_attempts=1)
+    assert job_crud.claim_job("worker-a") is not None
+
+    assert job_crud.requeue_stale_jobs(lease_seconds=-1) == 1
+    job = job_crud.get_job(job_id)
+    assert job.status == job_crud.FAILED
+    assert job.idempotency_key is None
+    assert job_crud.claim_job("worker-b") is None
+    assert job_crud.enqueue_job("test_noop", idempotency_key="last-try") != job_id
+
+def test_worker_that_lost_its_lease_keeps_the_new_outcome(app_engine):
+    """Test a worker finishing after its lease was taken over cannot overwrite the new run's result."""
+    job_id = enqueue("test_noop")
+    stalled = job_crud.claim_job("worker-a")
+    job_crud.requeue_stale_jobs(lease_seconds=-1)
+    assert job_crud.claim_job("worker-b") is not None
+
+    assert not job_crud.complete_job(job_id, "worker-a")
+    assert job_crud.fail_job(job_id, "worker-a", "boom", retry_in=0) is None
+    assert job_services.execute_job(stalled) == job_crud.RUNNING
+    job = job_crud.get_job(job_id)
+    assert (job.status, job.locked_by) == (job_crud.RUNNING, "worker-b")
+
+    assert job_crud.complete_job(job_id, "worker-b")
+    assert job_crud.get_job(job_id).status == job_crud.DONE
+
+def test_delete_resource_removes_file_in_background(auth_client, user, db_session, local_storage):
+    """Test deleting an uploaded resource returns before its file is removed, and a worker removes it."""
+    stored = Path(local_storage.path("stored.txt"))
+    stored.write_text("data")
+    resource = ResourceFactory(user=user, url="/uploads/stored.txt", original_filename="notes.txt")
+    db_session.commit()
+
+    assert auth_client.post(f"/resources/delete-resource/{resource.id}").status_code == 303
+    assert stored.exists()
+
+    assert run_pending_jobs() == 1
+    assert not stored.exists()
+
+def test_reused_resource_id_deletes_its_own_upload(user, db_session, local_storage):
+    """Test a resource reusing a deleted one's id gets its file deleted, even before the first deletion has run."""
+    for name in ("first.txt", "second.txt"):
+        Path(local_storage.path(name)).write_text("data")
+        resource = ResourceFactory(id=900, user=user, url=f"/uploads/{name}", original_filename=name)
+        db_session.commit()
+        resource_services.remove_resource(resource.id)
+        db_session.expunge(resource)
+
+    assert run_pending_jobs() == 2
+    assert not local_storage.exists("first.txt") and not local_storage.exists("second.txt")
+
+def test_remove_user_purges_resources(user, db_session, local_storage, monkeypatch):
+    """Test removing a user hides them at once, then a purge deletes their resources in chunks, their files and the row."""
+    monkeypatch.setattr(resource_services, "PURGE_CHUNK_SIZE", 2)
+    monkeypatch.setattr(resource_services, "PURGE_CHUNK_PAUSE_SECONDS", 0)
+    Path(local_storage.path("a.txt")).write_text("a")
+    ResourceFactory(user=user, url="/uploads/a.txt", original_filename="a.txt")
+    ResourceFactory.create_batch(4, user=user, original_filename=None)
+    db_session.commit()
+    user_id, username = user.id, user.username
+
+    assert remove_user(user_id)
+    assert not remove_user(user_id)
+    assert get_user_by_id(user_id) is None
+    assert authenticate_user(username, TEST_PASSWORD) is None
+    assert list_all_resources() == []
+    db_session.expire_all()
+    assert db_session.query(Resource).filter_by(user_id=user_id).count() == 5
+
+    assert run_pending_jobs() == 2  # The purge, then the file deletion it queued
+    assert db_session.query(Resource).filter_by(user_id=user_id).count() == 0
+    assert db_session.get(User, user_id) is None
+    assert not local_storage.exists("a.txt")
+    purge = job_crud.list_jobs(limit=2)[-1]
+    assert json.loads(purge.progress) == {"deleted": 5, "files": 1, "total": 5}
+
+def test_reused_user_id_is_purged_again(user, db_session):
+    """Test an account that gets the id of a purged one is purged in turn when removed."""
+    user_id = user.id
+    assert remove_user(user_id)
+    assert run_pending_jobs() == 1
+    db_session.expire_all()
+    assert db_session.get(User, user_id) is None
+
+    reborn = UserFactory(id=user_id)
+    ResourceFactory.create_batch(2, user=reborn, original_filename=None)
+    db_session.commit()
+
+    assert remove_user(user_id)
+    assert run_pending_jobs() == 1
+    db_session.expire_all()
+    assert db_session.get(User, user_id) is None
+    assert db_session.query(Resource).filter_by(user_id=user_id).count() == 0
+
+def test_deleted_user_session_stops_working(auth_client, user):
+    """Test a soft-deleted user's existing login is rejected."""
+    remove_user(user.id)
+
+    assert auth_client.get("/dashboard").status_code == 303
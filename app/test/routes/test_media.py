@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Tests for uploaded media metadata and thumbnail extraction."""
+
+import struct
+import zlib
+import pytest
+from pathlib import Path
+from app.crud import media_crud
+from app.models.resource import Resource
+from app.services import media_services
+from app.services.job_services import run_pending_jobs
+from app.services.resource_services import remove_resource
+from app.utils import media
+from app.utils.media import image_size, mp4_info, pdf_page_count
+
+
+def png_bytes(width: int, height: int) -> bytes:
+    """A valid single-colour PNG."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + b"\x80\x80\x80" * width for _ in range(height))
+    header = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+def box(kind: bytes, payload: bytes) -> bytes:
+    return struct.pack(">I", 8 + len(payload)) + kind + payload
+
+def mp4_bytes(seconds: int, width: int, height: int) -> bytes:
+    """The boxes of an MP4 that carry its duration and frame size, with the movie header after the media data."""
+    mvhd = box(b"mvhd", b"\x00\x00\x00\x00" + struct.pack(">IIII", 0, 0, 1000, seconds * 1000) + b"\x00" * 80)
+    tkhd = box(b"tkhd", b"\x00\x00\x00\x00" + b"\x00" * 72 + struct.pack(">II", width << 16, height << 16))
+    return box(b"ftyp", b"isom\x00\x00\x02\x00") + box(b"mdat", b"\x00" * 1000) + box(b"moov", mvhd + box(b"trak", tkhd))
+
+def test_probes_read_headers(tmp_path):
+    """Test dimensions, durations and page counts come from file headers without optional libraries."""
+    files = {
+        "a.png": png_bytes(40, 30),
+        "a.gif": b"GIF89a" + struct.pack("<HH", 64, 48) + b"\x00" * 20,
+        "a.jpg": b"\xff\xd8\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+                 + b"\xff\xc0" + struct.pack(">HBHH", 17, 8, 600, 800) + b"\x00" * 12,
+        "a.mp4": mp4_bytes(95, 1280, 720),
+        "a.pdf": b"%PDF-1.4\n1 0 obj << /Type /Pages /Kids [2 0 R 3 0 R] /Count 2 >>\n"
+                 b"2 0 obj << /Type /Page >>\n3 0 obj <</Type/Page>>\n%%EOF",
+    }
+    for name, data in files.items():
+        (tmp_path / name).write_bytes(data)
+
+    assert image_size(str(tmp_path / "a.png")) == (40, 30)
+    assert image_size(str(tmp_path / "a.gif")) == (64, 48)
+    assert image_size(str(tmp_path / "a.jpg")) == (800, 600)
+    assert mp4_info(str(tmp_path / "a.mp4")) == {"duration_seconds": 95.0, "width": 1280, "height": 720}
+    assert pdf_page_count(str(tmp_path / "a.pdf")) == 2
+
+def test_upload_is_extracted_in_process_pool(auth_client, db_session, local_storage):
+    """Test an uploaded image gets its metadata from a pool worker and the preview shows it."""
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Diagram", "type": "Image", "source": "Other"},
+        files={"file": ("diagram.png", png_bytes(40, 30), "image/png")},
+    )
+    assert response.status_code == 303
+    resource_id = db_session.query(Resource.id).scalar()
+
+    try:
+        assert run_pending_jobs() == 1
+    finally:
+        media_services.shutdown_media_pool()
+
+    extracted = media_crud.get_media(resource_id)
+    assert (extracted.kind, extracted.width, extracted.height) == ("image", 40, 30)
+    assert "40 &times; 30" in auth_client.get(f"/dashboard/{resource_id}/preview").text
+
+def test_identical_files_reuse_extraction(user, db_session, local_storage, monkeypatch):
+    """Test a second copy of a file, under another name, reuses the first one's metadata and thumbnail instead of extracting again."""
+    calls = []
+    monkeypatch.setattr(media_services, "_extract", lambda path, kind, content_hash: calls.append(path) or {
+        "kind": kind, "thumbnail": media_services.thumbnail_name(content_hash), "width": 40, "height": 30,
+    })
+    ids = []
+    for name in ("devsaver-a.png", "devsaver-b.png"):
+        Path(local_storage.path(name)).write_bytes(png_bytes(40, 30))
+        resource = Resource(title=name, type="Image", source="Other", url=f"/uploads/{name}", original_filename=name, user_id=user.id)
+        db_session.add(resource)
+        db_session.commit()
+        ids.append(resource.id)
+        media_services.extract_resource_media(resource.id)
+
+    first, second = (media_crud.get_media(resource_id) for resource_id in ids)
+    assert len(calls) == 1
+    assert first.thumbnail == second.thumbnail and first.content_hash == second.content_hash
+
+    remove_resource(ids[0])
+    assert media_crud.get_media(ids[0]) is None
+
+@pytest.mark.skipif(media.Image is None, reason="needs Pillow")
+def test_image_thumbnail_fits_box(tmp_path):
+    """Test image thumbnails are scaled down to fit the configured box."""
+    source = tmp_path / "big.png"
+    source.write_bytes(png_bytes(800, 400))
+
+    assert media.render_thumbnail(str(source), media.IMAGE, str(tmp_path / "thumb.jpg"), 320)
+    assert image_size(str(tmp_path / "thumb.jpg")) == (320, 160)
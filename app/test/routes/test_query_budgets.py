@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Query-count budgets for routes so N+1 patterns fail the test suite."""
+
+import pytest
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+from app.test.routes.conftest import TEST_PASSWORD
+
+# Maximum SQL statements per request. Budgets must not grow with the number of rows.
+# Listings spend one query on the count/max(updated_at) validator before loading rows.
+QUERY_BUDGETS = {
+    "login": 2,
+    "dashboard": 2,
+    "dashboard_not_modified": 1,
+    "admin": 1,
+    "rss": 2,
+    "upload": 2,
+}
+
+
+def test_login_query_budget(client, user, query_counter):
+    """Test logging in looks the user up once."""
+    query_counter.reset()
+    response = client.post("/login", data={"username": user.username, "password": TEST_PASSWORD})
+
+    assert response.status_code == 303
+    query_counter.assert_at_most(QUERY_BUDGETS["login"], "POST /login")
+
+@pytest.mark.parametrize("rows", [3, 30])
+def test_dashboard_query_budget(auth_client, user, db_session, query_counter, rows):
+    """Test the dashboard query count does not depend on the number of resources."""
+    ResourceFactory.create_batch(rows, user=user)
+    db_session.commit()
+
+    query_counter.reset()
+    response = auth_client.get("/dashboard")
+
+    assert response.status_code == 200
+    query_counter.assert_at_most(QUERY_BUDGETS["dashboard"], "GET /dashboard")
+
+    query_counter.reset()
+    revalidated = auth_client.get("/dashboard", headers={"If-None-Match": response.headers["etag"]})
+
+    assert revalidated.status_code == 304
+    query_counter.assert_at_most(QUERY_BUDGETS["dashboard_not_modified"], "GET /dashboard (304)")
+
+@pytest.mark.parametrize("rows", [3, 30])
+def test_admin_query_budget(auth_client, db_session, query_counter, rows):
+    """Test the admin page query count does not depend on the number of users."""
+    UserFactory.create_batch(rows, id=None)
+    db_session.commit()
+
+    query_counter.reset()
+    response = auth_client.get("/admin")
+
+    assert response.status_code == 200
+    query_counter.assert_at_most(QUERY_BUDGETS["admin"], "GET /admin")
+
+@pytest.mark.parametrize("rows", [3, 30])
+def test_rss_query_budget(auth_client, user, db_session, query_counter, rows):
+    """Test the resource feed loads all resources in one query."""
+    ResourceFactory.create_batch(rows, user=user)
+    db_session.commit()
+
+    query_counter.reset()
+    response = auth_client.get("/rss/")
+
+    assert response.status_code == 200
+    assert len(response.json()) == rows
+    query_counter.assert_at_most(QUERY_BUDGETS["rss"], "GET /rss/")
+
+def test_upload_query_budget(auth_client, query_counter):
+    """Test uploading a link checks for duplicates and inserts within budget."""
+    query_counter.reset()
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Budget", "type": "Link", "source": "docs", "external_url": "https://example.com/budget"},
+    )
+
+    assert response.status_code == 303
+    assert response.headers["location"] == "/dashboard?msg=uploaded"
+    query_counter.assert_at_most(QUERY_BUDGETS["upload"], "POST /resources/upload")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Tests for related-resource recommendations."""
+
+from app.services import related_services
+from app.services.resource_services import update_resource_details
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def library(user):
+    """Two FastAPI resources, a Django one and one about baking."""
+    return [
+        ResourceFactory(user=user, title="FastAPI dependency injection", description="How FastAPI resolves dependencies", tags="python, fastapi"),
+        ResourceFactory(user=user, title="FastAPI background tasks", description="Running work after the response", tags="python, fastapi"),
+        ResourceFactory(user=user, title="Django ORM tips", description="Querysets and select_related", tags="python, django"),
+        ResourceFactory(user=user, title="Sourdough bread", description="Flour, water and salt", tags="baking"),
+    ]
+
+def test_related_resources_rank_by_similarity(user, db_session):
+    """Test neighbours are the most similar resources first, leave out unrelated ones and follow edits."""
+    fastapi, background, django, bread = library(user)
+    ResourceFactory(user=UserFactory(id=None), title="FastAPI dependency injection", tags="python, fastapi")
+    db_session.commit()
+
+    related = related_services.get_related_resources(fastapi.id, user.id)
+    assert [r.id for r, _ in related] == [background.id, django.id]
+    assert 1 > related[0][1] > related[1][1] > 0
+    assert related_services.get_related_resources(bread.id, user.id) == []
+
+    update_resource_details(bread.id, title="FastAPI deployment", tags="python, fastapi")
+    assert bread.id in [r.id for r, _ in related_services.get_related_resources(fastapi.id, user.id)]
+
+def test_batch_neighbours_match_single_lookups(user, db_session):
+    """Test the batched computation over a whole library agrees with per-resource lookups."""
+    resources = library(user) + [ResourceFactory(user=user, title=f"Python note {n}", tags="python") for n in range(20)]
+    db_session.commit()
+
+    batch = related_services.get_all_related_ids(user.id, 3)
+    related_services.related_indexes.clear()
+    index = related_services.related_indexes.get(user.id)
+    assert batch == {resource.id: index.neighbours(resource.id, 3) for resource in resources}
+
+def test_resource_page_lists_related_resources(auth_client, user, db_session):
+    """Test a resource page links related resources from the viewer's own library only."""
+    fastapi, background, _, _ = library(user)
+    someone_else = ResourceFactory(user=UserFactory(id=None), title="FastAPI routing", tags="python, fastapi")
+    db_session.commit()
+
+    page = auth_client.get(f"/dashboard/{fastapi.id}/view").text
+    assert "Related resources" in page and f"/dashboard/{background.id}/view" in page
+    assert f"/dashboard/{someone_else.id}/view" not in page
+    assert "Related resources" not in auth_client.get(f"/dashboard/{someone_else.id}/view").text
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Tests for the resources JSON API."""
+
+import json
+from fastapi.encoders import jsonable_encoder
+from app.schemas.resource import ResourcePublic
+from app.services.resource_services import remove_resource
+from app.test.factories.resource_factory import ResourceFactory
+from app.utils.pydantic import serialize
+
+
+def test_rss_lists_resources_as_json(auth_client, user):
+    """Test the list endpoint returns every resource in the ResourcePublic shape."""
+    resources = ResourceFactory.create_batch(3, user=user)
+
+    response = auth_client.get("/rss/")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    expected = [jsonable_encoder(ResourcePublic.model_validate(resource)) for resource in resources]
+    assert sorted(response.json(), key=lambda item: item["id"]) == expected
+
+def test_list_encoders_agree(user, db_session, monkeypatch):
+    """Test the orjson and pydantic encoders produce the same document."""
+    resources = ResourceFactory.create_batch(2, user=user)
+
+    monkeypatch.setattr(serialize, "JSON_ENCODER", "pydantic")
+    plain = serialize.dump_model_list(ResourcePublic, resources)
+    monkeypatch.setattr(serialize, "JSON_ENCODER", "orjson")
+    fast = serialize.dump_model_list(ResourcePublic, resources)
+
+    assert json.loads(plain) == json.loads(fast)
+    assert serialize.list_adapter(ResourcePublic) is serialize.list_adapter(ResourcePublic)
+
+def test_resource_conditional_get(auth_client, user, db_session):
+    """Test a resource answers If-None-Match and If-Modified-Since with 304 until it changes."""
+    resource = ResourceFactory(user=user)
+    response = auth_client.get(f"/rss/{resource.id}")
+    etag, last_modified = response.headers["etag"], response.headers["last-modified"]
+
+    assert auth_client.get(f"/rss/{resource.id}", headers={"If-None-Match": etag}).status_code == 304
+    assert auth_client.get(f"/rss/{resource.id}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    resource.updated_at = resource.updated_at.replace(year=resource.updated_at.year + 1)
+    db_session.commit()
+    changed = auth_client.get(f"/rss/{resource.id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+def test_list_revalidation_notices_deletes(auth_client, user, db_session):
+    """Test deleting a resource other than the newest is not hidden by If-Modified-Since revalidation."""
+    older, newest = ResourceFactory(user=user), ResourceFactory(user=user)
+    older.updated_at, newest.updated_at = newest.updated_at.replace(year=2020), newest.updated_at.replace(year=2030)
+    db_session.commit()
+    listing = auth_client.get("/rss/")
+    assert "last-modified" not in listing.headers
+    since = {"If-Modified-Since": "Tue, 01 Jan 2041 00:00:00 GMT"}
+    assert auth_client.get("/rss/", headers={"If-None-Match": listing.headers["etag"]}).status_code == 304
+
+    remove_resource(older.id)
+    for path in ("/rss/", "/dashboard"):
+        assert auth_client.get(path, headers=since).status_code == 200
+    relisted = auth_client.get("/rss/", headers={"If-None-Match": listing.headers["etag"]})
+    assert relisted.status_code == 200 and [item["id"] for item in relisted.json()] == [newest.id]
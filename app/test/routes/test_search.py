@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""Tests for full-text search over resources and uploaded document text."""
+
+import asyncio
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from app.crud import search_crud
+from app.routes import dashboard
+from app.models.resource import Resource
+from app.services import media_services, search_services
+from app.services.job_services import run_pending_jobs
+from app.services.resource_services import add_resource, search_for_resources, update_resource_details, remove_resource
+from app.utils.documents import extract_text, PDF, TEXT
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def pdf_bytes(*pages: str) -> bytes:
+    """A PDF whose pages show the given lines through Flate-compressed content streams."""
+    body = b"%PDF-1.4\n"
+    for number, line in enumerate(pages, 1):
+        content = zlib.compress(f"BT /F1 12 Tf 72 712 Td ({line}) Tj ET".encode("latin-1"))
+        body += b"%d 0 obj << /Length %d /Filter /FlateDecode >>\nstream\n" % (number, len(content)) + content + b"\nendstream\nendobj\n"
+    return body + b"%%EOF\n"
+
+def test_index_follows_inserts_updates_and_deletes(user, db_session):
+    """Test the triggers keep the index in step with resources, and results are ranked and private to their owner."""
+    in_title = ResourceFactory(user=user, title="Postgres indexing guide", description="notes")
+    in_description = ResourceFactory(user=user, title="Database notes", description="how postgres plans queries")
+    ResourceFactory(user=UserFactory(id=None), title="Postgres for someone else")
+    db_session.commit()
+
+    assert [r.id for r in search_for_resources(user.id, "postgres")] == [in_title.id, in_description.id]
+    assert [r.id for r in search_for_resources(user.id, "postg")] == [in_title.id, in_description.id]
+
+    update_resource_details(in_title.id, title="Index tuning guide")
+    remove_resource(in_description.id)
+    assert search_for_resources(user.id, "postgres") == []
+    assert [r.id for r in search_for_resources(user.id, "tuning")] == [in_title.id]
+
+def test_query_syntax_is_not_interpreted(user, db_session):
+    """Test user input containing FTS5 operators is searched as words instead of failing."""
+    ResourceFactory(user=user, title="C++ near operators")
+    db_session.commit()
+
+    assert len(search_for_resources(user.id, '"C++" NEAR(operators')) == 1
+    assert search_for_resources(user.id, '"*') == []
+
+def test_uploaded_document_text_is_searchable(auth_client, user, db_session, local_storage, monkeypatch):
+    """Test an uploaded text file is extracted in the pool, capped, ranked below title hits and cleared on URL change."""
+    monkeypatch.setattr(search_services, "TEXT_EXTRACT_MAX_CHARS", 60)
+    content = "Runbook for the kubernetes cluster upgrade. " + "filler " * 100 + "unreachable"
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Ops notes", "type": "Documentation", "source": "Other"},
+        files={"file": ("runbook.txt", content.encode(), "text/plain")},
+    )
+    assert response.status_code == 303
+    titled = ResourceFactory(user=user, title="Kubernetes basics")
+    db_session.commit()
+    uploaded_id = db_session.query(Resource.id).filter(Resource.title == "Ops notes").scalar()
+
+    try:
+        run_pending_jobs()
+    finally:
+        media_services.shutdown_media_pool()
+
+    assert len(search_crud.get_resource_text(uploaded_id)) == 60
+    assert [r.id for r in search_for_resources(user.id, "kubernetes")] == [titled.id, uploaded_id]
+    assert search_for_resources(user.id, "unreachable") == []
+    _, snippet = search_services.search_resource_matches(user.id, "upgrade")[0]
+    assert "[upgrade]" in snippet
+
+    update_resource_details(uploaded_id, url="/uploads/devsaver-replaced.txt")
+    assert search_crud.get_resource_text(uploaded_id) is None
+
+def test_changed_upload_url_is_indexed_again(auth_client, user, db_session, local_storage):
+    """Test pointing a resource at another file re-extracts its text, and a stale job cannot index the old file."""
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Release notes", "type": "Documentation", "source": "Other"},
+        files={"file": ("notes.txt", b"Quarterly alpaca migration", "text/plain")},
+    )
+    assert response.status_code == 303
+    resource = db_session.query(Resource).filter(Resource.title == "Release notes").one()
+    Path(local_storage.path("devsaver-second.txt")).write_text("Quarterly badger migration")
+
+    try:
+        run_pending_jobs()
+        assert [r.id for r in search_for_resources(user.id, "alpaca")] == [resource.id]
+
+        update_resource_details(resource.id, url="/uploads/devsaver-second.txt")
+        assert not search_crud.set_resource_text(resource.id, "Quarterly alpaca migration", resource.url)
+        assert run_pending_jobs() >= 1
+    finally:
+        media_services.shutdown_media_pool()
+
+    assert [r.id for r in search_for_resources(user.id, "badger")] == [resource.id]
+    assert search_for_resources(user.id, "alpaca") == []
+
+def test_indexed_text_revalidates_dashboard_search(auth_client, user, db_session, local_storage):
+    """Test a search cached before a document's text was indexed is not answered 304 afterwards."""
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Meeting minutes", "type": "Documentation", "source": "Other"},
+        files={"file": ("minutes.txt", b"Decided to adopt the wombat protocol", "text/plain")},
+    )
+    assert response.status_code == 303
+    before = auth_client.get("/dashboard", params={"q": "wombat"})
+    assert "Meeting minutes" not in before.text
+
+    try:
+        run_pending_jobs()
+    finally:
+        media_services.shutdown_media_pool()
+
+    after = auth_client.get("/dashboard", params={"q": "wombat"}, headers={"If-None-Match": before.headers["etag"]})
+    assert after.status_code == 200 and "Meeting minutes" in after.text
+
+def test_pdf_text_without_pypdf(tmp_path):
+    """Test PDF text is read page by page from compressed content streams, and text files are capped."""
+    pdf = tmp_path / "a.pdf"
+    pdf.write_bytes(pdf_bytes("Hello quantum world", r"Second \(page\) text"))
+    notes = tmp_path / "a.txt"
+    notes.write_text("alpha   beta\n\ngamma " * 10)
+
+    assert extract_text(str(pdf), PDF, 1000) == "Hello quantum world Second (page) text"
+    assert extract_text(str(notes), TEXT, 16) == "alpha beta gamma"
+
+def test_fuzzy_search_tolerates_typos(user, db_session):
+    """Test misspelt words match titles, tags and sources by trigram similarity, closest first."""
+    fastapi = ResourceFactory(user=user, title="FastAPI in production", tags="python, web", source="YouTube")
+    sqlalchemy = ResourceFactory(user=user, title="Session handling", tags="sqlalchemy", source="Blog")
+    ResourceFactory(user=user, title="Gardening tips", tags="plants", source="Other")
+    ResourceFactory(user=UserFactory(id=None), title="FastAPI for someone else", tags="web", source="Other")
+    db_session.commit()
+
+    assert search_for_resources(user.id, "fastpi") == []
+    assert [r.id for r in search_for_resources(user.id, "fastpi", fuzzy=True)] == [fastapi.id]
+    assert [r.id for r in search_for_resources(user.id, "sqlalchmey", fuzzy=True)] == [sqlalchemy.id]
+    assert [r.id for r in search_for_resources(user.id, "youtub", fuzzy=True)] == [fastapi.id]
+    (_, exact), = search_services.fuzzy_search_resources(user.id, "gardening")
+    (_, close), = search_services.fuzzy_search_resources(user.id, "gardenign")
+    assert exact == 1.0 and 0.3 <= close < 1.0
+
+def test_fuzzy_index_follows_the_change_feed(user, db_session, monkeypatch):
+    """Test the in-memory index is updated in place by writes, including ones committed while it loads."""
+    first = ResourceFactory(user=user, title="Kubernetes operators", tags="ops", source="Other")
+    db_session.commit()
+    assert [r.id for r in search_for_resources(user.id, "kubernets", fuzzy=True)] == [first.id]
+    index = search_services.fuzzy_indexes.cache.get(user.id)
+
+    update_resource_details(first.id, title="Terraform modules")
+    remove_resource(first.id)
+    added = add_resource(title="Kubernetes networking", type="Link", source="Other", user_id=user.id, url="https://k8s.example")
+    assert search_services.fuzzy_indexes.cache.get(user.id) is index
+    assert [r.id for r in search_for_resources(user.id, "kubernets", fuzzy=True)] == [added.id]
+    assert search_for_resources(user.id, "terraform", fuzzy=True) == []
+
+    search_services.fuzzy_indexes.clear()
+    load = search_crud.get_index_rows
+    def load_during_write(user_id, fields):
+        rows = load(user_id, fields)
+        update_resource_details(added.id, title="Helm charts")  # Committed after the rows were read
+        return rows
+    monkeypatch.setattr(search_crud, "get_index_rows", load_during_write)
+    assert [r.id for r in search_for_resources(user.id, "helm", fuzzy=True)] == [added.id]
+
+def test_dashboard_search_falls_back_to_fuzzy(auth_client, user, db_session):
+    """Test the dashboard search box lists close matches when nothing matches exactly."""
+    ResourceFactory(user=user, title="SQLAlchemy relationship loading", tags="orm", source="Other")
+    ResourceFactory(user=user, title="Unrelated", tags="misc", source="Other")
+    db_session.commit()
+
+    exact = auth_client.get("/dashboard", params={"q": "sqlalchemy"}).text
+    assert "SQLAlchemy relationship loading" in exact and "Unrelated" not in exact and "close matches" not in exact
+    fallback = auth_client.get("/dashboard", params={"q": "sqlalchmey"}).text
+    assert "SQLAlchemy relationship loading" in fallback and "close matches" in fallback
+    assert "No resources match" in auth_client.get("/dashboard", params={"q": "zzzz"}).text
+
+def test_concurrent_first_loads_build_one_index(user, db_session, monkeypatch):
+    """Test callers racing to load a user's index wait for a single build and all get it."""
+    ResourceFactory(user=user, title="Pytest fixtures", tags="python")
+    db_session.commit()
+    load, builds = search_crud.get_index_rows, []
+    def slow_load(user_id, fields):
+        builds.append(user_id)
+        time.sleep(0.1)
+        return load(user_id, fields)
+    monkeypatch.setattr(search_crud, "get_index_rows", slow_load)
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        indexes = list(pool.map(lambda _: search_services.fuzzy_indexes.get(user.id), range(4)))
+    assert builds == [user.id] and all(index is indexes[0] for index in indexes)
+    assert search_services.fuzzy_indexes._loads == {} and search_services.fuzzy_indexes._building == {}
+
+def test_dashboard_search_runs_off_the_event_loop(auth_client, user, db_session, monkeypatch):
+    """Test the dashboard's searches, including the fuzzy fallback that may build an index, run in the threadpool."""
+    ResourceFactory(user=user, title="SQLAlchemy relationship loading")
+    db_session.commit()
+    search, on_loop = dashboard.search_for_resources, []
+    def recording_search(*args, **kwargs):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return search(*args, **kwargs)
+    monkeypatch.setattr(dashboard, "search_for_resources", recording_search)
+
+    assert "SQLAlchemy relationship loading" in auth_client.get("/dashboard", params={"q": "sqlalchmey"}).text
+    assert on_loop == [False, False]  # The exact search, then the fuzzy fallback
+
+def test_suggestions_rank_by_use_and_follow_writes(auth_client, user, db_session):
+    """Test completions come from tags, titles and sources, most used first, and reflect edits without a reload."""
+    first = ResourceFactory(user=user, title="Pytest fixtures", tags="python, testing", source="YouTube")
+    ResourceFactory(user=user, title="Typing in Python", tags="Python, types", source="Blog")
+    ResourceFactory(user=UserFactory(id=None), title="Pyramid", tags="pyramid", source="Other")
+    db_session.commit()
+
+    response = auth_client.get("/resources/suggest", params={"q": "py"})
+    assert response.json() == [
+        {"text": "Python", "kind": "tag", "count": 2},
+        {"text": "Pytest fixtures", "kind": "title", "count": 1},
+    ]
+    assert [s["text"] for s in auth_client.get("/resources/suggest", params={"q": "T", "kind": "tag"}).json()] == ["types", "testing"]
+    index = search_services.suggestion_indexes.cache.get(user.id)
+
+    update_resource_details(first.id, tags="pyodide", source="Blog")
+    assert search_services.suggestion_indexes.cache.get(user.id) is index
+    assert search_services.suggest_terms(user.id, "py", "tag") == [("Python", "tag", 1), ("pyodide", "tag", 1)]
+    assert search_services.suggest_terms(user.id, "b", "source") == [("Blog", "source", 2)]
+    assert auth_client.get("/resources/suggest", params={"q": "  "}).json() == []
+    assert auth_client.get("/resources/suggest", params={"q": "py", "kind": "colour"}).status_code == 400
+
+def test_back_to_back_keystrokes_share_one_suggestion_load(auth_client, user, db_session, monkeypatch):
+    """Test as-you-type requests arriving together before the index is loaded all succeed from one build."""
+    ResourceFactory(user=user, title="Pytest fixtures", tags="python", source="Blog")
+    db_session.commit()
+    load, builds = search_crud.get_index_rows, []
+    def slow_load(user_id, fields):
+        builds.append(user_id)
+        time.sleep(0.1)
+        return load(user_id, fields)
+    monkeypatch.setattr(search_crud, "get_index_rows", slow_load)
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        responses = list(pool.map(lambda q: auth_client.get("/resources/suggest", params={"q": q}), ["p", "py", "pyt"]))
+    assert [response.status_code for response in responses] == [200, 200, 200]
+    assert {s["text"] for s in responses[2].json()} == {"python", "Pytest fixtures"}
+    assert builds == [user.id]
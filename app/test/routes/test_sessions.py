@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Tests for server-side sessions and cached user lookups."""
+
+from fastapi.testclient import TestClient
+from app.test.routes.conftest import TEST_PASSWORD
+from main import app
+
+
+def test_authenticated_pages_skip_user_lookup(auth_client, query_counter):
+    """Test the profile page is served from the cached session user without any query."""
+    query_counter.reset()
+    response = auth_client.get("/profile/")
+
+    assert response.status_code == 200
+    assert "Route User" in response.text
+    query_counter.assert_at_most(0, "GET /profile/")
+
+def test_logout_revokes_session_cookie(auth_client):
+    """Test a session cookie stops working once its session is ended."""
+    cookie = auth_client.cookies.get("session")
+    auth_client.get("/logout")
+
+    replay = TestClient(app, follow_redirects=False, cookies={"session": cookie})
+    assert replay.get("/dashboard").status_code == 303
+
+def test_password_change_revokes_other_sessions(auth_client, user):
+    """Test changing the password signs out other devices but keeps the current one."""
+    other_device = TestClient(app, follow_redirects=False)
+    other_device.post("/login", data={"username": user.username, "password": TEST_PASSWORD})
+    assert other_device.get("/dashboard").status_code == 200
+
+    response = auth_client.post(
+        "/profile/change-password",
+        data={"old_password": TEST_PASSWORD, "new_password": "newpassword123", "confirm_password": "newpassword123"},
+    )
+
+    assert response.status_code == 303
+    assert auth_client.get("/dashboard").status_code == 200
+    assert other_device.get("/dashboard").headers["location"].startswith("/login")
+
+def test_profile_update_refreshes_cached_user(auth_client):
+    """Test the cached profile is invalidated when the user updates it."""
+    auth_client.post("/profile/", data={"fullname": "Renamed User"})
+
+    assert "Renamed User" in auth_client.get("/profile/").text
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Tests for public share links and their cached pages."""
+
+from app.models.share_link import ShareLink
+from app.services.resource_services import add_resource, remove_resource, update_resource_details
+from app.services.share_services import get_resource_share, list_shares
+from app.services.user_services import remove_user
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def test_shared_resource_page_is_served_from_memory(auth_client, user, db_session, query_counter):
+    """Test a shared resource is rendered once, revalidated by ETag, re-rendered after an edit and gone once revoked."""
+    resource = ResourceFactory(user=user, title="Python descriptors explained", tags="python,guides")
+    db_session.commit()
+
+    response = auth_client.post(f"/shares/resource/{resource.id}")
+    assert response.status_code == 303
+    assert response.headers["location"] == f"/dashboard/{resource.id}/view"
+    link = get_resource_share(user.id, resource.id)
+    assert auth_client.post(f"/shares/resource/{resource.id}").status_code == 303
+    assert get_resource_share(user.id, resource.id).token == link.token  # Sharing again reuses the link
+    assert link.token in auth_client.get(f"/dashboard/{resource.id}/view").text
+
+    first = auth_client.get(f"/s/{link.token}", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    assert "Python descriptors explained" in first.text and "routeuser" in first.text
+    assert first.headers["cache-control"] == "public, max-age=60"
+    assert "content-encoding" not in first.headers
+
+    query_counter.reset()
+    again = auth_client.get(f"/s/{link.token}", headers={"Accept-Encoding": "identity"})
+    gzipped = auth_client.get(f"/s/{link.token}", headers={"Accept-Encoding": "gzip"})
+    cached = auth_client.get(f"/s/{link.token}", headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]})
+    query_counter.assert_at_most(0, "GET /s/{token} of a rendered page")
+    assert again.text == first.text and again.headers["etag"] == first.headers["etag"]
+    assert gzipped.headers["content-encoding"] == "gzip" and gzipped.text == first.text
+    assert gzipped.headers["etag"] != first.headers["etag"]
+    assert cached.status_code == 304 and cached.content == b""
+
+    update_resource_details(resource.id, title="Python descriptors, revisited")
+    edited = auth_client.get(f"/s/{link.token}", headers={"Accept-Encoding": "identity", "If-None-Match": first.headers["etag"]})
+    assert edited.status_code == 200 and "Python descriptors, revisited" in edited.text
+
+    assert auth_client.post(f"/shares/{link.id}/revoke").headers["location"] == "/shares?msg=revoked"
+    assert auth_client.get(f"/s/{link.token}").status_code == 404
+    assert get_resource_share(user.id, resource.id) is None
+
+def test_shared_tag_collection_follows_the_library(auth_client, user, db_session):
+    """Test a shared tag lists exactly the owner's resources with that tag, including ones tagged after sharing."""
+    tagged = ResourceFactory(user=user, title="Descriptors", tags="guides, Python")
+    ResourceFactory(user=user, title="Asyncio", tags="python3")
+    ResourceFactory(user=UserFactory(id=None), title="Someone else's", tags="python")
+    db_session.commit()
+
+    response = auth_client.post("/shares/tag", data={"tag": " python "})
+    assert response.headers["location"] == "/shares?msg=shared"
+    (link, title), = list_shares(user.id)
+    assert link.tag == "python" and title is None
+    assert link.token in auth_client.get("/shares").text
+
+    page = auth_client.get(f"/s/{link.token}").text
+    assert "Descriptors" in page and "Asyncio" not in page and "Someone else" not in page
+
+    added = add_resource(title="Generators", type="Link", source="Blog", user_id=user.id, url="https://example.com/generators", tags="python")
+    remove_resource(tagged.id)
+    page = auth_client.get(f"/s/{link.token}").text
+    assert "Generators" in page and "Descriptors" not in page
+
+    update_resource_details(added.id, tags="iterators")
+    assert "Nothing here yet" in auth_client.get(f"/s/{link.token}").text
+
+def test_sharing_is_limited_to_the_owner(auth_client, user, db_session):
+    """Test users cannot share or revoke what is not theirs, and links die with their resource or owner."""
+    theirs = ResourceFactory(user=UserFactory(id=None))
+    mine = ResourceFactory(user=user)
+    db_session.commit()
+
+    assert auth_client.post(f"/shares/resource/{theirs.id}").status_code == 404
+    assert auth_client.post("/shares/tag", data={"tag": "a,b"}).status_code == 400
+    auth_client.post(f"/shares/resource/{mine.id}")
+    auth_client.post("/shares/tag", data={"tag": "python"})
+    resource_link, tag_link = get_resource_share(user.id, mine.id), list_shares(user.id)[0][0]
+    assert auth_client.get(f"/s/{tag_link.token}").status_code == 200
+
+    remove_resource(mine.id)
+    assert db_session.query(ShareLink).filter(ShareLink.id == resource_link.id).count() == 0
+    assert auth_client.get(f"/s/{resource_link.token}").status_code == 404
+    assert auth_client.get("/s/not-a-real-token").status_code == 404
+
+    remove_user(user.id)
+    assert auth_client.get(f"/s/{tag_link.token}").status_code == 404
+
+def test_shared_pages_only_link_web_and_upload_urls(auth_client, user, db_session):
+    """Test script URLs are refused on create and edit, and never rendered as links by a public page."""
+    legacy = ResourceFactory(user=user, title="Old row", type="Image", url="javascript:alert(document.cookie)", tags="unsafe")
+    ResourceFactory(user=user, title="Upload", url="/uploads/devsaver-a.pdf", original_filename="a.pdf", tags="unsafe")
+    db_session.commit()
+
+    form = {"title": "Bad", "type": "Link", "source": "Blog", "external_url": " JavaScript:alert(1)"}
+    assert auth_client.post("/resources/upload", data=form).status_code == 400
+    edit = auth_client.post(f"/resources/edit-resource/{legacy.id}", data={"url": "data:text/html,<script>alert(1)</script>"})
+    assert edit.status_code == 400
+
+    auth_client.post(f"/shares/resource/{legacy.id}")
+    page = auth_client.get(f"/s/{get_resource_share(user.id, legacy.id).token}").text
+    assert "Old row" in page and "javascript:" not in page
+    auth_client.post("/shares/tag", data={"tag": "unsafe"})
+    page = auth_client.get(f"/s/{list_shares(user.id)[0][0].token}").text
+    assert 'href="/uploads/devsaver-a.pdf"' in page and "javascript:" not in page
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Tests for response compression and fingerprinted static assets."""
+
+import gzip
+import os
+import re
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from fastapi.testclient import TestClient
+from app.core.compression_middleware import CompressionMiddleware
+from app.core.static_files import StaticAssets, precompress_static, IMMUTABLE_CACHE_CONTROL
+
+STYLESHEET = "body { color: #333; }\n" * 100
+
+
+def _static_client(directory, cache_dir) -> TestClient:
+    """Client for an app that only mounts StaticAssets on `directory`, with compressed copies in `cache_dir`."""
+    static_app = FastAPI()
+    static_app.mount("/static", StaticAssets(directory=directory, cache_dir=str(cache_dir)), name="static")
+    return TestClient(static_app)
+
+def test_fingerprinted_asset_is_immutable(auth_client):
+    """Test pages link fingerprinted assets that are served with a far-future Cache-Control."""
+    page = auth_client.get("/dashboard")
+    stylesheet = re.search(r'href="(/static/css/styles\.[0-9a-f]{12}\.css)"', page.text).group(1)
+
+    response = auth_client.get(stylesheet)
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == IMMUTABLE_CACHE_CONTROL
+
+    stale = auth_client.get("/static/css/styles.000000000000.css")
+    assert stale.status_code == 200
+    assert stale.headers["cache-control"] == "no-cache"
+
+    revalidated = auth_client.get(stylesheet, headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code == 304
+
+def test_precompressed_variant_is_served(tmp_path):
+    """Test a fresh .gz copy from the cache directory is sent to clients that accept gzip and the plain file to others."""
+    source, cache = tmp_path / "static", tmp_path / "cache"
+    (source / "css").mkdir(parents=True)
+    (source / "css" / "styles.css").write_text(STYLESHEET)
+    assert precompress_static(str(source), cache_dir=str(cache))["written"] >= 1
+    assert [path.name for path in source.rglob("*")] == ["css", "styles.css"]  # The source tree is only read
+    client = _static_client(source, cache)
+
+    compressed = client.get("/static/css/styles.css", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["content-type"].startswith("text/css")
+    assert int(compressed.headers["content-length"]) == len(gzip.compress(STYLESHEET.encode(), 9, mtime=0))
+    assert compressed.text == STYLESHEET
+
+    plain = client.get("/static/css/styles.css", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+    assert plain.text == STYLESHEET
+
+    assert precompress_static(str(source), cache_dir=str(cache))["written"] == 0
+
+def test_restored_file_with_older_mtime_never_gets_a_stale_copy(tmp_path):
+    """Test a new version of an asset restored with an older mtime (rsync -t, tar) is not served the old copy."""
+    source, cache = tmp_path / "static", tmp_path / "cache"
+    source.mkdir()
+    stylesheet = source / "styles.css"
+    stylesheet.write_text(STYLESHEET)
+    precompress_static(str(source), cache_dir=str(cache))
+    old_mtime = stylesheet.stat().st_mtime_ns
+
+    updated = STYLESHEET.replace("#333", "#444")
+    stylesheet.write_text(updated)
+    os.utime(stylesheet, ns=(old_mtime - 10**9, old_mtime - 10**9))
+    client = _static_client(source, cache)
+    assert client.get("/static/styles.css", headers={"Accept-Encoding": "gzip"}).text == updated
+
+    assert precompress_static(str(source), cache_dir=str(cache))["written"] >= 1
+    assert len(list(cache.rglob("styles.*.css.gz"))) == 1  # The copy of the old version is gone
+    served = client.get("/static/styles.css", headers={"Accept-Encoding": "gzip"})
+    assert served.headers["content-encoding"] == "gzip" and served.text == updated
+
+def test_compression_threshold_and_allowlist():
+    """Test only allowlisted responses above the size threshold are compressed."""
+    small_app = FastAPI()
+    small_app.add_middleware(CompressionMiddleware, minimum_size=500)
+    small_app.get("/big")(lambda: PlainTextResponse("x" * 1000))
+    small_app.get("/small")(lambda: PlainTextResponse("x" * 10))
+    small_app.get("/binary")(lambda: PlainTextResponse("x" * 1000, media_type="application/octet-stream"))
+    client = TestClient(small_app, headers={"Accept-Encoding": "gzip"})
+
+    big = client.get("/big")
+    assert big.headers["content-encoding"] == "gzip"
+    assert big.headers["vary"] == "Accept-Encoding"
+    assert int(big.headers["content-length"]) < 1000
+    assert big.text == "x" * 1000
+
+    assert "content-encoding" not in client.get("/small").headers
+    assert "content-encoding" not in client.get("/binary").headers
+    assert "content-encoding" not in client.get("/big", headers={"Accept-Encoding": "gzip;q=0"}).headers
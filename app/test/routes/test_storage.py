@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Tests for the upload storage backends."""
+
+import io
+import os
+import uuid
+import pytest
+from app.core.storage import LocalStorage, S3Storage, MIN_PART_SIZE, boto3
+from app.models.resource import Resource
+from app.routes.resource import resources
+
+
+class StandInS3:
+    """In-memory stand-in for the slice of the S3 client API the backend uses."""
+
+    class exceptions:
+        class ClientError(Exception):
+            pass
+
+    def __init__(self, fail_on_part: int = 0):
+        self.objects, self.uploads, self.aborted = {}, {}, []
+        self.fail_on_part = fail_on_part
+
+    def put_object(self, Bucket, Key, Body, **extra):
+        self.objects[Key] = bytes(Body)
+
+    def create_multipart_upload(self, Bucket, Key, **extra):
+        upload_id = uuid.uuid4().hex
+        self.uploads[upload_id] = {}
+        return {"UploadId": upload_id}
+
+    def upload_part(self, Bucket, Key, UploadId, PartNumber, Body):
+        if PartNumber == self.fail_on_part:
+            raise ConnectionError("connection reset")
+        self.uploads[UploadId][PartNumber] = bytes(Body)
+        return {"ETag": f'"{PartNumber}"'}
+
+    def complete_multipart_upload(self, Bucket, Key, UploadId, MultipartUpload):
+        parts = self.uploads.pop(UploadId)
+        self.objects[Key] = b"".join(parts[part["PartNumber"]] for part in MultipartUpload["Parts"])
+
+    def abort_multipart_upload(self, Bucket, Key, UploadId):
+        self.uploads.pop(UploadId)
+        self.aborted.append(UploadId)
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop(Key, None)
+
+    def head_object(self, Bucket, Key):
+        if Key not in self.objects:
+            raise self.exceptions.ClientError("404")
+
+    def generate_presigned_url(self, method, Params, ExpiresIn):
+        return f"http://objects.test/{Params['Bucket']}/{Params['Key']}?X-Amz-Expires={ExpiresIn}"
+
+
+def test_upload_is_stored_and_served(auth_client, db_session, local_storage):
+    """Test an uploaded file goes to the storage backend and /uploads/ serves it with revalidation support."""
+    response = auth_client.post(
+        "/resources/upload",
+        data={"title": "Notes", "type": "Documentation", "source": "Other"},
+        files={"file": ("notes.txt", b"hello storage", "text/plain")},
+    )
+    assert response.status_code == 303
+
+    url = db_session.query(Resource.url).scalar()
+    assert local_storage.exists(url)
+    served = auth_client.get(url)
+    assert served.content == b"hello storage"
+    assert auth_client.get(url, headers={"If-None-Match": served.headers["etag"]}).status_code == 304
+    assert not [name for name in os.listdir(local_storage.directory) if name.startswith(".partial-")]
+
+def test_accel_redirect_hands_download_to_proxy(client, tmp_path, monkeypatch):
+    """Test with X-Accel-Redirect configured the app sends only a header, and nothing for missing files."""
+    storage = LocalStorage(str(tmp_path), accel_redirect="/protected-uploads/")
+    storage.save("devsaver-a.txt", io.BytesIO(b"data"))
+    monkeypatch.setattr(resources, "storage", storage)
+
+    response = client.get("/uploads/devsaver-a.txt")
+    assert response.headers["x-accel-redirect"] == "/protected-uploads/devsaver-a.txt"
+    assert response.content == b""
+    assert client.get("/uploads/devsaver-missing.txt").status_code == 404
+
+def test_s3_large_files_use_multipart_upload():
+    """Test files over one part are sent in parts and reassembled, and small ones in a single put."""
+    stand_in = StandInS3()
+    storage = S3Storage("bucket", key_prefix="uploads/", client=stand_in, part_size=MIN_PART_SIZE)
+    data = os.urandom(2 * MIN_PART_SIZE + 1234)
+
+    assert storage.save("big.bin", io.BytesIO(data)) == len(data)
+    assert storage.save("small.txt", io.BytesIO(b"small")) == 5
+
+    assert stand_in.objects == {"uploads/big.bin": data, "uploads/small.txt": b"small"}
+    assert storage.delete("small.txt") and not storage.exists("small.txt")
+
+def test_s3_failed_multipart_upload_is_aborted():
+    """Test an upload that fails part-way is aborted rather than left as billed, orphaned parts."""
+    stand_in = StandInS3(fail_on_part=2)
+    storage = S3Storage("bucket", client=stand_in, part_size=MIN_PART_SIZE)
+
+    with pytest.raises(ConnectionError):
+        storage.save("big.bin", io.BytesIO(os.urandom(2 * MIN_PART_SIZE + 1)))
+    assert len(stand_in.aborted) == 1
+    assert stand_in.objects == {} and stand_in.uploads == {}
+
+def test_s3_download_redirects_to_presigned_url(client, monkeypatch):
+    """Test S3 downloads are redirected to the object store instead of streamed through the app."""
+    monkeypatch.setattr(resources, "storage", S3Storage("bucket", key_prefix="uploads/", client=StandInS3(), presign_seconds=300))
+
+    response = client.get("/uploads/devsaver-a.pdf")
+    assert response.status_code == 307
+    assert response.headers["location"] == "http://objects.test/bucket/uploads/devsaver-a.pdf?X-Amz-Expires=300"
+    assert response.headers["cache-control"] == "private, max-age=240"
+
+@pytest.mark.skipif(boto3 is None or not os.environ.get("S3_TEST_ENDPOINT_URL"), reason="needs boto3 and S3_TEST_ENDPOINT_URL")
+def test_s3_round_trip_against_live_store():
+    """Test the S3 backend against a real S3-compatible server, e.g. a local MinIO (see README)."""
+    storage = S3Storage(
+        os.environ.get("S3_TEST_BUCKET", "devsaver-test"), endpoint_url=os.environ["S3_TEST_ENDPOINT_URL"],
+        region="us-east-1", access_key_id=os.environ.get("S3_TEST_ACCESS_KEY_ID", "minioadmin"),
+        secret_access_key=os.environ.get("S3_TEST_SECRET_ACCESS_KEY", "minioadmin"), part_size=MIN_PART_SIZE,
+    )
+    name = f"devsaver-{uuid.uuid4().hex}.bin"
+    data = os.urandom(MIN_PART_SIZE + 1)
+
+    assert storage.save(name, io.BytesIO(data)) == len(data)
+    assert storage.exists(name)
+    assert storage.presigned_url(name).startswith(os.environ["S3_TEST_ENDPOINT_URL"])
+    assert storage.delete(name) and not storage.exists(name)
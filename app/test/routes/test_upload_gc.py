@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Tests for orphaned-upload garbage collection."""
+
+import os
+import time
+import pytest
+from app.services import upload_gc_services
+from app.services.upload_gc_services import reconcile_uploads
+from app.test.factories.resource_factory import ResourceFactory
+
+DAY = 24 * 60 * 60
+
+
+@pytest.fixture()
+def upload_dirs(tmp_path, monkeypatch):
+    """Point the collector at temporary upload and quarantine directories."""
+    uploads, quarantine = tmp_path / "uploads", tmp_path / "quarantine"
+    uploads.mkdir()
+    monkeypatch.setattr(upload_gc_services, "UPLOAD_DIR", str(uploads))
+    monkeypatch.setattr(upload_gc_services, "UPLOAD_QUARANTINE_DIR", str(quarantine))
+    return uploads, quarantine
+
+def _stored(directory, name: str, age: float, size: int = 10):
+    path = directory / name
+    path.write_bytes(b"x" * size)
+    then = time.time() - age
+    os.utime(path, (then, then))
+    return path
+
+def test_orphans_are_quarantined_then_deleted(user, db_session, upload_dirs):
+    """Test an old unreferenced upload is quarantined, referenced and recent ones stay, and the grace period ends in deletion."""
+    uploads, quarantine = upload_dirs
+    kept = _stored(uploads, "devsaver-kept.txt", DAY)
+    recent = _stored(uploads, "devsaver-recent.txt", 0)
+    _stored(uploads, "devsaver-orphan.txt", DAY, size=25)
+    ResourceFactory(user=user, url="/uploads/devsaver-kept.txt", original_filename="kept.txt")
+    db_session.commit()
+
+    report = reconcile_uploads(min_age=60, grace=DAY)
+
+    assert report["scanned"] == 2
+    assert (report["quarantined"], report["quarantined_bytes"], report["deleted"]) == (1, 25, 0)
+    assert kept.exists() and recent.exists()
+    assert os.listdir(quarantine) == ["devsaver-orphan.txt"]
+
+    report = reconcile_uploads(min_age=60, grace=0)
+
+    assert (report["deleted"], report["bytes_reclaimed"]) == (1, 25)
+    assert os.listdir(quarantine) == []
+
+def test_referenced_quarantined_file_is_restored(user, db_session, upload_dirs):
+    """Test a quarantined file that a resource points at again is moved back instead of deleted."""
+    uploads, quarantine = upload_dirs
+    quarantine.mkdir()
+    _stored(quarantine, "devsaver-back.txt", DAY)
+    ResourceFactory(user=user, url="/uploads/devsaver-back.txt", original_filename="back.txt")
+    db_session.commit()
+
+    report = reconcile_uploads(min_age=60, grace=0)
+
+    assert (report["restored"], report["deleted"]) == (1, 0)
+    assert (uploads / "devsaver-back.txt").exists()
+
+def test_dry_run_changes_nothing(app_engine, upload_dirs):
+    """Test a dry run reports the orphans without moving them."""
+    uploads, quarantine = upload_dirs
+    orphan = _stored(uploads, "devsaver-orphan.txt", DAY)
+
+    report = reconcile_uploads(min_age=60, grace=DAY, dry_run=True)
+
+    assert report["quarantined"] == 1
+    assert orphan.exists()
+    assert not quarantine.exists()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Tests for group-committed star/read toggles."""
+
+from concurrent.futures import ThreadPoolExecutor
+from app.core.write_batcher import WriteBatcher
+from app.crud import resource_crud
+from app.models.resource import Resource
+from app.test.factories.resource_factory import ResourceFactory
+from app.test.factories.user_factory import UserFactory
+
+
+def test_concurrent_toggles_share_commits(user, db_session):
+    """Test toggles submitted together land in one transaction and each caller gets its own row back."""
+    resources = ResourceFactory.create_batch(8, user=user, starred=False)
+    db_session.commit()
+    batcher = WriteBatcher(window_ms=100)
+    try:
+        futures = [batcher.submit(resource_crud._apply_toggle_star, resource.id, user.id) for resource in resources]
+        results = [future.result(timeout=5) for future in futures]
+    finally:
+        batcher.close()
+
+    assert [result.id for result in results] == [resource.id for resource in resources]
+    assert all(result.starred for result in results)
+    stats = batcher.stats()
+    assert stats["writes"] == 8
+    assert stats["commits"] < 8
+    db_session.expire_all()
+    assert all(db_session.get(Resource, resource.id).starred for resource in resources)
+
+def test_failed_write_only_fails_its_caller(user, db_session):
+    """Test a write that raises is retried alone, so the rest of its batch still commits."""
+    resource = ResourceFactory(user=user, read_status=False)
+    db_session.commit()
+
+    def explode(session, resource_id):
+        raise RuntimeError("boom")
+
+    batcher = WriteBatcher(window_ms=100)
+    try:
+        good = batcher.submit(resource_crud._apply_mark_read, resource.id, None)
+        bad = batcher.submit(explode, resource.id)
+        assert good.result(timeout=5).read_status is True
+        assert isinstance(bad.exception(timeout=5), RuntimeError)
+    finally:
+        batcher.close()
+
+    assert batcher.stats()["failed_batches"] == 1
+
+def test_toggle_star_route_checks_owner(auth_client, user, db_session):
+    """Test the toggle route stars the user's resource but answers 404 for someone else's."""
+    own = ResourceFactory(user=user, starred=False)
+    other = ResourceFactory(user=UserFactory(id=None), starred=False)
+    db_session.commit()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        responses = list(pool.map(lambda resource: auth_client.post(f"/resources/toggle-star/{resource.id}"), [own, other]))
+
+    assert responses[0].status_code == 303
+    assert responses[1].status_code == 404
+    db_session.expire_all()
+    assert db_session.get(Resource, own.id).starred is True
+    assert db_session.get(Resource, other.id).starred is False
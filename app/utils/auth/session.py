@@ -1,10 +1,22 @@
 #!/usr/bin/env python3
 """Utility functions for user authentication and login."""
 
+from typing import Optional
 from fastapi import Request
+from app.schemas.user import User as UserSchema
+from app.services.session_services import get_session_user_profile
 
-def check_current_user(request: Request):
-    """Retrieve the current logged-in user from the session."""
-    user = request.session.get("user")
+def check_current_user(request: Request) -> Optional[UserSchema]:
+    """Retrieve the current logged-in user from the server-side session.
 
-    return user
\ No newline at end of file
+    The signed cookie only carries a session token; the user profile comes from the session cache.
+    Returns None and clears the cookie when the session has expired or been revoked.
+    """
+    token = request.session.get("sid")
+    if not token:
+        return None
+
+    user = get_session_user_profile(token)
+    if user is None:
+        request.session.clear()
+    return user
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""Sorted prefix index for as-you-type suggestions."""
+
+import heapq
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+TAG = "tag"
+TITLE = "title"
+SOURCE = "source"
+KINDS = (TAG, TITLE, SOURCE)
+
+SEPARATOR = "\x00"  # Between a term and its kind in sorted keys; sorts before any character a term can contain
+PREFIX_END = "\U0010ffff"
+MEMO_SIZE = 256
+
+
+class Suggestion(NamedTuple):
+    """A completion, how many of the user's resources use it, and whether it is a tag, title or source."""
+    text: str
+    kind: str
+    count: int
+
+
+def normalize(text: str) -> str:
+    """Case- and whitespace-insensitive form of a term or prefix."""
+    return " ".join(text.casefold().split())
+
+def resource_terms(title: Optional[str], tags: Optional[str], source: Optional[str]) -> dict[str, str]:
+    """Sort key -> text of every term a resource contributes: each comma-separated tag, its title and its source."""
+    terms = [(TAG, tag) for tag in (tags or "").split(",")] + [(TITLE, title or ""), (SOURCE, source or "")]
+    return {f"{normalize(text)}{SEPARATOR}{kind}": text.strip() for kind, text in terms if text.strip()}
+
+
+class PrefixIndex:
+    """Terms of a user's resources in one sorted list, counted by how many resources use each.
+
+    A prefix lookup is two binary searches for the range of matching terms plus picking the most used ones, and
+    answers are memoized until the next write, so repeated keystrokes cost a dict lookup. Documents are added,
+    replaced and removed incrementally. Thread-safe.
+    """
+
+    def __init__(self):
+        self._documents: dict[int, tuple[str, ...]] = {}  # id -> keys
+        self._keys: list[str] = []  # Sorted "<normalized term>\x00<kind>"
+        self._counts: dict[str, int] = {}
+        self._labels: dict[str, str] = {}  # key -> the term as last written, e.g. "FastAPI" for fastapi
+        self._memo: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def add(self, doc_id: int, title: Optional[str], tags: Optional[str], source: Optional[str]) -> None:
+        """Index a resource's terms, replacing any previous version of it."""
+        terms = resource_terms(title, tags, source)
+        with self._lock:
+            self._remove(doc_id)
+            self._documents[doc_id] = tuple(terms)
+            for key, text in terms.items():
+                count = self._counts.get(key, 0)
+                if not count:
+                    self._keys.insert(bisect_left(self._keys, key), key)
+                self._labels[key] = text
+                self._counts[key] = count + 1
+            self._memo.clear()
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a resource's terms if indexed."""
+        with self._lock:
+            self._remove(doc_id)
+            self._memo.clear()
+
+    def _remove(self, doc_id: int) -> None:
+        for key in self._documents.pop(doc_id, ()):
+            count = self._counts[key] - 1
+            if count:
+                self._counts[key] = count
+            else:
+                del self._counts[key], self._labels[key]
+                del self._keys[bisect_left(self._keys, key)]
+
+    def complete(self, prefix: str, kind: Optional[str] = None, limit: int = 10) -> list[Suggestion]:
+        """The most used terms starting with `prefix`, optionally of one kind; shorter terms first among equals."""
+        prefix = normalize(prefix)
+        memo_key = (prefix, kind, limit)
+        with self._lock:
+            cached = self._memo.get(memo_key)
+            if cached is not None:
+                self._memo.move_to_end(memo_key)
+                return cached
+            start = bisect_left(self._keys, prefix)
+            end = bisect_left(self._keys, prefix + PREFIX_END, start)
+            keys = self._keys[start:end]
+            if kind is not None:
+                suffix = SEPARATOR + kind
+                keys = [key for key in keys if key.endswith(suffix)]
+            counts = self._counts
+            best = heapq.nsmallest(limit, keys, key=lambda key: (-counts[key], len(key), key))
+            suggestions = [Suggestion(self._labels[key], key.rpartition(SEPARATOR)[2], counts[key]) for key in best]
+            self._memo[memo_key] = suggestions
+            if len(self._memo) > MEMO_SIZE:
+                self._memo.popitem(last=False)
+            return suggestions
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple]) -> "PrefixIndex":
+        """An index of (id, title, tags, source) rows in id order, sorted once rather than insert by insert."""
+        index = cls()
+        for doc_id, title, tags, source in documents:
+            terms = resource_terms(title, tags, source)
+            index._documents[doc_id] = tuple(terms)
+            for key, text in terms.items():
+                index._counts[key] = index._counts.get(key, 0) + 1
+                index._labels[key] = text
+        index._keys = sorted(index._counts)
+        return index
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Text extraction from uploaded documents for the search index.
+
+Runs in worker processes like app.utils.media. PDFs are read page by page with pypdf when it is installed;
+otherwise the text operators of each (Flate-compressed or plain) content stream are decoded directly, which
+covers PDFs written by common tools but not ones that subset fonts with custom encodings.
+"""
+
+import mmap
+import os
+import re
+import zlib
+from typing import Iterator, Optional
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; the built-in content stream reader is used without it
+    PdfReader = None
+
+TEXT = "text"
+PDF = "pdf"
+HTML = "html"
+
+DOCUMENT_EXTENSIONS = {
+    **dict.fromkeys((".txt", ".md", ".markdown", ".rst", ".csv", ".json", ".log", ".yaml", ".yml", ".toml",
+                     ".ini", ".xml", ".sql", ".sh", ".py", ".js", ".ts", ".java", ".go", ".rs", ".c", ".h"), TEXT),
+    ".html": HTML, ".htm": HTML,
+    ".pdf": PDF,
+}
+
+READ_CHUNK_CHARS = 64 * 1024
+
+STREAM_RE = re.compile(rb"stream\r?\n(.*?)\r?\n?endstream", re.S)
+TEXT_BLOCK_RE = re.compile(rb"BT(.*?)ET", re.S)
+SHOW_TEXT_RE = re.compile(rb"(\((?:\\.|[^\\)])*\)|\[(?:\\.|[^\]])*\])\s*(?:Tj|TJ|'|\")|(T\*|Td|TD)", re.S)
+PDF_STRING_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)", re.S)
+PDF_ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+PDF_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"\b", b"f": b"\f"}
+HTML_SKIP_RE = re.compile(r"<(script|style)\b.*?</\1\s*>", re.S | re.I)
+HTML_TAG_RE = re.compile(r"<[^>]+>")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def document_kind(filename: Optional[str]) -> Optional[str]:
+    """The kind of document a file is, judged by its extension, or None when we do not index its text."""
+    if not filename:
+        return None
+    return DOCUMENT_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+def _unescape(match: re.Match) -> bytes:
+    code = match.group(1)
+    if code[:1].isdigit():
+        return bytes([int(code, 8) & 0xFF])
+    return PDF_ESCAPES.get(code, code if code not in b"\r\n" else b"")
+
+def _decode_stream(raw: bytes) -> Optional[bytes]:
+    try:
+        return zlib.decompress(raw)
+    except zlib.error:
+        return raw if b"BT" in raw else None  # Uncompressed content, or binary data (images, fonts) to skip
+
+def _stream_text(content: bytes) -> str:
+    """The text shown by the operators of one content stream, a line per line break or text block."""
+    lines = []
+    for block in TEXT_BLOCK_RE.finditer(content):
+        line = []
+        for shown, newline in SHOW_TEXT_RE.findall(block.group(1)):
+            if newline:
+                lines.append(b"".join(line))
+                line = []
+            for string in PDF_STRING_RE.findall(shown):
+                line.append(PDF_ESCAPE_RE.sub(_unescape, string))
+        lines.append(b"".join(line))
+    return "\n".join(line.decode("latin-1") for line in lines if line.strip())
+
+def pdf_pages(path: str) -> Iterator[str]:
+    """Yield the text of a PDF one page (or content stream) at a time, without loading the file into memory."""
+    if PdfReader is not None:
+        for page in PdfReader(path).pages:
+            yield page.extract_text() or ""
+        return
+    if os.path.getsize(path) == 0:
+        return  # mmap cannot map an empty file
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        for stream in STREAM_RE.finditer(data):
+            content = _decode_stream(stream.group(1))
+            if content:
+                text = _stream_text(content)
+                if text:
+                    yield text
+
+def text_chunks(path: str, html: bool = False) -> Iterator[str]:
+    """Yield a text file in chunks, replacing undecodable bytes. HTML is reduced to its visible text."""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        if html:
+            # Tags can straddle chunks, so markup is stripped from the capped document as a whole
+            yield HTML_TAG_RE.sub(" ", HTML_SKIP_RE.sub(" ", f.read(READ_CHUNK_CHARS * 16)))
+            return
+        for chunk in iter(lambda: f.read(READ_CHUNK_CHARS), ""):
+            yield chunk
+
+def extract_text(path: str, kind: str, max_chars: int) -> str:
+    """Extract at most `max_chars` of normalised text from a document. Process-pool entry point.
+
+    Pages and chunks are consumed lazily and reading stops at the cap, so a huge document costs no more than
+    its first `max_chars` characters.
+    """
+    parts, total = [], 0
+    chunks = pdf_pages(path) if kind == PDF else text_chunks(path, html=kind == HTML)
+    for chunk in chunks:
+        chunk = WHITESPACE_RE.sub(" ", chunk)
+        parts.append(chunk[:max_chars - total])
+        total += len(parts[-1])
+        if total >= max_chars:
+            break
+    # Pages are separate texts; chunks of a text file split it at arbitrary points and are rejoined as they were
+    return (" " if kind == PDF else "").join(parts).strip()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""HTTP caching helpers."""
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+from fastapi import Request, Response
+
+PRIVATE_REVALIDATE = "private, no-cache"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Return True when an If-None-Match header lists the ETag (weak comparison) or is "*"."""
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def build_etag(*parts) -> str:
+    """Build a strong ETag from the values a response was rendered from."""
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+def http_date(value: datetime) -> str:
+    """Format a datetime for Last-Modified; naive values are taken as UTC, like the ones we store."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+def conditional_headers(etag: str, last_modified: Optional[datetime] = None) -> dict:
+    """Validator headers for a private response that browsers must revalidate before reuse."""
+    headers = {"ETag": etag, "Cache-Control": PRIVATE_REVALIDATE}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no ETag was sent (RFC 9110 precedence)."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+def not_modified(headers: dict) -> Response:
+    """An empty 304 carrying the validators of the representation the client already has."""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""Media probing and thumbnail rendering for uploaded files.
+
+Everything here runs in worker processes, so it imports only the standard library up front. Pillow, pypdf,
+pdftoppm and ffmpeg are used when installed; without them, dimensions, page counts and durations still come
+from the file headers and only the thumbnail is skipped.
+"""
+
+import os
+import re
+import shutil
+import struct
+import subprocess
+from typing import BinaryIO, Optional
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; image thumbnails are skipped without it
+    Image = None
+
+try:
+    from pypdf import PdfReader
+except ImportError:  # pypdf is optional; pages are counted from the raw file without it
+    PdfReader = None
+
+IMAGE = "image"
+PDF = "pdf"
+VIDEO = "video"
+
+MEDIA_EXTENSIONS = {
+    ".png": IMAGE, ".jpg": IMAGE, ".jpeg": IMAGE, ".gif": IMAGE, ".webp": IMAGE,
+    ".pdf": PDF,
+    ".mp4": VIDEO, ".m4v": VIDEO, ".mov": VIDEO,
+}
+
+PDF_PAGE_RE = re.compile(rb"/Type\s*/Page(?![a-zA-Z])")
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def media_kind(filename: Optional[str]) -> Optional[str]:
+    """The kind of media a file is, judged by its extension, or None when we do not extract anything from it."""
+    if not filename:
+        return None
+    return MEDIA_EXTENSIONS.get(os.path.splitext(filename)[1].lower())
+
+def image_size(path: str) -> Optional[tuple[int, int]]:
+    """Width and height from a PNG, GIF, WebP or JPEG header, without decoding the image."""
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return _webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return _jpeg_size(f)
+    return None
+
+def _webp_size(head: bytes) -> Optional[tuple[int, int]]:
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        return int.from_bytes(head[24:27], "little") + 1, int.from_bytes(head[27:30], "little") + 1
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    return None
+
+def _jpeg_size(f: BinaryIO) -> Optional[tuple[int, int]]:
+    """Walk the JPEG segments up to the start-of-frame marker that carries the dimensions."""
+    while True:
+        byte = f.read(1)
+        while byte == b"\xff":
+            byte = f.read(1)
+        if not byte:
+            return None
+        marker = byte[0]
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        if marker in JPEG_SOF_MARKERS:
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(struct.unpack(">H", length)[0] - 2, os.SEEK_CUR)
+        if f.read(1) != b"\xff":
+            return None
+
+def pdf_page_count(path: str) -> Optional[int]:
+    """Number of pages in a PDF; with pypdf missing, page objects in the raw file are counted (misses compressed ones)."""
+    if PdfReader is not None:
+        try:
+            return len(PdfReader(path).pages)
+        except Exception:
+            pass
+    with open(path, "rb") as f:
+        count = len(PDF_PAGE_RE.findall(f.read()))
+    return count or None
+
+def _boxes(f: BinaryIO, end: int):
+    """Yield (type, payload start, payload end) for the ISO-BMFF boxes between the current position and `end`."""
+    while f.tell() + 8 <= end:
+        start = f.tell()
+        size, box_type = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - start
+        if size < header:
+            return
+        yield box_type, start + header, start + size
+        f.seek(start + size)
+
+def mp4_info(path: str) -> dict:
+    """Duration (from mvhd) and frame size (from the first visual tkhd) of an MP4/MOV file, reading only the headers."""
+    info = {}
+    with open(path, "rb") as f:
+        end = os.fstat(f.fileno()).st_size
+        for box_type, _, stop in _boxes(f, end):
+            if box_type != b"moov":
+                continue
+            for child, _, child_stop in _boxes(f, stop):
+                if child == b"mvhd":
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, duration = struct.unpack(">16xIQ", f.read(28))
+                    else:
+                        timescale, duration = struct.unpack(">8xII", f.read(16))
+                    if timescale:
+                        info["duration_seconds"] = round(duration / timescale, 3)
+                elif child == b"trak" and "width" not in info:
+                    for grandchild, _, tkhd_stop in _boxes(f, child_stop):
+                        if grandchild == b"tkhd":
+                            f.seek(tkhd_stop - 8)
+                            width, height = struct.unpack(">II", f.read(8))
+                            if width and height:
+                                info["width"], info["height"] = width >> 16, height >> 16
+                            break
+            break
+    return info
+
+def _run(command: list[str], timeout: float) -> bool:
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=timeout)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+def render_thumbnail(path: str, kind: str, output: str, size: int, timeout: float = 60) -> bool:
+    """Write a JPEG thumbnail (`output` must end in .jpg) that fits in `size` x `size` pixels.
+
+    Returns False when no renderer is installed or the file cannot be rendered.
+    """
+    if kind == IMAGE and Image is not None:
+        try:
+            with Image.open(path) as image:
+                image.thumbnail((size, size))
+                image.convert("RGB").save(output, "JPEG", quality=80, optimize=True)
+        except (OSError, ValueError):
+            return False
+        return True
+    if kind == PDF and shutil.which("pdftoppm"):
+        # First page only, its longer side scaled to `size`; pdftoppm appends the .jpg itself
+        prefix = os.path.splitext(output)[0]
+        return _run(["pdftoppm", "-jpeg", "-f", "1", "-l", "1", "-singlefile", "-scale-to", str(size), path, prefix], timeout)
+    if kind == VIDEO and shutil.which("ffmpeg"):
+        # A frame one second in is more telling than the (often black) first one
+        scale = f"scale={size}:{size}:force_original_aspect_ratio=decrease"
+        return _run(["ffmpeg", "-loglevel", "error", "-y", "-ss", "1", "-i", path, "-frames:v", "1", "-vf", scale, output], timeout)
+    return False
+
+def extract_media(path: str, kind: str, thumbnail_path: str, thumbnail_size: int, timeout: float = 60) -> dict:
+    """Probe a file and render its thumbnail. Process-pool entry point; returns plain values only."""
+    info = {}
+    try:
+        if kind == IMAGE:
+            size = image_size(path)
+            if size:
+                info["width"], info["height"] = size
+        elif kind == PDF:
+            info["pages"] = pdf_page_count(path)
+        elif kind == VIDEO:
+            info.update(mp4_info(path))
+    except (OSError, ValueError, IndexError, struct.error):
+        pass  # Truncated or mislabelled file: keep whatever was read, the thumbnail may still render
+    info["thumbnail"] = render_thumbnail(path, kind, thumbnail_path, thumbnail_size, timeout)
+    return info
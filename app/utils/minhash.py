@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""MinHash signatures and locality-sensitive hashing for near-duplicate resources."""
+
+import threading
+import zlib
+from typing import Iterable, Optional
+import numpy as np
+from app.utils.tfidf import terms
+from app.utils.urls import canonical_url
+
+NUM_PERMUTATIONS = 64
+BANDS = 16  # Of 4 rows each: pairs from about 0.5 Jaccard similarity up share a bucket, 0.7 ones 99% of the time
+ROWS = NUM_PERMUTATIONS // BANDS
+PRIME = (1 << 31) - 1  # Hashes are reduced below it, so a * hash + b stays within 64 bits
+_rng = np.random.default_rng(20240601)  # Fixed, so signatures are the same in every worker
+_A = _rng.integers(1, PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+_B = _rng.integers(0, PRIME, NUM_PERMUTATIONS, dtype=np.uint64)
+# Folds a band of ROWS values into one 64-bit bucket key; a different salt per band keeps bands apart in one dict
+_FOLD = _rng.integers(1, 1 << 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_SALTS = _rng.integers(0, 1 << 63, BANDS, dtype=np.uint64)
+
+
+def shingle_words(title: Optional[str], description: Optional[str]) -> set[str]:
+    """The distinct normalized words of a title and description: lowercased, without stop words."""
+    return set(terms(title)).union(terms(description))
+
+def word_hash(word: str) -> int:
+    """A stable 31-bit hash of a word, the same in every process (unlike hash())."""
+    return zlib.crc32(word.encode()) % PRIME
+
+def shingles(title: Optional[str], description: Optional[str]) -> np.ndarray:
+    """Hashes of the distinct normalized words of a title and description."""
+    words = shingle_words(title, description)
+    return np.fromiter(map(word_hash, words), np.uint64, len(words))
+
+def signature(hashes: np.ndarray) -> Optional[np.ndarray]:
+    """The MinHash signature of a set of shingle hashes, or None for an empty set."""
+    if not len(hashes):
+        return None
+    return ((_A[:, np.newaxis] * hashes + _B[:, np.newaxis]) % PRIME).min(axis=1).astype(np.uint32)
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """LSH bucket keys of signature rows: one per band, equal only (barring collisions) when the band is equal."""
+    bands = signatures.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    return (bands * _FOLD).sum(axis=2) ^ _SALTS  # Wraps around modulo 2**64
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures: the share of permutations whose minimums agree."""
+    return np.count_nonzero(first == second) / NUM_PERMUTATIONS
+
+
+class DuplicateIndex:
+    """Canonical URLs and MinHash signatures of a user's resources, for near-duplicate lookups.
+
+    Titles and descriptions are reduced to 64-value signatures whose agreement estimates the Jaccard similarity
+    of their word sets. Signatures are split into 16 bands hashed into buckets, so a lookup only verifies the
+    resources sharing a bucket with it instead of comparing against the whole library. URLs are compared by their
+    canonical form. Documents are added, replaced and removed incrementally. Thread-safe.
+    """
+
+    def __init__(self):
+        self._signatures: dict[int, np.ndarray] = {}
+        self._buckets: dict[int, object] = {}  # Bucket key -> an id, or a list of ids once shared
+        self._urls: dict[str, set[int]] = {}  # Canonical URL -> ids
+        self._doc_urls: dict[int, str] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._signatures.keys() | self._doc_urls.keys())
+
+    def add(self, doc_id: int, url: Optional[str], title: Optional[str], description: Optional[str]) -> None:
+        """Index a resource, replacing any previous version of it."""
+        sig = signature(shingles(title, description))
+        with self._lock:
+            self._remove(doc_id)
+            self._insert(doc_id, canonical_url(url), sig, None if sig is None else band_keys(sig)[0].tolist())
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a resource if indexed."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _insert(self, doc_id: int, url: Optional[str], sig: Optional[np.ndarray], keys: Optional[list[int]]) -> None:
+        if url is not None:
+            self._doc_urls[doc_id] = url
+            self._urls.setdefault(url, set()).add(doc_id)
+        if sig is None:
+            return
+        self._signatures[doc_id] = sig
+        buckets = self._buckets
+        for key in keys:
+            held = buckets.get(key)
+            if held is None:
+                buckets[key] = doc_id  # Most buckets hold one resource; a bare id saves a list per bucket
+            elif isinstance(held, list):
+                held.append(doc_id)
+            else:
+                buckets[key] = [held, doc_id]
+
+    def _remove(self, doc_id: int) -> None:
+        url = self._doc_urls.pop(doc_id, None)
+        if url is not None:
+            self._urls[url].discard(doc_id)
+            if not self._urls[url]:
+                del self._urls[url]
+        sig = self._signatures.pop(doc_id, None)
+        if sig is None:
+            return
+        for key in band_keys(sig)[0].tolist():
+            held = self._buckets[key]
+            if isinstance(held, list):
+                held.remove(doc_id)
+                if len(held) == 1:
+                    self._buckets[key] = held[0]
+            else:
+                del self._buckets[key]
+
+    def _candidates(self, keys: list[int]) -> set[int]:
+        candidates = set()
+        for key in keys:
+            held = self._buckets.get(key)
+            if isinstance(held, list):
+                candidates.update(held)
+            elif held is not None:
+                candidates.add(held)
+        return candidates
+
+    def lookup(self, url: Optional[str], title: Optional[str], description: Optional[str], threshold: float,
+               exclude: Optional[int] = None) -> list[tuple[int, float]]:
+        """(id, similarity) of indexed resources duplicating the given one, most similar first, newest first among
+        equals. The same canonical URL scores 1.0; otherwise the estimated similarity must reach `threshold`."""
+        url = canonical_url(url)
+        sig = signature(shingles(title, description))
+        keys = None if sig is None else band_keys(sig)[0].tolist()
+        with self._lock:
+            matches = dict.fromkeys(self._urls.get(url, ()) if url else (), 1.0)
+            for candidate in self._candidates(keys) if keys else ():
+                score = similarity(sig, self._signatures[candidate])
+                if score >= threshold and candidate not in matches:
+                    matches[candidate] = score
+        matches.pop(exclude, None)
+        return sorted(matches.items(), key=lambda match: (-match[1], -match[0]))
+
+    def duplicate_groups(self, threshold: float) -> list[list[int]]:
+        """Every set of resources that duplicate one another, directly or through a chain of duplicates, as sorted
+        id lists ordered by their first id. Only resources sharing a URL or an LSH bucket are compared."""
+        parents: dict[int, int] = {}
+
+        def root(doc_id: int) -> int:
+            parents.setdefault(doc_id, doc_id)
+            while parents[doc_id] != doc_id:
+                parents[doc_id] = parents[parents[doc_id]]  # Path halving
+                doc_id = parents[doc_id]
+            return doc_id
+
+        with self._lock:
+            for doc_ids in self._urls.values():
+                first, *rest = doc_ids
+                for other in rest:
+                    parents[root(other)] = root(first)
+            for held in self._buckets.values():
+                if not isinstance(held, list):
+                    continue
+                for i, first in enumerate(held):
+                    for other in held[i + 1:]:
+                        # Pairs already joined through others need no comparison
+                        first_root, other_root = root(first), root(other)
+                        if first_root != other_root and similarity(self._signatures[first], self._signatures[other]) >= threshold:
+                            parents[other_root] = first_root
+
+        groups: dict[int, list[int]] = {}
+        for doc_id in parents:
+            groups.setdefault(root(doc_id), []).append(doc_id)
+        return sorted((sorted(group) for group in groups.values() if len(group) > 1), key=lambda group: group[0])
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple]) -> "DuplicateIndex":
+        """An index of (id, url, title, description) rows, with the signatures of all rows hashed in one pass
+        per permutation rather than one resource at a time."""
+        index = cls()
+        ids, urls, words, lengths = [], [], [], []
+        for doc_id, url, title, description in documents:
+            ids.append(doc_id)
+            urls.append(canonical_url(url))
+            doc_words = shingle_words(title, description)
+            words.extend(doc_words)
+            lengths.append(len(doc_words))
+        # Libraries reuse most of their words, so each distinct word is hashed once
+        hashes = {word: word_hash(word) for word in set(words)}
+        everything = np.fromiter(map(hashes.__getitem__, words), np.uint64, len(words))
+        lengths = np.array(lengths, np.int64)
+        signed = np.flatnonzero(lengths)
+        signatures = np.empty((len(signed), NUM_PERMUTATIONS), np.uint32)
+        if len(signed):
+            starts = np.concatenate(([0], np.cumsum(lengths[signed])[:-1]))
+            for permutation in range(NUM_PERMUTATIONS):
+                values = (_A[permutation] * everything + _B[permutation]) % PRIME
+                signatures[:, permutation] = np.minimum.reduceat(values, starts)
+        keys = band_keys(signatures).tolist()
+        rows = dict(zip(signed.tolist(), range(len(signed))))
+        for position, (doc_id, url) in enumerate(zip(ids, urls)):
+            row = rows.get(position)
+            index._insert(doc_id, url, None if row is None else signatures[row], None if row is None else keys[row])
+        return index
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""Pydantic list serialization utilities."""
+
+# app/utils/pydantic/serialize.py
+from functools import lru_cache
+from typing import Any, Iterable
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from app.core.config import JSON_ENCODER
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; pydantic-core's own encoder is used without it
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    """Return the cached TypeAdapter for list[model] so its validator and serializer are built once."""
+    return TypeAdapter(list[model])
+
+def dump_model_list(model: type[BaseModel], items: Iterable[Any]) -> bytes:
+    """Validate a whole list against `model` in one pass and serialize it straight to JSON bytes.
+
+    Items may be ORM objects, other schemas or dicts. Items that already are `model` instances are not validated again.
+    """
+    adapter = list_adapter(model)
+    items = items if isinstance(items, list) else list(items)
+    if not all(type(item) is model for item in items):
+        items = adapter.validate_python(items, from_attributes=True)
+    if JSON_ENCODER == "orjson" and orjson is not None:
+        return orjson.dumps(adapter.dump_python(items))
+    return adapter.dump_json(items)
+
+
+class ModelListResponse(Response):
+    """JSON response for list endpoints that bypasses response_model revalidation.
+
+    Usage:
+      @router.get("/items/", response_model=list[Item])
+      def list_items():
+          return ModelListResponse(Item, crud.get_items())
+    """
+    media_type = "application/json"
+
+    def __init__(self, model: type[BaseModel], items: Iterable[Any], **kwargs):
+        super().__init__(content=dump_model_list(model, items), **kwargs)
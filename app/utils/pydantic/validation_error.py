@@ -2,6 +2,13 @@
 """Pydantic request validation errors utilities."""
 from typing import Tuple
 
+# JSON API endpoints, whose clients get FastAPI's 422 error body rather than an HTML page
+JSON_API_PATHS = ("/users/",)
+
+def is_json_api(request) -> bool:
+    """Whether a request is for a JSON endpoint rather than a page."""
+    return request.url.path.startswith(JSON_API_PATHS)
+
 def validation_path(request) -> Tuple[str, str]:
     """Return the template path for RequestValidationError.
     Since validation happens before the route handler, we can only rely on URL path unlike in ValueError.
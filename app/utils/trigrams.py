@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Trigram index for typo-tolerant search."""
+
+import re
+import sys
+import threading
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def trigrams(word: str) -> frozenset[str]:
+    """The trigrams of a word padded like pg_trgm ("  w", " wo", ..., "d "), so short words and word starts count."""
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+def words(text: Optional[str]) -> set[str]:
+    """The distinct lowercased words of a text."""
+    return set(WORD_RE.findall(text.casefold())) if text else set()
+
+
+class TrigramIndex:
+    """Word-level trigram index over short documents (a resource's title, tags and source).
+
+    Query words are matched against the vocabulary rather than against whole documents, so a misspelt word is
+    compared with real words of similar length instead of being diluted by a long title. Lookups touch only the
+    vocabulary words sharing a trigram with the query and the documents of the words that match.
+    Thread-safe; documents are added, replaced and removed incrementally.
+    """
+
+    def __init__(self):
+        self._documents: dict[int, tuple[str, ...]] = {}  # Interned words, so every document shares one copy of each
+        self._postings: dict[str, set[int]] = defaultdict(set)  # word -> document ids
+        self._vocabulary: dict[str, set[str]] = defaultdict(set)  # trigram -> words
+        self._sizes: dict[str, int] = {}  # word -> number of distinct trigrams
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def add(self, doc_id: int, *texts: Optional[str]) -> None:
+        """Index a document, replacing any previous version of it."""
+        doc_words = tuple(map(sys.intern, set().union(*(words(text) for text in texts))))
+        with self._lock:
+            self._remove(doc_id)
+            self._documents[doc_id] = doc_words
+            for word in doc_words:
+                if not self._postings[word]:
+                    word_trigrams = trigrams(word)
+                    self._sizes[word] = len(word_trigrams)
+                    for trigram in word_trigrams:
+                        self._vocabulary[trigram].add(word)
+                self._postings[word].add(doc_id)
+
+    def remove(self, doc_id: int) -> None:
+        """Drop a document if indexed."""
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id: int) -> None:
+        for word in self._documents.pop(doc_id, ()):
+            postings = self._postings[word]
+            postings.discard(doc_id)
+            if not postings:
+                # Forget words no document uses any more, so the vocabulary does not grow with every edit
+                del self._postings[word]
+                del self._sizes[word]
+                for trigram in trigrams(word):
+                    self._vocabulary[trigram].discard(word)
+                    if not self._vocabulary[trigram]:
+                        del self._vocabulary[trigram]
+
+    def similar_words(self, word: str, threshold: float) -> dict[str, float]:
+        """Indexed words whose trigram similarity (Jaccard) to `word` is at least `threshold`."""
+        query = trigrams(word)
+        with self._lock:
+            shared = Counter()
+            for trigram in query:
+                shared.update(self._vocabulary.get(trigram, ()))
+            sizes = {candidate: self._sizes[candidate] for candidate in shared}
+        matches = {}
+        for candidate, count in shared.items():
+            similarity = count / (len(query) + sizes[candidate] - count)
+            if similarity >= threshold:
+                matches[candidate] = similarity
+        return matches
+
+    def _matching_documents(self, word: str, threshold: float) -> list[tuple[float, set[int]]]:
+        """(similarity, document ids) groups for one query word, most similar first, each document in one group only."""
+        groups, seen = [], set()
+        for candidate, similarity in sorted(self.similar_words(word, threshold).items(), key=lambda match: -match[1]):
+            with self._lock:
+                doc_ids = self._postings.get(candidate, set()) - seen
+            if doc_ids:
+                groups.append((similarity, doc_ids))
+                seen |= doc_ids
+        return groups
+
+    def search(self, query: str, threshold: float = 0.3, limit: Optional[int] = None) -> list[tuple[int, float]]:
+        """(document id, score) of documents similar to the query, best first, ties going to the newest document.
+
+        Each query word scores its closest word in the document (1.0 for an exact match); a document's score is
+        the average over the query words, so every word counts and a document missing one scores lower.
+        Scores are worked out on sets of documents rather than one document at a time: the candidates are split
+        by which group of each word they fall in, so a word shared by most documents (a common tag) stays cheap.
+        """
+        query_words = words(query)
+        if not query_words:
+            return []
+        word_groups = [self._matching_documents(word, threshold) for word in query_words]
+        candidates = set().union(*(doc_ids for groups in word_groups for _, doc_ids in groups))
+        partitions = [(0.0, candidates)]
+        for groups in word_groups:
+            split = []
+            for score, rest in partitions:
+                for similarity, doc_ids in groups:
+                    both = rest & doc_ids
+                    if both:
+                        split.append((score + similarity, both))
+                        rest -= both
+                        if not rest:
+                            break
+                if rest:
+                    split.append((score, rest))
+            partitions = split
+
+        by_score: dict[float, set[int]] = defaultdict(set)
+        for score, doc_ids in partitions:
+            by_score[round(score / len(query_words), 9)] |= doc_ids
+        ranked = []
+        for score in sorted(by_score, reverse=True):
+            if score < threshold or (limit is not None and len(ranked) >= limit):
+                break
+            doc_ids = by_score[score]
+            newest = sorted(doc_ids, reverse=True)  # Sets of ints iterate nearly in order, which sorted() exploits
+            ranked.extend((doc_id, score) for doc_id in newest[:None if limit is None else limit - len(ranked)])
+        return ranked
+
+    @classmethod
+    def build(cls, documents: Iterable[tuple]) -> "TrigramIndex":
+        """An index of (id, *texts) rows."""
+        index = cls()
+        for doc_id, *texts in documents:
+            index.add(doc_id, *texts)
+        return index
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""URL normalisation: a conservative form that keys the unique index, and an aggressive one for suggesting duplicates."""
+
+import hashlib
+import re
+from typing import Optional
+from urllib.parse import parse_qsl, quote, unquote, urlencode, urlsplit, urlunsplit
+from app.core.storage import UPLOAD_URL
+
+# Query parameters that only identify a click or a campaign: never part of what a link points at
+CLICK_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "gbraid", "wbraid", "msclkid", "yclid", "twclid", "ttclid", "li_fat_id", "igshid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok", "vero_id", "oly_anon_id", "oly_enc_id", "rb_clickid",
+    "s_cid", "cmpid",
+})
+CLICK_PREFIXES = ("utm_", "pk_", "mtm_", "hsa_")
+# Parameters that usually name a referrer or sharer, but on some sites select content (e.g. a git ref)
+SHARER_PARAMS = frozenset({"ref", "ref_src", "ref_url", "referrer", "source", "share", "si", "spm", "feature"})
+DEFAULT_PORTS = {"http": "80", "https": "443"}
+HOST_PREFIXES_RE = re.compile(r"^(?:www\d*|m|mobile|amp)\.")
+# Link keys carry a prefix, so keys stored under an older normal form can be told apart and recomputed
+URL_KEY_PREFIX = "url:"
+# Keep only the characters RFC 3986 allows unescaped in a path (plus "%" for what must stay escaped)
+PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+
+
+def _is_click_param(key: str) -> bool:
+    key = key.lower()
+    return key in CLICK_PARAMS or key.startswith(CLICK_PREFIXES)
+
+def _netloc(scheme: str, host: str, parts) -> str:
+    """host[:port], without credentials or the scheme's default port."""
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    return host if port is None or str(port) == DEFAULT_PORTS[scheme] else f"{host}:{port}"
+
+def _path(path: str) -> str:
+    """A path with percent-escapes normalised, so %7E and ~ agree."""
+    return quote(unquote(path), safe=PATH_SAFE)
+
+def identity_url(url: Optional[str]) -> Optional[str]:
+    """A conservative normal form of an http(s) URL: two URLs agree only if they surely point at the same page.
+
+    Lowercases the scheme and host and drops default ports, credentials, fragments, trailing slashes and click or
+    campaign parameters (utm_*, fbclid, ...), and normalises percent-escapes. The scheme, host prefixes, other
+    parameters and their order are kept. None for anything but http(s) (e.g. uploads).
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+    query = [(key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True) if not _is_click_param(key)]
+    netloc = _netloc(scheme, parts.hostname.rstrip("."), parts)
+    return urlunsplit((scheme, netloc, _path(parts.path).rstrip("/"), urlencode(query), ""))
+
+def canonical_url(url: Optional[str]) -> Optional[str]:
+    """An aggressive normal form of an http(s) URL for spotting likely duplicates, or None for anything else.
+
+    On top of identity_url, treats http as https; drops www./m. host prefixes, repeated slashes and referrer
+    parameters (ref, source, si, ...); sorts the query parameters; and rewrites youtu.be short links to the
+    watch URL. Distinct pages can share this form, so it only suggests duplicates and never rejects a resource.
+    """
+    if not url:
+        return None
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = HOST_PREFIXES_RE.sub("", parts.hostname.rstrip("."))
+    netloc = _netloc(scheme, host, parts)
+    path = re.sub(r"/{2,}", "/", _path(parts.path)).rstrip("/")
+    query = [
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_click_param(key) and key.lower() not in SHARER_PARAMS
+    ]
+    if host == "youtu.be" and path:
+        netloc, query = "youtube.com", [("v", path.lstrip("/"))] + [(k, v) for k, v in query if k != "v"]
+        path = "/watch"
+    return urlunsplit(("https", netloc, path, urlencode(sorted(query)), ""))
+
+def is_linkable_url(url: Optional[str]) -> bool:
+    """Whether a URL is safe to render as a link or image source: http(s) with a host, or one of our uploads.
+
+    Anything else (javascript:, data:, protocol-relative //host links) could run script on the page showing it.
+    """
+    if not url:
+        return False
+    url = url.strip()
+    if url.startswith(UPLOAD_URL):
+        return True
+    parts = urlsplit(url)
+    return parts.scheme.lower() in DEFAULT_PORTS and bool(parts.hostname)
+
+def resource_key(url: Optional[str], original_filename: Optional[str]) -> str:
+    """What makes two of a user's resources the same one: "file:<name>" for an upload, otherwise "url:" and the
+    identity_url, or the URL as given when it is not http(s)."""
+    if original_filename:
+        return f"file:{original_filename}"
+    return URL_KEY_PREFIX + (identity_url(url) or (url or "").strip())
+
+def url_hash(key: str) -> str:
+    """Fixed-length digest of a resource key, for the unique (user_id, url_hash) index."""
+    return hashlib.sha256(key.encode()).hexdigest()[:32]
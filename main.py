@@ -2,11 +2,12 @@
 """FastAPI application entry point."""
 
 from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
+from app.core.static_files import StaticAssets, STATIC_DIR, precompress_static
+from app.core.compression_middleware import CompressionMiddleware
 from app.routes import home, auth, dashboard, admin
 from app.routes.user import reset_password, user, register, profile
-from app.routes.resource import rss, resources
-from app.core.config import SESSION_SECRET_KEY
+from app.routes.resource import rss, resources, share, collections
+from app.core.config import SESSION_SECRET_KEY, COMPRESSION_MINIMUM_SIZE
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from fastapi.exceptions import RequestValidationError
@@ -15,6 +16,11 @@ from app.core.logging_middleware import  ContextualASGIMiddleware #ContextualLog
 from app.core.logging_config import logger
 from app.core.db_init import init_db_tables
 from app.core.database import engine
+from app.core.write_batcher import write_batcher
+from app.core.config import JOB_WORKERS
+from app.services.job_services import start_workers, stop_workers
+from app.services.upload_gc_services import schedule_upload_reconciliation
+from app.services.media_services import shutdown_media_pool
 
 
 app = FastAPI(title="DevSaver", description="A tool to save and manage development resources.")
@@ -22,13 +28,11 @@ app = FastAPI(title="DevSaver", description="A tool to save and manage developme
 # Middlewares
 app.add_middleware(SessionMiddleware, secret_key=SESSION_SECRET_KEY)
 app.add_middleware(ContextualASGIMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MINIMUM_SIZE)
 # app.add_middleware(ContextualLoggingMiddleware)
 
-# Mount static files
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
-
-# Static uploads directory
-app.mount("/uploads", StaticFiles(directory="app/uploads"), name="uploads")
+# Mount static files; templates link them through static_url() so they can be cached as immutable
+app.mount("/static", StaticAssets(directory=STATIC_DIR), name="static")
 
 # Include User routers
 app.include_router(home.router, tags=["home"])
@@ -43,15 +47,27 @@ app.include_router(admin.router, tags=["admin"])
 # Include Resource routers
 app.include_router(rss.router, tags=["rss"])
 app.include_router(resources.router, tags=["resources"])
+app.include_router(share.router, tags=["share"])
+app.include_router(collections.router, tags=["collections"])
 
 # Auto-create DB tables on startup
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting up DevSaver...")
     init_db_tables()  # Create DB tables if they don't exist
+    try:
+        precompress_static()  # Refresh the .gz/.br copies of changed static assets in STATIC_CACHE_DIR
+    except OSError as error:
+        logger.warning("Serving static assets uncompressed; cannot write to STATIC_CACHE_DIR: %s", error)
+    start_workers(JOB_WORKERS)  # Run queued background jobs (file cleanup, cascades) in this process
+    schedule_upload_reconciliation()  # Orphaned-upload collection, once per UPLOAD_GC_INTERVAL_HOURS
 
 @app.on_event("shutdown")
 def shutdown_event():
+    stop_workers()
+    shutdown_media_pool()
+    write_batcher.close()  # Commit any queued star/read toggles
+    logger.info("Write batcher: %s", write_batcher.stats())
     logger.info("Closing database connections...")
     engine.dispose()
     logger.info("DevSaver application shut down cleanly.")